@@ -0,0 +1,141 @@
+"""
+Búsqueda de reservas del panel.
+
+Cada reserva guarda en `search_text` un texto normalizado (minúsculas, sin
+tildes) con nombre y email del cliente, nombre de la cancha y estado de pago.
+En Postgres lo cubre un índice GIN `pg_trgm`, así que `LIKE '%término%'` no
+recorre toda la tabla; en SQLite se usa el mismo LIKE sin índice.
+
+`search_text` se mantiene en el flush del ORM: al crear/editar una reserva y al
+renombrar un usuario o una cancha (se reescriben sus reservas).
+"""
+import re
+import unicodedata
+
+from sqlalchemy import bindparam, case, event, func, inspect, or_, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.modelos.modelos import Cancha, Reserva, User
+
+_ESPACIOS = re.compile(r"\s+")
+_SIN_FRASE = 1_000_000  # posición de relleno para filas sin la frase completa (SQLite)
+
+# columnas que alimentan search_text
+_CAMPOS_USER = ("first_name", "last_name", "email")
+_CAMPOS_CANCHA = ("nombre",)
+_CAMPOS_RESERVA = ("cliente_id", "cancha_id", "payment_status")
+
+
+def normalizar(texto: str | None) -> str:
+    """Minúsculas, sin tildes ni diacríticos y con espacios colapsados."""
+    descompuesto = unicodedata.normalize("NFKD", texto or "")
+    sin_tildes = "".join(c for c in descompuesto if not unicodedata.combining(c))
+    return _ESPACIOS.sub(" ", sin_tildes.lower()).strip()
+
+
+def texto_busqueda(
+    first_name: str | None,
+    last_name: str | None,
+    email: str | None,
+    cancha_nombre: str | None,
+    payment_status: str | None,
+) -> str:
+    return normalizar(" ".join(p for p in (first_name, last_name, email, cancha_nombre, payment_status) if p))
+
+
+def terminos(search: str | None) -> list[str]:
+    return normalizar(search).split()[:8]
+
+
+def filtrar(q, search: str | None):
+    """Cada palabra tiene que aparecer (AND de LIKE; el índice trigram sirve cada uno)."""
+    for t in terminos(search):
+        q = q.filter(Reserva.search_text.like(f"%{_escapar(t)}%", escape="\\"))
+    return q
+
+
+def relevancia(dialecto: str, search: str | None):
+    """Expresión para ORDER BY (mayor = más relevante)."""
+    texto = " ".join(terminos(search))
+    if dialecto == "postgresql":
+        return func.similarity(Reserva.search_text, texto)
+    # SQLite: cuanto antes aparece la frase, mejor; sin la frase junta (filtrar
+    # solo exige cada palabra) va detrás de todas las que sí la tienen
+    posicion = func.instr(Reserva.search_text, texto)
+    return -case((posicion == 0, _SIN_FRASE), else_=posicion)
+
+
+def _escapar(t: str) -> str:
+    return t.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+# --- mantenimiento de search_text ---
+
+
+def _filas_texto(conn, where) -> list[dict]:
+    stmt = (
+        select(Reserva.id, User.first_name, User.last_name, User.email, Cancha.nombre, Reserva.payment_status)
+        .select_from(Reserva)
+        .join(Cancha, Cancha.id == Reserva.cancha_id)
+        .outerjoin(User, User.id == Reserva.cliente_id)
+        .where(where)
+    )
+    return [{"rid": rid, "texto": texto_busqueda(*resto)} for rid, *resto in conn.execute(stmt)]
+
+
+def recalcular(conn, where=None) -> dict[int, str]:
+    """Reescribe search_text de las reservas que cumplan `where` (todas si es None)."""
+    filas = _filas_texto(conn, where if where is not None else Reserva.id.isnot(None))
+    if filas:
+        tabla = Reserva.__table__
+        # updated_at se deja igual: renombrar un cliente no es editar su reserva
+        stmt = (
+            update(tabla)
+            .where(tabla.c.id == bindparam("rid"))
+            .values(search_text=bindparam("texto"), updated_at=tabla.c.updated_at)
+        )
+        conn.execute(stmt, filas)
+    return {f["rid"]: f["texto"] for f in filas}
+
+
+def _cambio(obj, campos) -> bool:
+    estado = inspect(obj)
+    return any(estado.attrs[c].history.has_changes() for c in campos)
+
+
+@event.listens_for(Session, "before_flush")
+def _preparar(session: Session, flush_context, instances) -> None:
+    pendientes = session.info.setdefault("busqueda_pendiente", {"reservas": [], "users": set(), "canchas": set()})
+    for obj in session.new:
+        if isinstance(obj, Reserva):
+            pendientes["reservas"].append(obj)
+    for obj in session.dirty:
+        if isinstance(obj, Reserva) and _cambio(obj, _CAMPOS_RESERVA):
+            pendientes["reservas"].append(obj)
+        elif isinstance(obj, User) and _cambio(obj, _CAMPOS_USER):
+            pendientes["users"].add(obj.id)
+        elif isinstance(obj, Cancha) and _cambio(obj, _CAMPOS_CANCHA):
+            pendientes["canchas"].add(obj.id)
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _actualizar(session: Session, flush_context) -> None:
+    pendientes = session.info.pop("busqueda_pendiente", None)
+    if not pendientes:
+        return
+    condiciones = []
+    ids = {r.id for r in pendientes["reservas"] if r.id is not None}
+    if ids:
+        condiciones.append(Reserva.id.in_(ids))
+    if pendientes["users"]:
+        condiciones.append(Reserva.cliente_id.in_(pendientes["users"]))
+    if pendientes["canchas"]:
+        condiciones.append(Reserva.cancha_id.in_(pendientes["canchas"]))
+    if not condiciones:
+        return
+
+    textos = recalcular(session.connection(), or_(*condiciones))
+    for r in pendientes["reservas"]:
+        if r.id in textos:
+            set_committed_value(r, "search_text", textos[r.id])
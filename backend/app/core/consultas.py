@@ -0,0 +1,101 @@
+"""
+Conteo de queries por request (y detector de N+1).
+
+Los eventos de SQLAlchemy acumulan, en el contexto del request, cuántas queries
+se ejecutaron y cuánto tiempo pasaron en la BD. El middleware lo expone como
+`Server-Timing` (visible en las DevTools del navegador) y lo loguea; si el mismo
+statement se repite muchas veces en un request (lazy loads en un loop) lo marca.
+"""
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class EstadisticasConsultas:
+    metodo: str = ""
+    ruta: str = ""
+    status: int = 0
+    total: int = 0
+    db_ms: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+
+    def repetidas(self, umbral: int) -> list[tuple[str, int]]:
+        """Statements idénticos ejecutados `umbral` veces o más (típico N+1)."""
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= umbral]
+
+
+_actual: ContextVar[EstadisticasConsultas | None] = ContextVar("db_consultas", default=None)
+
+# callbacks al terminar cada request (los usa el plugin de pytest)
+_observadores: list[Callable[[EstadisticasConsultas], None]] = []
+
+
+def registrar_observador(fn: Callable[[EstadisticasConsultas], None]) -> None:
+    _observadores.append(fn)
+
+
+def quitar_observador(fn: Callable[[EstadisticasConsultas], None]) -> None:
+    if fn in _observadores:
+        _observadores.remove(fn)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _antes(conn, cursor, statement, parameters, context, executemany):
+    if _actual.get() is not None:
+        conn.info.setdefault("consultas_t0", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _despues(conn, cursor, statement, parameters, context, executemany):
+    stats = _actual.get()
+    if stats is None:
+        return
+    pila = conn.info.get("consultas_t0")
+    if pila:
+        stats.db_ms += (time.perf_counter() - pila.pop()) * 1000
+    stats.total += 1
+    stats.statements[statement] += 1
+
+
+def _route_path(request: Request) -> str:
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or request.url.path
+
+
+async def query_stats_middleware(request: Request, call_next):
+    stats = EstadisticasConsultas(metodo=request.method)
+    token = _actual.set(stats)
+    try:
+        response = await call_next(request)
+    finally:
+        _actual.reset(token)
+
+    stats.ruta = _route_path(request)
+    stats.status = response.status_code
+
+    if settings.DB_SERVER_TIMING:
+        response.headers.append(
+            "Server-Timing", f'db;dur={stats.db_ms:.1f};desc="{stats.total} queries"'
+        )
+
+    logger.info("%s %s %s queries=%d db_ms=%.1f", stats.metodo, stats.ruta, stats.status, stats.total, stats.db_ms)
+    for sql, n in stats.repetidas(settings.DB_N1_THRESHOLD):
+        logger.warning(
+            "Posible N+1 en %s %s: %dx %s", stats.metodo, stats.ruta, n, " ".join(sql.split())[:200]
+        )
+
+    for fn in list(_observadores):
+        fn(stats)
+    return response
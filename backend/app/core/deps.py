@@ -1,8 +1,17 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db.conexion import SessionLocal
+from app.db.conexion import (
+    SessionLocal,
+    get_async_read_sessionmaker,
+    get_async_sessionmaker,
+    set_statement_timeout,
+    set_statement_timeout_async,
+)
+from app.core.config import settings
+from app.core.replica import leer_de_primaria
 from app.core.seguridad import decodificar_token
 from app.modelos.modelos import User
 
@@ -17,6 +26,50 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """
+    AsyncSession para rutas `async def` de solo lectura (catálogo público).
+    Mientras espera a Postgres libera el event loop en vez de ocupar un hilo.
+    """
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+async def get_async_read_db(request: Request):
+    """
+    AsyncSession de solo lectura: va a la réplica (DATABASE_READ_URL) salvo que el
+    cliente haya escrito hace poco (cookie sticky), en cuyo caso lee de la primaria.
+    """
+    factory = get_async_sessionmaker() if leer_de_primaria(request) else get_async_read_sessionmaker()
+    async with factory() as db:
+        yield db
+
+
+def statement_timeout(timeout_ms: int):
+    """
+    Dependency para fijar el statement_timeout de la sesión del request según la
+    clase de ruta (lecturas públicas cortas, exportes largos). Así un export lento
+    no retiene conexiones que necesitan las rutas de reservas.
+    """
+
+    def apply(db: Session = Depends(get_db)) -> None:
+        set_statement_timeout(db, timeout_ms)
+
+    return apply
+
+
+def statement_timeout_async(timeout_ms: int, session_dep=get_async_db):
+    async def apply(db: AsyncSession = Depends(session_dep)) -> None:
+        await set_statement_timeout_async(db, timeout_ms)
+
+    return apply
+
+
+timeout_lectura_publica = statement_timeout(settings.DB_PUBLIC_STATEMENT_TIMEOUT_MS)
+timeout_lectura_publica_async = statement_timeout_async(settings.DB_PUBLIC_STATEMENT_TIMEOUT_MS, get_async_read_db)
+timeout_export = statement_timeout(settings.DB_EXPORT_STATEMENT_TIMEOUT_MS)
+
+
 def get_usuario_actual(token: str = Depends(oauth2), db: Session = Depends(get_db)) -> User:
     try:
         data = decodificar_token(token)
@@ -2,6 +2,7 @@ import smtplib
 from email.message import EmailMessage
 
 from app.core.config import settings
+from app.core.metricas import EMAILS
 
 
 def send_email_code(email: str, code: str) -> None:
@@ -29,5 +30,9 @@ def send_email_code(email: str, code: str) -> None:
         if settings.SMTP_USER:
             server.login(settings.SMTP_USER, settings.SMTP_PASS)
         server.send_message(msg)
+        EMAILS.labels("enviado").inc()
+    except Exception:
+        EMAILS.labels("error").inc()
+        raise
     finally:
         server.quit()
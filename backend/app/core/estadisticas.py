@@ -0,0 +1,180 @@
+"""
+Rollup diario de reservas (`reservas_diarias`) para /panel/estadisticas.
+
+Cada reserva aporta a las celdas (cancha, fecha, hora) que ocupa: los minutos
+se reparten por hora y el conteo y los montos van en la hora de inicio.
+crear_reserva / registrar_pago / cancelar_reserva aplican el delta (aporte
+nuevo - aporte anterior) en la misma transacción, con un upsert que suma, así
+que los dashboards leen O(días x horas) filas en vez de todas las reservas.
+
+`reconciliar` recalcula un rango de fechas desde `reservas` y corrige cualquier
+deriva; lo corre cada noche el Cron Job `miffuturo-rollup` de render.yaml
+(`python -m app.scripts.estadisticas reconciliar`).
+"""
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+
+from app.db.particiones import DURACION_MAXIMA
+from app.modelos.modelos import Reserva, ReservaDiaria
+
+logger = logging.getLogger(__name__)
+
+# franja reservable (la misma que muestran los horarios públicos)
+HORA_APERTURA = 6
+HORA_CIERRE = 22
+
+_METRICAS = ("reservas", "canceladas", "minutos", "total", "pagado")
+
+
+@dataclass(frozen=True)
+class Aporte:
+    cancha_id: int
+    start_at: datetime
+    end_at: datetime
+    activa: bool
+    total: Decimal
+    pagado: Decimal
+
+
+def aporte(r: Reserva) -> Aporte:
+    """Foto de lo que la reserva suma al rollup (tomarla antes de modificarla)."""
+    return Aporte(
+        cancha_id=int(r.cancha_id),
+        start_at=r.start_at,
+        end_at=r.end_at,
+        activa=r.payment_status != "cancelada",
+        total=Decimal(str(r.total_amount or 0)),
+        pagado=Decimal(str(r.paid_amount or 0)),
+    )
+
+
+def _tramos(start_at: datetime, end_at: datetime):
+    """(fecha, hora, minutos) de cada hora de reloj que toca la reserva."""
+    t = start_at
+    while t < end_at:
+        fin_hora = t.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        hasta = min(fin_hora, end_at)
+        yield t.date(), t.hour, int(round((hasta - t).total_seconds() / 60))
+        t = hasta
+
+
+def _celdas(a: Aporte, signo: int, acumulado: dict) -> None:
+    primero = True
+    for fecha, hora, minutos in _tramos(a.start_at, a.end_at):
+        celda = acumulado[(a.cancha_id, fecha, hora)]
+        if a.activa:
+            celda["minutos"] += signo * minutos
+        if primero:
+            if a.activa:
+                celda["reservas"] += signo
+                celda["total"] += signo * a.total
+                celda["pagado"] += signo * a.pagado
+            else:
+                celda["canceladas"] += signo
+            primero = False
+
+
+def _nuevo_acumulado() -> dict:
+    return defaultdict(lambda: {"reservas": 0, "canceladas": 0, "minutos": 0, "total": Decimal(0), "pagado": Decimal(0)})
+
+
+def _filas(acumulado: dict) -> list[dict]:
+    return [
+        {"cancha_id": c, "fecha": f, "hora": h, **v}
+        for (c, f, h), v in acumulado.items()
+        if any(v[m] for m in _METRICAS)
+    ]
+
+
+def _upsert_sumando(conn: Connection, filas: list[dict]) -> None:
+    if not filas:
+        return
+    dialecto = postgresql if conn.dialect.name == "postgresql" else sqlite
+    stmt = dialecto.insert(ReservaDiaria.__table__)
+    tabla = ReservaDiaria.__table__
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["cancha_id", "fecha", "hora"],
+        set_={m: tabla.c[m] + stmt.excluded[m] for m in _METRICAS},
+    )
+    conn.execute(stmt, filas)
+
+
+def aplicar(conn: Connection, antes: Aporte | None, despues: Aporte | None) -> None:
+    """Suma al rollup la diferencia entre el aporte anterior y el nuevo de una reserva."""
+    acumulado = _nuevo_acumulado()
+    if antes is not None:
+        _celdas(antes, -1, acumulado)
+    if despues is not None:
+        _celdas(despues, 1, acumulado)
+    _upsert_sumando(conn, _filas(acumulado))
+
+
+def reconciliar(conn: Connection, desde: date | None = None, hasta: date | None = None) -> dict:
+    """
+    Recalcula las celdas con fecha en [desde, hasta] desde `reservas`.
+    Nunca arranca antes de la reserva más antigua: los meses ya archivados
+    (app/db/particiones) conservan su rollup, y sin reservas no se toca nada.
+    Devuelve cuántas celdas quedaron y cuántas difería el rollup.
+
+    En Postgres bloquea `reservas_diarias` (SHARE ROW EXCLUSIVE) antes de leer
+    `reservas`: espera a que terminen las transacciones que ya aplicaron su
+    delta (así sus reservas entran en la lectura) y frena los `aplicar`
+    nuevos hasta el commit, que suman sobre el rollup ya reconstruido.
+    """
+    tabla = ReservaDiaria.__table__
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("LOCK TABLE reservas_diarias IN SHARE ROW EXCLUSIVE MODE"))
+    primera = conn.scalar(select(func.min(Reserva.start_at)))
+    if primera is None:
+        # todo archivado (o tabla vacía): el rollup es lo único que queda
+        return {"celdas": 0, "corregidas": 0}
+    desde = max(desde, primera.date()) if desde is not None else primera.date()
+    if hasta is not None and hasta < desde:
+        return {"celdas": 0, "corregidas": 0}
+    rango = [tabla.c.fecha >= desde]
+    if hasta is not None:
+        rango.append(tabla.c.fecha <= hasta)
+
+    previo = {
+        (r.cancha_id, r.fecha, r.hora): {m: getattr(r, m) for m in _METRICAS}
+        for r in conn.execute(select(tabla).where(*rango))
+    }
+
+    inicio = datetime.combine(desde, time.min)
+    solape = [Reserva.end_at > inicio, Reserva.start_at > inicio - DURACION_MAXIMA]
+    if hasta is not None:
+        solape.append(Reserva.start_at < datetime.combine(hasta + timedelta(days=1), time.min))
+    q = select(
+        Reserva.cancha_id, Reserva.start_at, Reserva.end_at, Reserva.payment_status, Reserva.total_amount, Reserva.paid_amount
+    ).where(*solape)
+
+    acumulado = _nuevo_acumulado()
+    for cancha_id, start_at, end_at, estado, total, pagado in conn.execute(q):
+        a = Aporte(int(cancha_id), start_at, end_at, estado != "cancelada", Decimal(str(total or 0)), Decimal(str(pagado or 0)))
+        _celdas(a, 1, acumulado)
+
+    filas = [
+        f
+        for f in _filas(acumulado)
+        if f["fecha"] >= desde and (hasta is None or f["fecha"] <= hasta)
+    ]
+    nuevo = {(f["cancha_id"], f["fecha"], f["hora"]): {m: f[m] for m in _METRICAS} for f in filas}
+    diferencias = sum(
+        1
+        for k in previo.keys() | nuevo.keys()
+        if any(Decimal(str((previo.get(k) or {}).get(m, 0))) != Decimal(str((nuevo.get(k) or {}).get(m, 0))) for m in _METRICAS)
+    )
+
+    conn.execute(delete(tabla).where(*rango))
+    _upsert_sumando(conn, filas)
+    if diferencias and previo:
+        logger.warning("Rollup de reservas: %d celdas corregidas entre %s y %s", diferencias, desde, hasta)
+    return {"celdas": len(filas), "corregidas": diferencias}
+
@@ -1,10 +1,20 @@
 from __future__ import annotations
 
+import base64
+import logging
 from io import BytesIO
-from PIL import Image, ImageOps
+
+# PIL se importa dentro de cada función: solo lo pagan los requests de subida,
+# no el arranque de cada worker.
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER_SIZE = 16
 
 
 def resize_square_image(data: bytes, size: int, ext: str) -> bytes:
+    from PIL import Image, ImageOps
+
     with Image.open(BytesIO(data)) as img:
         if ext == ".png":
             img = img.convert("RGBA")
@@ -24,3 +34,42 @@ def resize_square_image(data: bytes, size: int, ext: str) -> bytes:
         out = BytesIO()
         img.save(out, format=fmt, **params)
         return out.getvalue()
+
+
+def image_placeholder(data: bytes, size: int = PLACEHOLDER_SIZE) -> dict:
+    """
+    Calcula el placeholder (LQIP) de una imagen ya procesada:
+    - ancho/alto intrínsecos (para reservar espacio y evitar layout shift)
+    - un WebP de `size` px como data URI (~200-400 bytes) para pintar al instante
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(BytesIO(data)) as img:
+        img = ImageOps.exif_transpose(img)
+        ancho, alto = img.size
+
+        thumb = img.convert("RGB")
+        thumb.thumbnail((size, size), Image.BILINEAR)
+
+        out = BytesIO()
+        thumb.save(out, format="WEBP", quality=40, method=4)
+
+    encoded = base64.b64encode(out.getvalue()).decode("ascii")
+    return {
+        "ancho": int(ancho),
+        "alto": int(alto),
+        "placeholder": f"data:image/webp;base64,{encoded}",
+    }
+
+
+def placeholder_o_vacio(data: bytes) -> dict:
+    """
+    image_placeholder para los endpoints de subida: si la imagen no se puede
+    leer devuelve {} y la subida sigue sin placeholder (lo completa
+    app.scripts.backfill_placeholders).
+    """
+    try:
+        return image_placeholder(data)
+    except Exception as exc:
+        logger.warning("No se pudo generar placeholder: %s", exc)
+        return {}
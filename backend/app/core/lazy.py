@@ -0,0 +1,16 @@
+import importlib
+from types import ModuleType
+
+from fastapi import HTTPException
+
+
+def lazy_module(name: str, feature: str) -> ModuleType:
+    """
+    Importa una dependencia pesada/opcional recién cuando se usa
+    (exportes Excel/PDF), para que no pese en cada arranque de worker.
+    Si no está instalada, responde 503 en vez de tumbar la API al importar.
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        raise HTTPException(status_code=503, detail=f"{feature} no disponible en este servidor")
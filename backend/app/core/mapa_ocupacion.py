@@ -0,0 +1,66 @@
+"""
+Mapa de calor de ocupación (día de semana x hora) con NumPy.
+
+Las reservas llegan como tres columnas (índice de cancha, inicio, fin) y se
+parten en horas de reloj sin loops de Python: cada intervalo se expande con
+`np.repeat` a las horas que toca, se calcula el solape en minutos de cada hora
+y se acumula con `np.bincount` en un arreglo (canchas, 7, 24).
+"""
+from datetime import datetime
+
+DIAS = ["lun", "mar", "mié", "jue", "vie", "sáb", "dom"]
+
+# 1970-01-01 fue jueves: día 0 de la época -> weekday 3
+_WEEKDAY_EPOCA = 3
+
+
+def horas_por_celda(np, cancha_idx, inicios, fines, n_canchas: int, desde: datetime, hasta: datetime):
+    """
+    Horas reservadas por (cancha, día de semana, hora) dentro de [desde, hasta).
+
+    `cancha_idx` son enteros 0..n_canchas-1; `inicios`/`fines` cualquier cosa
+    convertible a datetime64 (listas de datetime naive sirven).
+    """
+    inicio = np.asarray(inicios, dtype="datetime64[m]").astype(np.int64)
+    fin = np.asarray(fines, dtype="datetime64[m]").astype(np.int64)
+    cancha = np.asarray(cancha_idx, dtype=np.int64)
+
+    # recorte a la ventana
+    inicio = np.maximum(inicio, np.datetime64(desde, "m").astype(np.int64))
+    fin = np.minimum(fin, np.datetime64(hasta, "m").astype(np.int64))
+    validas = fin > inicio
+    inicio, fin, cancha = inicio[validas], fin[validas], cancha[validas]
+
+    celdas = n_canchas * 7 * 24
+    if inicio.size == 0:
+        return np.zeros((n_canchas, 7, 24))
+
+    # horas absolutas (desde la época) que toca cada reserva
+    h0 = inicio // 60
+    h1 = (fin - 1) // 60
+    n = h1 - h0 + 1
+    cual = np.repeat(np.arange(inicio.size), n)
+    offset = np.arange(cual.size) - np.repeat(np.cumsum(n) - n, n)
+    hora_abs = h0[cual] + offset
+
+    minutos = np.minimum(fin[cual], (hora_abs + 1) * 60) - np.maximum(inicio[cual], hora_abs * 60)
+    dia_semana = (hora_abs // 24 + _WEEKDAY_EPOCA) % 7
+    hora = hora_abs % 24
+
+    plano = (cancha[cual] * 7 + dia_semana) * 24 + hora
+    horas = np.bincount(plano, weights=minutos / 60.0, minlength=celdas)
+    return horas.reshape(n_canchas, 7, 24)
+
+
+def ocurrencias_dia_semana(np, desde: datetime, hasta: datetime):
+    """Cuántas veces aparece cada día de semana (lun..dom) en [desde, hasta)."""
+    dias = np.arange(np.datetime64(desde.date(), "D"), np.datetime64(hasta.date(), "D"))
+    return np.bincount((dias.astype(np.int64) + _WEEKDAY_EPOCA) % 7, minlength=7)
+
+
+def utilizacion(np, horas, ocurrencias, n_canchas: int = 1):
+    """% de la capacidad (1 hora por cancha en cada ocurrencia de la celda)."""
+    capacidad = ocurrencias[:, None].astype(float) * n_canchas
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = np.where(capacidad > 0, horas / capacidad * 100.0, 0.0)
+    return pct
@@ -0,0 +1,184 @@
+import os
+import time
+
+from fastapi import Request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram as PromHistogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+
+from app.core.consultas import registrar_observador
+
+# buckets en segundos (como Prometheus): 1ms .. 30s
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+# ---------------------------------------------------------------------------
+# Métricas Prometheus (/metrics)
+#
+# Con varios workers de uvicorn define PROMETHEUS_MULTIPROC_DIR (un directorio propio,
+# p. ej. /tmp/prometheus, vacío en cada arranque): cada proceso escribe ahí sus *.db
+# y /metrics los agrega.
+# ---------------------------------------------------------------------------
+
+HTTP_LATENCIA = PromHistogram(
+    "http_request_duration_seconds",
+    "Latencia de requests HTTP por ruta (template) y status",
+    ["method", "route", "status"],
+    buckets=DEFAULT_BUCKETS,
+)
+HTTP_DB_SEGUNDOS = PromHistogram(
+    "http_request_db_seconds",
+    "Tiempo en la BD por request",
+    ["method", "route"],
+    buckets=DEFAULT_BUCKETS,
+)
+HTTP_EN_CURSO = Gauge(
+    "http_requests_in_progress",
+    "Requests en curso",
+    multiprocess_mode="livesum",
+)
+THREADPOOL_OCUPADOS = Gauge(
+    "threadpool_busy_threads",
+    "Hilos del threadpool de anyio ocupados (rutas sync)",
+    multiprocess_mode="livesum",
+)
+THREADPOOL_TOTAL = Gauge(
+    "threadpool_size",
+    "Tamaño del threadpool de anyio",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKOUT = PromHistogram(
+    "db_pool_checkout_wait_seconds",
+    "Espera para obtener una conexión del pool",
+    ["pool"],
+    buckets=DEFAULT_BUCKETS,
+)
+DB_POOL_EN_USO = Gauge(
+    "db_pool_checked_out",
+    "Conexiones del pool en uso",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_TAMANO = Gauge(
+    "db_pool_size",
+    "Tamaño configurado del pool (sin overflow)",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+
+
+def observar_checkout(pool: str, segundos: float) -> None:
+    DB_POOL_CHECKOUT.labels(pool).observe(segundos)
+
+
+CACHE = Counter(
+    "cache_requests_total",
+    "Lecturas de caché por resultado (hit/miss)",
+    ["cache", "result"],
+)
+UPLOADS = Counter("uploads_total", "Imágenes subidas", ["tipo"])
+EXPORTS = Counter("exports_total", "Exportes generados", ["formato"])
+EMAILS = Counter("emails_total", "Correos enviados", ["resultado"])
+SUSCRIPCIONES = Counter("suscripciones_eventos_total", "Eventos del barrido de suscripciones", ["evento"])
+
+
+def instrumentar_pool(engine, nombre: str) -> None:
+    """Cuenta checkouts/checkins del pool de `engine` (sync o async) en las métricas."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    size = getattr(sync_engine.pool, "size", None)
+    if callable(size):
+        DB_POOL_TAMANO.labels(nombre).set(size())
+
+    en_uso = DB_POOL_EN_USO.labels(nombre)
+    event.listen(sync_engine, "checkout", lambda *a: en_uso.inc())
+    event.listen(sync_engine, "checkin", lambda *a: en_uso.dec())
+
+
+def _threadpool_limiter():
+    try:
+        from anyio.to_thread import current_default_thread_limiter
+
+        return current_default_thread_limiter()
+    except Exception:
+        return None
+
+
+def _route_template(request: Request) -> str:
+    route = request.scope.get("route")
+    # solo templates (/public/complejos/{slug}); lo que no matchea va junto para no explotar la cardinalidad
+    return getattr(route, "path", None) or "<unmatched>"
+
+
+async def metrics_middleware(request: Request, call_next):
+    limiter = _threadpool_limiter()
+    HTTP_EN_CURSO.inc()
+    t0 = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_EN_CURSO.dec()
+        HTTP_LATENCIA.labels(request.method, _route_template(request), str(status)).observe(
+            time.perf_counter() - t0
+        )
+        if limiter is not None:
+            THREADPOOL_OCUPADOS.set(limiter.borrowed_tokens)
+            THREADPOOL_TOTAL.set(limiter.total_tokens)
+
+
+def _observar_db(stats) -> None:
+    HTTP_DB_SEGUNDOS.labels(stats.metodo, stats.ruta).observe(stats.db_ms / 1000)
+
+
+def registrar_observador_db() -> None:
+    registrar_observador(_observar_db)
+
+
+def multiproceso() -> bool:
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def _registro():
+    """El registro de este proceso o, con PROMETHEUS_MULTIPROC_DIR, el agregado de todos los workers."""
+    if multiproceso():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def render_metrics() -> tuple[bytes, str]:
+    return generate_latest(_registro()), CONTENT_TYPE_LATEST
+
+
+def espera_checkout() -> dict[str, dict]:
+    """`db_pool_checkout_wait_seconds` por pool: count, sum y buckets acumulados (le -> n)."""
+    out: dict[str, dict] = {}
+    for familia in _registro().collect():
+        if familia.name != "db_pool_checkout_wait_seconds":
+            continue
+        for muestra in familia.samples:
+            pool = muestra.labels["pool"]
+            h = out.setdefault(pool, {"count": 0, "sum": 0.0, "buckets": {}})
+            if muestra.name.endswith("_bucket"):
+                h["buckets"][muestra.labels["le"]] = h["buckets"].get(muestra.labels["le"], 0) + int(muestra.value)
+            elif muestra.name.endswith("_count"):
+                h["count"] += int(muestra.value)
+            elif muestra.name.endswith("_sum"):
+                h["sum"] = round(h["sum"] + muestra.value, 6)
+    return out
+
+
+def marcar_proceso_terminado() -> None:
+    if multiproceso():
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,41 @@
+"""
+Paginación por keyset (cursor opaco).
+
+El cursor codifica los valores de la última fila de la página según el orden
+del listado (p. ej. `(start_at, id)`); la siguiente página filtra
+`(start_at, id) > cursor`, así que cuesta lo mismo en la página 1 que en la 500.
+El cursor siguiente viaja en el header `X-Next-Cursor` (ausente = última página).
+"""
+import base64
+import json
+from datetime import date, datetime
+
+from fastapi import HTTPException
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _a_json(v):
+    if isinstance(v, (datetime, date)):
+        return v.isoformat()
+    return v
+
+
+def codificar_cursor(*valores) -> str:
+    raw = json.dumps([_a_json(v) for v in valores], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str, *tipos) -> tuple:
+    """Devuelve los valores convertidos con `tipos` (datetime usa fromisoformat); 400 si no es válido."""
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        if len(valores) != len(tipos):
+            raise ValueError
+        return tuple(
+            t.fromisoformat(v) if t in (datetime, date) else t(v)
+            for t, v in zip(tipos, valores)
+        )
+    except (ValueError, TypeError):
+        raise HTTPException(400, "Cursor inválido")
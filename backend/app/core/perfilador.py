@@ -0,0 +1,258 @@
+"""
+Profiling bajo demanda de requests (cProfile + SQL).
+
+Un request se perfila si:
+- lo pide un admin con `X-Profile: 1` o `?__profile=1`, o
+- coincide con la regla de muestreo activa (prefijo de path + tasa + vencimiento),
+  que un admin configura con `POST /admin/profiles/regla` (por proceso).
+
+Se perfila solo la función del endpoint (en su hilo si es sync) y se registran
+los statements SQL con sus tiempos, sin parámetros. Cada perfil se guarda en
+PROFILING_DIR como `<id>.prof` (pstats, abre con snakeviz) + `<id>.json`.
+Con PROFILING_ENABLED=false (default) no se instala nada: ni el middleware,
+ni el envoltorio de endpoints, ni los listeners de SQL (ver app/main.py).
+"""
+import cProfile
+import functools
+import inspect
+import io
+import json
+import logging
+import pstats
+import random
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+from fastapi import FastAPI, Request
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.seguridad import decodificar_token
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile"
+PROFILE_QUERY = "__profile"
+
+
+@dataclass
+class ReglaMuestreo:
+    path: str
+    rate: float
+    until: float
+
+    def aplica(self, path: str) -> bool:
+        return time.time() < self.until and path.startswith(self.path) and random.random() < self.rate
+
+
+@dataclass
+class Perfil:
+    id: str
+    metodo: str
+    path: str
+    motivo: str
+    profiler: cProfile.Profile = field(default_factory=cProfile.Profile)
+    sql: list[dict] = field(default_factory=list)
+    async_endpoint: bool = False
+
+
+_actual: ContextVar[Perfil | None] = ContextVar("perfil_actual", default=None)
+_regla: ReglaMuestreo | None = None
+
+# un perfil a la vez por proceso: cProfile no admite dos activos en el mismo hilo (event loop)
+_en_curso = threading.Semaphore(1)
+
+
+def _dir() -> Path:
+    return Path(settings.PROFILING_DIR)
+
+
+def set_regla(path: str, rate: float, minutos: float) -> ReglaMuestreo:
+    global _regla
+    _regla = ReglaMuestreo(path=path, rate=rate, until=time.time() + minutos * 60)
+    return _regla
+
+
+def quitar_regla() -> None:
+    global _regla
+    _regla = None
+
+
+def regla_actual() -> ReglaMuestreo | None:
+    regla = _regla
+    if regla and time.time() >= regla.until:
+        return None
+    return regla
+
+
+def _es_admin(request: Request) -> bool:
+    auth = request.headers.get("authorization", "")
+    if not auth.lower().startswith("bearer "):
+        return False
+    try:
+        return decodificar_token(auth[7:]).get("role") == "admin"
+    except Exception:
+        return False
+
+
+def _motivo(request: Request) -> str | None:
+    pedido = request.headers.get(PROFILE_HEADER) == "1" or request.query_params.get(PROFILE_QUERY) == "1"
+    if pedido and _es_admin(request):
+        return "admin"
+    regla = _regla
+    if regla is not None and regla.aplica(request.url.path):
+        return "muestreo"
+    return None
+
+
+# --- SQL (solo trabaja si hay un perfil activo en el contexto) ---
+
+
+def _sql_antes(conn, cursor, statement, parameters, context, executemany):
+    if _actual.get() is not None:
+        conn.info.setdefault("perfil_t0", []).append(time.perf_counter())
+
+
+def _sql_despues(conn, cursor, statement, parameters, context, executemany):
+    perfil = _actual.get()
+    if perfil is None:
+        return
+    pila = conn.info.get("perfil_t0")
+    ms = (time.perf_counter() - pila.pop()) * 1000 if pila else None
+    perfil.sql.append({"sql": " ".join(statement.split()), "ms": round(ms, 3) if ms is not None else None})
+
+
+def instrumentar_sql() -> None:
+    """Registra los listeners de SQL (solo con PROFILING_ENABLED; si no, ningún statement paga por ellos)."""
+    if not event.contains(Engine, "before_cursor_execute", _sql_antes):
+        event.listen(Engine, "before_cursor_execute", _sql_antes)
+        event.listen(Engine, "after_cursor_execute", _sql_despues)
+
+
+# --- endpoint ---
+
+
+def _envolver(fn):
+    if inspect.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def wrapper_async(*args, **kwargs):
+            perfil = _actual.get()
+            if perfil is None:
+                return await fn(*args, **kwargs)
+            # en el event loop: incluye lo que otras tareas ejecuten mientras se espera
+            perfil.async_endpoint = True
+            perfil.profiler.enable()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                perfil.profiler.disable()
+
+        return wrapper_async
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        perfil = _actual.get()
+        if perfil is None:
+            return fn(*args, **kwargs)
+        return perfil.profiler.runcall(fn, *args, **kwargs)
+
+    return wrapper
+
+
+def instrumentar_endpoints(app: FastAPI) -> None:
+    """Envuelve cada endpoint para que pueda perfilarse en su propio hilo."""
+    for route in app.routes:
+        if isinstance(route, APIRoute) and not getattr(route.dependant.call, "__perfilable__", False):
+            route.dependant.call = _envolver(route.dependant.call)
+            route.dependant.call.__perfilable__ = True
+
+
+# --- almacenamiento ---
+
+
+def _guardar(perfil: Perfil, status: int, total_ms: float) -> None:
+    carpeta = _dir()
+    carpeta.mkdir(parents=True, exist_ok=True)
+    perfil.profiler.dump_stats(str(carpeta / f"{perfil.id}.prof"))
+
+    salida = io.StringIO()
+    pstats.Stats(perfil.profiler, stream=salida).sort_stats("cumulative").print_stats(30)
+
+    meta = {
+        "id": perfil.id,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "method": perfil.metodo,
+        "path": perfil.path,
+        "reason": perfil.motivo,
+        "status": status,
+        "total_ms": round(total_ms, 2),
+        "async_endpoint": perfil.async_endpoint,
+        "sql_count": len(perfil.sql),
+        "sql_ms": round(sum(q["ms"] or 0 for q in perfil.sql), 2),
+        "sql": perfil.sql,
+        "top": salida.getvalue(),
+    }
+    (carpeta / f"{perfil.id}.json").write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+
+    # conserva solo los últimos PROFILING_MAX_FILES
+    viejos = sorted(carpeta.glob("*.json"), key=lambda p: p.stat().st_mtime)[: -settings.PROFILING_MAX_FILES]
+    for p in viejos:
+        p.unlink(missing_ok=True)
+        p.with_suffix(".prof").unlink(missing_ok=True)
+
+
+def listar_perfiles() -> list[dict]:
+    carpeta = _dir()
+    if not carpeta.is_dir():
+        return []
+    items = []
+    for p in sorted(carpeta.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True):
+        meta = json.loads(p.read_text(encoding="utf-8"))
+        items.append({k: meta[k] for k in ("id", "created_at", "method", "path", "reason", "status", "total_ms", "sql_count")})
+    return items
+
+
+def ruta_perfil(perfil_id: str, ext: str) -> Path | None:
+    try:
+        uuid.UUID(hex=perfil_id)
+    except ValueError:
+        return None
+    p = _dir() / f"{perfil_id}.{ext}"
+    return p if p.is_file() else None
+
+
+# --- middleware ---
+
+
+async def profiling_middleware(request: Request, call_next):
+    motivo = _motivo(request)
+    if motivo is None or not _en_curso.acquire(blocking=False):
+        return await call_next(request)
+
+    perfil = Perfil(id=uuid.uuid4().hex, metodo=request.method, path=request.url.path, motivo=motivo)
+    token = _actual.set(perfil)
+    t0 = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        _actual.reset(token)
+        _en_curso.release()
+        total_ms = (time.perf_counter() - t0) * 1000
+        try:
+            _guardar(perfil, status, total_ms)
+        except Exception:
+            logger.exception("No se pudo guardar el perfil %s", perfil.id)
+
+    response.headers["X-Profile-Id"] = perfil.id
+    logger.info("Perfil %s (%s) %s %s %.1f ms", perfil.id, motivo, perfil.metodo, perfil.path, total_ms)
+    return response
@@ -0,0 +1,159 @@
+"""
+Plan efectivo de cada usuario (cacheado) y control de límites del plan.
+
+`plan_efectivo` resuelve la última suscripción vigente + su plan una vez y la guarda en
+memoria por PLAN_CACHE_SECONDS, así los chequeos de plan del panel no repiten
+el join sobre `suscripciones`/`planes` en cada request. Toda sesión que inserte,
+modifique o borre una Suscripcion invalida la entrada de ese usuario al hacer
+commit; los cambios masivos (UPDATE directo) llaman a `invalidar`. Con varios
+workers cada uno tiene su caché: el TTL acota cuánto puede atrasarse otro
+proceso.
+
+`bloquear_propietario` serializa las altas que cuentan contra el límite del
+plan (pg_advisory_xact_lock por usuario), para que dos requests concurrentes no
+pasen los dos el conteo.
+"""
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from sqlalchemy import event, or_, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.modelos.modelos import Plan, Suscripcion
+
+# prefijo de clave para pg_advisory_xact_lock (la de migraciones es 724_310_001)
+_LOCK_PROPIETARIO = 724_310_002
+
+
+@dataclass(frozen=True)
+class PlanEfectivo:
+    plan_id: int
+    codigo: str
+    nombre: str
+    limite_canchas: int
+    permite_estadisticas: bool
+    permite_marketing: bool
+    # suscripción de la que sale el plan (None = FREE por defecto, sin suscripción)
+    suscripcion_id: int | None = None
+    estado: str = "activa"
+    inicio: datetime | None = None
+    fin: datetime | None = None
+
+
+def _desde(p: Plan, s: Suscripcion | None = None) -> PlanEfectivo:
+    return PlanEfectivo(
+        plan_id=int(p.id),
+        codigo=p.codigo,
+        nombre=p.nombre,
+        limite_canchas=int(p.limite_canchas or 0),
+        permite_estadisticas=bool(p.permite_estadisticas),
+        permite_marketing=bool(p.permite_marketing),
+        suscripcion_id=int(s.id) if s is not None else None,
+        estado=s.estado if s is not None else "activa",
+        inicio=s.inicio if s is not None else None,
+        fin=s.fin if s is not None else None,
+    )
+
+
+def plan_free(db: Session) -> Plan | None:
+    return db.query(Plan).filter(or_(Plan.codigo == "free", Plan.id == 1)).order_by(Plan.codigo != "free").first()
+
+
+def _resolver(db: Session, user_id: int) -> PlanEfectivo | None:
+    # una suscripción con `fin` pasado ya no cuenta, aunque el barrido
+    # (app/core/suscripciones.py) todavía no la haya marcado
+    fila = (
+        db.query(Suscripcion, Plan)
+        .join(Plan, Plan.id == Suscripcion.plan_id)
+        .filter(
+            Suscripcion.user_id == user_id,
+            Suscripcion.estado == "activa",
+            or_(Suscripcion.fin.is_(None), Suscripcion.fin > datetime.now(timezone.utc)),
+        )
+        .order_by(Suscripcion.inicio.desc())
+        .first()
+    )
+    if fila:
+        s, p = fila
+        return _desde(p, s)
+    free = plan_free(db)
+    return _desde(free) if free else None
+
+
+# --- caché por proceso ---
+
+_lock = threading.Lock()
+_cache: dict[int, tuple[float, PlanEfectivo | None]] = {}
+
+
+def plan_efectivo(db: Session, user_id: int) -> PlanEfectivo | None:
+    ahora = time.monotonic()
+    with _lock:
+        entrada = _cache.get(user_id)
+    if entrada and entrada[0] > ahora:
+        return entrada[1]
+
+    plan = _resolver(db, user_id)
+    vence = ahora + settings.PLAN_CACHE_SECONDS
+    if plan is not None and plan.fin is not None:
+        # la entrada no sobrevive al vencimiento de la suscripción
+        fin = plan.fin if plan.fin.tzinfo else plan.fin.replace(tzinfo=timezone.utc)
+        vence = min(vence, ahora + (fin - datetime.now(timezone.utc)).total_seconds())
+    with _lock:
+        if len(_cache) >= settings.PLAN_CACHE_MAX:
+            _cache.clear()
+        _cache[user_id] = (vence, plan)
+    return plan
+
+
+def invalidar(*user_ids: int) -> None:
+    """Sin argumentos vacía toda la caché (p. ej. tras un UPDATE masivo de suscripciones)."""
+    with _lock:
+        if not user_ids:
+            _cache.clear()
+        for uid in user_ids:
+            _cache.pop(uid, None)
+
+
+@event.listens_for(Session, "before_flush")
+def _anotar(session: Session, flush_context, instances) -> None:
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Suscripcion) and obj.user_id is not None:
+            session.info.setdefault("planes_invalidar", set()).add(int(obj.user_id))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_tras_commit(session: Session) -> None:
+    ids = session.info.pop("planes_invalidar", None)
+    if ids:
+        invalidar(*ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar(session: Session) -> None:
+    session.info.pop("planes_invalidar", None)
+
+
+# --- límites ---
+
+
+def limite_complejos(plan: PlanEfectivo | None) -> int:
+    if plan and plan.limite_canchas > 0:
+        return plan.limite_canchas
+    codigo = ((plan.codigo if plan else "") or "").lower()
+    nombre = ((plan.nombre if plan else "") or "").lower()
+    if "pro" in codigo or "premium" in codigo or "pro" in nombre or "premium" in nombre:
+        return 2
+    return 1
+
+
+def bloquear_propietario(db: Session, user_id: int) -> None:
+    """
+    Lock exclusivo por usuario hasta el fin de la transacción (solo Postgres;
+    SQLite ya serializa las escrituras).
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(CAST(:k AS bigint))"), {"k": (_LOCK_PROPIETARIO << 32) | user_id})
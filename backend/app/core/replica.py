@@ -0,0 +1,72 @@
+"""
+Ruteo de lecturas a la réplica (DATABASE_READ_URL) con ventana "sticky" a la primaria.
+
+Cuando un request hace commit en la primaria, la respuesta lleva una cookie
+`db_primary_until`; mientras no venza, las lecturas públicas de ese cliente van
+a la primaria y así ve lo que acaba de escribir aunque la réplica tenga lag.
+"""
+import time
+from contextvars import ContextVar
+
+from fastapi import Request
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.db.conexion import AsyncBridgeSession, DATABASE_READ_URL, SessionLocal
+
+STICKY_COOKIE = "db_primary_until"
+
+# contenedor mutable por request: los hilos del threadpool reciben una copia del
+# contexto, pero comparten la misma lista
+_escrituras: ContextVar[list | None] = ContextVar("db_escrituras", default=None)
+
+
+def replica_habilitada() -> bool:
+    return bool(DATABASE_READ_URL)
+
+
+def _marcar_escritura(session) -> None:
+    marca = _escrituras.get()
+    if marca is not None:
+        marca.append(True)
+
+
+event.listen(SessionLocal, "after_commit", _marcar_escritura)
+event.listen(AsyncBridgeSession, "after_commit", _marcar_escritura)
+
+
+def leer_de_primaria(request: Request) -> bool:
+    """True si este request debe leer de la primaria (sin réplica o dentro de la ventana sticky)."""
+    if not replica_habilitada():
+        return True
+    raw = request.cookies.get(STICKY_COOKIE)
+    if not raw:
+        return False
+    try:
+        return float(raw) > time.time()
+    except ValueError:
+        return False
+
+
+async def sticky_primary_middleware(request: Request, call_next):
+    if not replica_habilitada():
+        return await call_next(request)
+
+    token = _escrituras.set([])
+    try:
+        response = await call_next(request)
+        escribio = bool(_escrituras.get())
+    finally:
+        _escrituras.reset(token)
+
+    if escribio and response.status_code < 400:
+        ventana = int(settings.DB_STICKY_PRIMARY_SECONDS)
+        response.set_cookie(
+            STICKY_COOKIE,
+            str(int(time.time()) + ventana),
+            max_age=ventana,
+            httponly=True,
+            samesite="lax",
+            path="/",
+        )
+    return response
@@ -0,0 +1,139 @@
+"""
+Chequeos de readiness (/readyz).
+
+`/healthz` solo dice que el proceso responde; `/readyz` dice si puede atender
+tráfico: BD alcanzable y uploads escribible. La holgura del pool y el snapshot
+de ubigeo se reportan (`degraded`) pero no sacan la instancia: un pico que
+agota el pool es pasajero y, si Render la retirara, la carga caería sobre las
+demás y las agotaría también. El resultado de la BD se cachea unos segundos para
+que el probe se pueda llamar seguido sin cargar a Postgres.
+"""
+import logging
+import os
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.core.ubigeo_snapshot import current_snapshot, get_snapshot
+from app.db.conexion import DATABASE_URL, pool_stats
+
+logger = logging.getLogger(__name__)
+
+UPLOADS_DIR = Path("uploads")
+
+
+@lru_cache(maxsize=1)
+def _probe_engine() -> Engine:
+    # conexión aparte (sin pool): si el pool está agotado el probe no se queda esperando
+    # DB_POOL_TIMEOUT; la falta de conexiones libres se reporta en el chequeo "pool"
+    connect_args = {}
+    if DATABASE_URL.startswith("postgresql"):
+        timeout_s = max(1, int(settings.READY_DB_TIMEOUT_S))
+        connect_args = {
+            "connect_timeout": timeout_s,
+            "options": f"-c statement_timeout={timeout_s * 1000}",
+        }
+    return create_engine(DATABASE_URL, poolclass=NullPool, connect_args=connect_args)
+
+
+_db_lock = threading.Lock()
+_db_cache: dict = {}
+
+
+def _medir(fn) -> dict:
+    t0 = time.perf_counter()
+    try:
+        resultado = fn()
+    except Exception as exc:
+        resultado = {"ok": False, "error": f"{type(exc).__name__}: {exc}"[:200]}
+    resultado["ms"] = round((time.perf_counter() - t0) * 1000, 2)
+    return resultado
+
+
+def _ping_db() -> dict:
+    with _probe_engine().connect() as conn:
+        conn.execute(text("SELECT 1"))
+    return {"ok": True}
+
+
+def check_db() -> dict:
+    """SELECT 1 con timeout corto; el resultado vale READY_CACHE_SECONDS."""
+    # un solo probe a la vez; los que llegan mientras tanto reusan su resultado
+    with _db_lock:
+        if _db_cache and time.monotonic() - _db_cache["at"] < settings.READY_CACHE_SECONDS:
+            return {**_db_cache["result"], "cached": True}
+        result = _medir(_ping_db)
+        if not result["ok"]:
+            logger.warning("Readiness: BD no disponible (%s)", result.get("error"))
+        _db_cache.update({"at": time.monotonic(), "result": result})
+        return {**result, "cached": False}
+
+
+def _holgura(stats: dict) -> dict | None:
+    if "size" not in stats:
+        return None
+    capacidad = stats["size"] + stats["max_overflow"]
+    return {"checked_out": stats["checked_out"], "capacity": capacidad, "free": capacidad - stats["checked_out"]}
+
+
+def check_pool() -> dict:
+    """Conexiones libres en cada pool del proceso (sync y, si ya se crearon, async / réplica)."""
+    stats = pool_stats()
+    pools = {
+        nombre: h
+        for nombre, h in (
+            ("sync", _holgura(stats)),
+            ("async", _holgura(stats.get("async", {}))),
+            ("async_read", _holgura(stats.get("async_read", {}))),
+        )
+        if h is not None
+    }
+    return {
+        "ok": all(h["free"] >= settings.READY_POOL_MIN_FREE for h in pools.values()),
+        "pools": pools,
+    }
+
+
+def check_uploads() -> dict:
+    ok = UPLOADS_DIR.is_dir() and os.access(UPLOADS_DIR, os.W_OK)
+    return {"ok": ok, "path": str(UPLOADS_DIR)}
+
+
+def check_ubigeo(db_ok: bool) -> dict:
+    snap = current_snapshot()
+    if snap is None and db_ok:
+        # primera vez: se carga acá (una sola vez por proceso)
+        snap = get_snapshot()
+    if snap is None:
+        return {"ok": False, "loaded": False}
+    return {
+        "ok": not snap.is_empty,
+        "loaded": True,
+        "version": snap.version,
+        "departamentos": len(snap.departments),
+    }
+
+
+# si fallan, la instancia no está lista; el resto se reporta pero no tumba el probe
+CRITICOS = ("db", "uploads")
+
+
+def readiness() -> dict:
+    t0 = time.perf_counter()
+    checks = {"db": check_db()}
+    checks["pool"] = _medir(check_pool)
+    checks["uploads"] = _medir(check_uploads)
+    checks["ubigeo"] = _medir(lambda: check_ubigeo(checks["db"]["ok"]))
+
+    return {
+        "ready": all(checks[name]["ok"] for name in CRITICOS),
+        "degraded": not all(c["ok"] for c in checks.values()),
+        "checks": checks,
+        "total_ms": round((time.perf_counter() - t0) * 1000, 2),
+    }
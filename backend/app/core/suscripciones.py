@@ -0,0 +1,128 @@
+"""
+Vencimiento de suscripciones en lote.
+
+`vencer` marca como canceladas todas las suscripciones activas con `fin`
+vencido (un UPDATE ... RETURNING) y da de alta el plan FREE para los usuarios
+que se quedaron sin suscripción vigente (un INSERT ... SELECT). Cada alta queda
+como evento auditable: proveedor="vencimiento" y proveedor_ref apunta a la
+suscripción vencida. `vencer` devuelve los usuarios afectados y `barrer`, recién
+después del commit, cuenta los eventos en `suscripciones_eventos_total` e
+invalida la caché de planes de esos usuarios (si la transacción se deshace, no
+quedan métricas ni invalidaciones de algo que no pasó).
+
+Lo corre un hilo en cada worker cada SUSCRIPCIONES_BARRIDO_SECONDS (con un
+advisory lock para que en Postgres lo haga uno solo a la vez) y también
+`python -m app.scripts.suscripciones vencer`. Mientras tanto `plan_efectivo`
+ya no toma como vigente una suscripción vencida, así que el momento del
+barrido no cambia lo que ve el usuario.
+"""
+import logging
+import threading
+from datetime import datetime, timezone
+
+from sqlalchemy import String, cast, exists, literal, select, text, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import aliased
+
+from app.core import planes
+from app.core.config import settings
+from app.core.metricas import SUSCRIPCIONES
+from app.modelos.modelos import Plan, Suscripcion
+
+logger = logging.getLogger(__name__)
+
+_LOCK_BARRIDO = 724_310_003
+PROVEEDOR_VENCIMIENTO = "vencimiento"
+
+
+def vencer(conn: Connection, ahora: datetime | None = None) -> dict:
+    ahora = ahora or datetime.now(timezone.utc)
+    tabla = Suscripcion.__table__
+
+    vencidas = conn.execute(
+        update(tabla)
+        .where(tabla.c.estado == "activa", tabla.c.fin.isnot(None), tabla.c.fin <= ahora)
+        .values(estado="cancelada")
+        .returning(tabla.c.id, tabla.c.user_id)
+    ).all()
+    if not vencidas:
+        return {"vencidas": 0, "a_free": 0, "usuarios": []}
+
+    # una fila por usuario: la última suscripción vencida
+    ultima: dict[int, int] = {}
+    for sid, uid in vencidas:
+        ultima[uid] = max(sid, ultima.get(uid, sid))
+
+    free = conn.execute(select(Plan.__table__.c.id).where(Plan.__table__.c.codigo == "free")).scalar()
+    a_free = 0
+    if free is not None:
+        otra = aliased(tabla)
+        sigue_vigente = exists().where(
+            otra.c.user_id == tabla.c.user_id,
+            otra.c.estado == "activa",
+            (otra.c.fin.is_(None)) | (otra.c.fin > ahora),
+        )
+        origen = select(
+            tabla.c.user_id,
+            literal(free),
+            literal("activa"),
+            literal(ahora),
+            literal(PROVEEDOR_VENCIMIENTO),
+            literal("suscripcion:") + cast(tabla.c.id, String),
+        ).where(tabla.c.id.in_(list(ultima.values())), ~sigue_vigente)
+        a_free = conn.execute(
+            tabla.insert().from_select(["user_id", "plan_id", "estado", "inicio", "proveedor", "proveedor_ref"], origen)
+        ).rowcount
+    else:
+        logger.error("No existe el plan FREE: %d usuarios vencidos quedan sin suscripción", len(ultima))
+
+    return {"vencidas": len(vencidas), "a_free": max(a_free, 0), "usuarios": sorted(ultima)}
+
+
+def barrer(engine) -> dict | None:
+    """Una pasada; en Postgres solo si ningún otro proceso está barriendo (None si no le tocó)."""
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            if not conn.execute(text("SELECT pg_try_advisory_xact_lock(:k)"), {"k": _LOCK_BARRIDO}).scalar():
+                return None
+        resultado = vencer(conn)
+    # ya commiteado: recién ahora se publica
+    if resultado["vencidas"]:
+        SUSCRIPCIONES.labels("vencida").inc(resultado["vencidas"])
+        SUSCRIPCIONES.labels("alta_free").inc(resultado["a_free"])
+        planes.invalidar(*resultado["usuarios"])
+        logger.info(
+            "Suscripciones vencidas: %d (usuarios %s), %d pasan a FREE",
+            resultado["vencidas"], resultado["usuarios"], resultado["a_free"],
+        )
+    return resultado
+
+
+# --- hilo periódico ---
+
+_detener = threading.Event()
+_hilo: threading.Thread | None = None
+
+
+def _bucle(engine, intervalo: float) -> None:
+    while True:
+        try:
+            barrer(engine)
+        except Exception:
+            logger.exception("Falló el barrido de suscripciones")
+        if _detener.wait(intervalo):
+            return
+
+
+def iniciar_barrido(engine) -> None:
+    global _hilo
+    intervalo = settings.SUSCRIPCIONES_BARRIDO_SECONDS
+    if intervalo <= 0 or (_hilo is not None and _hilo.is_alive()):
+        return
+    _detener.clear()
+    _hilo = threading.Thread(target=_bucle, args=(engine, intervalo), name="barrido-suscripciones", daemon=True)
+    _hilo.start()
+
+
+def detener_barrido() -> None:
+    _detener.set()
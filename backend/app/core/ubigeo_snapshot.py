@@ -0,0 +1,346 @@
+from __future__ import annotations
+
+import bisect
+import gzip
+import hashlib
+import json
+import logging
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from sqlalchemy import inspect, select, text
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.slug import slugify
+from app.db.conexion import SessionLocal
+from app.modelos.modelos import UbigeoDepartment, UbigeoProvince, UbigeoDistrict
+
+logger = logging.getLogger(__name__)
+
+EMPTY_JSON = b"[]"
+
+NIVELES = ("departamento", "provincia", "distrito")
+
+
+def _sort_key(name: str | None) -> tuple[bool, str]:
+    # NULL al final (como nullslast) y orden sin tildes: "Áncash" va junto a "Amazonas"
+    folded = unicodedata.normalize("NFKD", name or "").encode("ascii", "ignore").decode("ascii")
+    return (name is None, folded.lower())
+
+
+def _dump(rows: list[dict]) -> bytes:
+    return json.dumps(rows, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+@dataclass(frozen=True)
+class UbigeoSnapshot:
+    """
+    Copia inmutable del árbol ubigeo.
+    Las respuestas ya van serializadas por id padre, así que servirlas es un dict lookup.
+    """
+
+    version: str
+    departments: tuple[tuple[str, str], ...]
+    provinces: tuple[tuple[str, str, str], ...]
+    districts: tuple[tuple[str, str | None, str | None, str | None], ...]
+
+    departamentos_json: bytes = EMPTY_JSON
+    provincias_json: dict[str, bytes] = field(default_factory=dict)
+    distritos_json: dict[str, bytes] = field(default_factory=dict)
+
+    # árbol completo anidado (plano y gzip) para /ubigeo/arbol
+    arbol_json: bytes = EMPTY_JSON
+    arbol_gzip: bytes = b""
+
+    # índice de búsqueda: claves slugify ordenadas + entrada asociada
+    search_keys: tuple[str, ...] = ()
+    search_refs: tuple[tuple[int, int], ...] = ()  # (entrada, 0=nombre completo | 1=palabra)
+    search_entries: tuple[dict, ...] = ()
+
+    def etag(self, key: str = "") -> str:
+        return f'W/"{self.version}{"-" + key if key else ""}"'
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.departments
+
+    def buscar(self, q: str, limit: int = 20, scan_limit: int = 500) -> list[dict]:
+        """
+        Búsqueda por prefijo sin tildes (misma normalización que slugify)
+        sobre departamentos, provincias y distritos.
+        Cada nombre está indexado completo y por cada palabra, así "lurig" encuentra
+        "San Juan de Lurigancho". Prioriza coincidencia al inicio del nombre y luego el nivel.
+        """
+        prefix = slugify(q)
+        if not prefix:
+            return []
+
+        lo = bisect.bisect_left(self.search_keys, prefix)
+        hi = bisect.bisect_left(self.search_keys, prefix + "\x7f", lo)
+
+        best: dict[int, int] = {}
+        for i in range(lo, min(hi, lo + scan_limit)):
+            entry, kind = self.search_refs[i]
+            if kind < best.get(entry, 2):
+                best[entry] = kind
+
+        ranked = sorted(
+            best.items(),
+            key=lambda item: (item[1], self.search_entries[item[0]]["_rank"], item[0]),
+        )
+        return [
+            {k: v for k, v in self.search_entries[entry].items() if k != "_rank"}
+            for entry, _ in ranked[:limit]
+        ]
+
+
+def build_snapshot(
+    departments: list[tuple[str, str]],
+    provinces: list[tuple[str, str, str]],
+    districts: list[tuple[str, str | None, str | None, str | None]],
+) -> UbigeoSnapshot:
+    departments = sorted(departments, key=lambda d: _sort_key(d[1]))
+    provinces = sorted(provinces, key=lambda p: _sort_key(p[1]))
+    districts = sorted(districts, key=lambda d: _sort_key(d[1]))
+
+    prov_by_dept: dict[str, list[dict]] = {}
+    for pid, name, dept_id in provinces:
+        prov_by_dept.setdefault(dept_id, []).append({"id": pid, "name": name, "department_id": dept_id})
+
+    dist_by_prov: dict[str, list[dict]] = {}
+    for did, name, prov_id, dept_id in districts:
+        if not prov_id:
+            continue
+        dist_by_prov.setdefault(prov_id, []).append(
+            {"id": did, "name": name, "province_id": prov_id, "department_id": dept_id}
+        )
+
+    dept_names = {did: name for did, name in departments}
+    prov_names = {pid: name for pid, name, _ in provinces}
+
+    arbol = [
+        {
+            "id": did,
+            "name": name,
+            "provincias": [
+                {
+                    "id": p["id"],
+                    "name": p["name"],
+                    "distritos": [{"id": d["id"], "name": d["name"]} for d in dist_by_prov.get(p["id"], [])],
+                }
+                for p in prov_by_dept.get(did, [])
+            ],
+        }
+        for did, name in departments
+    ]
+    arbol_json = _dump(arbol)
+
+    entries: list[dict] = []
+    refs: list[tuple[str, int, int]] = []
+
+    def _index(entry: dict) -> None:
+        idx = len(entries)
+        entries.append(entry)
+        full = slugify(entry["name"] or "")
+        if not full:
+            return
+        refs.append((full, idx, 0))
+        words = full.split("-")
+        for pos in range(1, len(words)):
+            refs.append(("-".join(words[pos:]), idx, 1))
+
+    for did, name in departments:
+        _index({"nivel": NIVELES[0], "id": did, "name": name, "department_id": did, "province_id": None,
+                "label": name, "_rank": 0})
+    for pid, name, dept_id in provinces:
+        _index({"nivel": NIVELES[1], "id": pid, "name": name, "department_id": dept_id, "province_id": pid,
+                "label": ", ".join(x for x in (name, dept_names.get(dept_id)) if x), "_rank": 1})
+    for did, name, prov_id, dept_id in districts:
+        if not name:
+            continue
+        _index({"nivel": NIVELES[2], "id": did, "name": name, "department_id": dept_id, "province_id": prov_id,
+                "label": ", ".join(x for x in (name, prov_names.get(prov_id), dept_names.get(dept_id)) if x),
+                "_rank": 2})
+    refs.sort()
+
+    departamentos_json = _dump([{"id": did, "name": name} for did, name in departments])
+    provincias_json = {k: _dump(v) for k, v in prov_by_dept.items()}
+    distritos_json = {k: _dump(v) for k, v in dist_by_prov.items()}
+
+    digest = hashlib.sha1()
+    digest.update(departamentos_json)
+    for key in sorted(provincias_json):
+        digest.update(provincias_json[key])
+    for key in sorted(distritos_json):
+        digest.update(distritos_json[key])
+
+    return UbigeoSnapshot(
+        version=digest.hexdigest()[:16],
+        departments=tuple(departments),
+        provinces=tuple(provinces),
+        districts=tuple(districts),
+        departamentos_json=departamentos_json,
+        provincias_json=provincias_json,
+        distritos_json=distritos_json,
+        arbol_json=arbol_json,
+        arbol_gzip=gzip.compress(arbol_json, compresslevel=9, mtime=0),
+        search_keys=tuple(key for key, _, _ in refs),
+        search_refs=tuple((idx, kind) for _, idx, kind in refs),
+        search_entries=tuple(entries),
+    )
+
+
+def load_snapshot(db: Session) -> UbigeoSnapshot:
+    departments = [tuple(r) for r in db.execute(select(UbigeoDepartment.id, UbigeoDepartment.name))]
+    provinces = [
+        tuple(r)
+        for r in db.execute(select(UbigeoProvince.id, UbigeoProvince.name, UbigeoProvince.department_id))
+    ]
+    districts = [
+        tuple(r)
+        for r in db.execute(
+            select(
+                UbigeoDistrict.id,
+                UbigeoDistrict.name,
+                UbigeoDistrict.province_id,
+                UbigeoDistrict.department_id,
+            )
+        )
+    ]
+    return build_snapshot(departments, provinces, districts)
+
+
+# --- marca compartida entre workers ---
+# La fila 1 de `ubigeo_dataset` (la escribe app.scripts.bootstrap_db) es la
+# versión compartida del catálogo: cada escritura de ubigeo la toca en su misma
+# transacción y cada worker la compara, como mucho cada
+# UBIGEO_SNAPSHOT_CHECK_SECONDS, con la que tenía al cargar su snapshot.
+
+Marca = tuple | None
+
+
+def leer_marca(db: Session) -> Marca:
+    fila = db.execute(text("SELECT checksum, applied_at FROM ubigeo_dataset WHERE id = 1")).first()
+    return tuple(fila) if fila else None
+
+
+# checksum de `ubigeo_dataset` cuando el catálogo vino de /admin/ubigeo/import:
+# bootstrap_db no vuelve a sembrar el dataset incluido encima (salvo --force)
+CHECKSUM_EXTERNO = "externo"
+
+
+def marcar_cambio(db: Session) -> None:
+    """
+    Avisa a los demás workers que el catálogo cambió (en la transacción de `db`).
+    Mueve `applied_at` y deja CHECKSUM_EXTERNO: desde ahí el catálogo lo maneja el
+    import y el próximo arranque no vuelve a sembrar el dataset incluido encima.
+    """
+    if not inspect(db.connection()).has_table("ubigeo_dataset"):
+        logger.warning("Sin tabla ubigeo_dataset: los otros workers no verán el cambio de ubigeo")
+        return
+    db.execute(
+        text(
+            """
+            INSERT INTO ubigeo_dataset (id, version, checksum, applied_at)
+            VALUES (1, 'import', :checksum, :ahora)
+            ON CONFLICT (id) DO UPDATE SET
+                version = EXCLUDED.version,
+                checksum = EXCLUDED.checksum,
+                applied_at = EXCLUDED.applied_at
+            """
+        ),
+        {"checksum": CHECKSUM_EXTERNO, "ahora": datetime.now(timezone.utc)},
+    )
+
+
+_snapshot: UbigeoSnapshot | None = None
+_marca: Marca = None
+_chequeado = 0.0  # time.monotonic() del último vistazo a la marca
+_lock = threading.Lock()
+
+
+def reload_snapshot() -> UbigeoSnapshot:
+    """
+    Reconstruye el snapshot desde la BD y lo publica con un swap atómico
+    (los requests en curso siguen usando el anterior).
+    """
+    with _lock:
+        return _recargar()
+
+
+def _recargar() -> UbigeoSnapshot:
+    """reload_snapshot con `_lock` ya tomado."""
+    global _snapshot, _marca, _chequeado
+
+    with SessionLocal() as db:
+        # la marca antes que los datos: si cambia en el medio, se recarga de nuevo
+        marca = _leer_marca_segura(db)
+        nuevo = load_snapshot(db)
+    _snapshot, _marca, _chequeado = nuevo, marca, time.monotonic()
+
+    logger.info(
+        "Ubigeo snapshot %s cargado: departamentos=%d provincias=%d distritos=%d",
+        nuevo.version,
+        len(nuevo.departments),
+        len(nuevo.provinces),
+        len(nuevo.districts),
+    )
+    return nuevo
+
+
+def _leer_marca_segura(db: Session) -> Marca:
+    try:
+        return leer_marca(db)
+    except SQLAlchemyError:
+        # sin ubigeo_dataset (BD sin bootstrap) no hay nada que comparar
+        db.rollback()
+        return None
+
+
+def _toca_chequear() -> bool:
+    intervalo = settings.UBIGEO_SNAPSHOT_CHECK_SECONDS
+    return intervalo > 0 and time.monotonic() - _chequeado >= intervalo
+
+
+def _al_dia() -> bool:
+    """Compara la marca compartida con la del snapshot publicado (una query chica)."""
+    global _chequeado
+    _chequeado = time.monotonic()
+    try:
+        with SessionLocal() as db:
+            return _leer_marca_segura(db) == _marca
+    except SQLAlchemyError as exc:
+        # BD caída: se sigue sirviendo el snapshot que hay
+        logger.warning("No se pudo leer la marca de ubigeo: %s", exc)
+        return True
+
+
+def current_snapshot() -> UbigeoSnapshot | None:
+    """El snapshot publicado, sin cargarlo si todavía no existe."""
+    return _snapshot
+
+
+def get_snapshot() -> UbigeoSnapshot:
+    snap = _snapshot
+    if snap is not None and (not _toca_chequear() or _al_dia()):
+        return snap
+    with _lock:
+        # segundo chequeo bajo el lock: si otro hilo ya cargó (o recargó) mientras
+        # se esperaba, se usa ese en vez de volver a leer todo el catálogo
+        if _snapshot is not None and _snapshot is not snap:
+            return _snapshot
+        return _recargar()
+
+
+async def get_snapshot_async() -> UbigeoSnapshot:
+    """Como get_snapshot, pero la carga y el chequeo de la marca (sync) corren en el threadpool."""
+    snap = _snapshot
+    if snap is not None and not _toca_chequear():
+        return snap
+    return await run_in_threadpool(get_snapshot)
@@ -1,7 +1,13 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import time
+from functools import lru_cache
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from app.core.config import settings
+from app.core.metricas import instrumentar_pool, observar_checkout
 
 
 def normalize_db_url(url: str) -> str:
@@ -12,7 +18,155 @@ def normalize_db_url(url: str) -> str:
     return url
 
 
+class _TimedCheckout:
+    """Registra cuánto espera cada checkout (pool agotado = espera alta)."""
+
+    def _do_get(self):
+        t0 = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            observar_checkout(self._orig_logging_name or "db", time.perf_counter() - t0)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def _engine_kwargs(url: str, poolclass: type = TimedQueuePool, nombre: str = "sync") -> dict:
+    if not url.startswith("postgresql"):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_logging_name": nombre,  # etiqueta `pool` en las métricas
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        # timeout por defecto de la conexión; las rutas lo ajustan con SET LOCAL
+        "connect_args": {"options": f"-c statement_timeout={int(settings.DB_STATEMENT_TIMEOUT_MS)}"},
+    }
+
+
 DATABASE_URL = normalize_db_url(settings.DATABASE_URL)
+DATABASE_READ_URL = normalize_db_url(settings.DATABASE_READ_URL) if settings.DATABASE_READ_URL else ""
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+engine = create_engine(DATABASE_URL, **_engine_kwargs(DATABASE_URL))
+instrumentar_pool(engine, "sync")
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+
+def _set_local_timeout(connection, timeout_ms: int) -> None:
+    if connection.dialect.name == "postgresql":
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+
+
+@event.listens_for(SessionLocal, "after_begin")
+def _apply_statement_timeout(session: Session, transaction, connection) -> None:
+    # cada transacción de la sesión hereda el timeout de su clase de ruta
+    timeout_ms = session.info.get("statement_timeout_ms")
+    if timeout_ms:
+        _set_local_timeout(connection, timeout_ms)
+
+
+def set_statement_timeout(session: Session, timeout_ms: int) -> None:
+    """Fija el statement_timeout de la sesión (transacción actual y siguientes)."""
+    session.info["statement_timeout_ms"] = int(timeout_ms)
+    if session.in_transaction():
+        _set_local_timeout(session.connection(), timeout_ms)
+
+
+# ---------------------------------------------------------------------------
+# Engine async (psycopg3 async) para las rutas de lectura públicas.
+# Mientras esperan a Postgres no ocupan un hilo del threadpool.
+# ---------------------------------------------------------------------------
+
+
+class AsyncBridgeSession(Session):
+    """Session sync que envuelve cada AsyncSession (para registrarle eventos propios)."""
+
+
+event.listen(AsyncBridgeSession, "after_begin", _apply_statement_timeout)
+
+
+def async_db_url(url: str) -> str:
+    if url.startswith("sqlite:"):
+        # requiere aiosqlite (solo desarrollo)
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    return url  # postgresql+psycopg: create_async_engine elige la variante async
+
+
+@lru_cache(maxsize=1)
+def get_async_engine() -> AsyncEngine:
+    # se crea al primer uso: importar este módulo no exige un driver async
+    url = async_db_url(DATABASE_URL)
+    async_engine = create_async_engine(url, **_engine_kwargs(url, TimedAsyncQueuePool, "async"))
+    instrumentar_pool(async_engine, "async")
+    return async_engine
+
+
+@lru_cache(maxsize=1)
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(
+        bind=get_async_engine(),
+        autoflush=False,
+        expire_on_commit=False,
+        sync_session_class=AsyncBridgeSession,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_async_read_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    """Sesiones contra la réplica (DATABASE_READ_URL); sin réplica, las mismas de la primaria."""
+    if not DATABASE_READ_URL:
+        return get_async_sessionmaker()
+    return async_sessionmaker(
+        bind=get_async_read_engine(),
+        autoflush=False,
+        expire_on_commit=False,
+        sync_session_class=AsyncBridgeSession,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_async_read_engine() -> AsyncEngine:
+    if not DATABASE_READ_URL:
+        return get_async_engine()
+    url = async_db_url(DATABASE_READ_URL)
+    read_engine = create_async_engine(url, **_engine_kwargs(url, TimedAsyncQueuePool, "async_read"))
+    instrumentar_pool(read_engine, "async_read")
+    return read_engine
+
+
+async def set_statement_timeout_async(session: AsyncSession, timeout_ms: int) -> None:
+    session.info["statement_timeout_ms"] = int(timeout_ms)
+    if session.in_transaction() and session.bind.dialect.name == "postgresql":
+        await session.execute(text(f"SET LOCAL statement_timeout = {int(timeout_ms)}"))
+
+
+def _queue_pool_stats(pool) -> dict:
+    if not isinstance(pool, QueuePool):
+        return {"class": type(pool).__name__}
+    return {
+        "class": type(pool).__name__,
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "timeout": settings.DB_POOL_TIMEOUT,
+    }
+
+
+def pool_stats() -> dict:
+    stats = _queue_pool_stats(engine.pool)
+    if get_async_engine.cache_info().currsize:
+        stats["async"] = _queue_pool_stats(get_async_engine().pool)
+    if DATABASE_READ_URL and get_async_read_engine.cache_info().currsize:
+        stats["async_read"] = _queue_pool_stats(get_async_read_engine().pool)
+    return stats
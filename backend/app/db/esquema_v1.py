@@ -0,0 +1,221 @@
+"""
+Esquema de la migración 1, congelado.
+
+Es la copia de los modelos tal como estaban cuando se introdujeron las
+migraciones versionadas (lo que antes creaba `create_all` en cada arranque).
+No se toca nunca: los cambios posteriores van en migraciones nuevas, así una
+BD vacía recorre exactamente el mismo DDL que producción.
+"""
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Integer,
+    MetaData,
+    Numeric,
+    String,
+    Table,
+    Text,
+    func,
+)
+
+metadata = MetaData()
+
+
+def _creado() -> Column:
+    return Column("created_at", DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+def _actualizado() -> Column:
+    return Column("updated_at", DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+Table(
+    "users",
+    metadata,
+    Column("id", BigInteger, primary_key=True, autoincrement=True),
+    Column("role", String(20), nullable=False),
+    Column("first_name", String(80), nullable=False),
+    Column("last_name", String(80), nullable=False),
+    Column("email", String(255), nullable=False, unique=True, index=True),
+    Column("hashed_password", String(255), nullable=False),
+    Column("business_name", String(120)),
+    Column("phone", String(40)),
+    Column("player_position", String(40)),
+    Column("jersey_number", Integer),
+    Column("avatar_url", Text),
+    Column("is_active", Boolean, nullable=False),
+    _creado(),
+    _actualizado(),
+)
+
+Table(
+    "login_otps",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("email", String(255), nullable=False, index=True),
+    Column("code_hash", String(255), nullable=False),
+    Column("expires_at", DateTime(timezone=True), nullable=False),
+    Column("attempts", Integer, nullable=False),
+    _creado(),
+)
+
+Table(
+    "complejos",
+    metadata,
+    Column("id", BigInteger, primary_key=True, autoincrement=True),
+    Column("nombre", String(160), nullable=False),
+    Column("slug", String(220), nullable=False, unique=True, index=True),
+    Column("descripcion", Text),
+    Column("direccion", String(240)),
+    Column("distrito", String(120)),
+    Column("provincia", String(120)),
+    Column("departamento", String(120)),
+    Column("latitud", Numeric),
+    Column("longitud", Numeric),
+    Column("techada", Boolean, nullable=False),
+    Column("iluminacion", Boolean, nullable=False),
+    Column("vestuarios", Boolean, nullable=False),
+    Column("estacionamiento", Boolean, nullable=False),
+    Column("cafeteria", Boolean, nullable=False),
+    Column("foto_url", Text),
+    Column("is_active", Boolean, nullable=False),
+    Column("owner_id", BigInteger, ForeignKey("users.id", ondelete="SET NULL")),
+    Column("created_by", BigInteger, ForeignKey("users.id", ondelete="SET NULL")),
+    _creado(),
+    _actualizado(),
+)
+
+Table(
+    "canchas",
+    metadata,
+    Column("id", BigInteger, primary_key=True, autoincrement=True),
+    Column("nombre", String(140), nullable=False),
+    Column("descripcion", Text),
+    Column("latitud", Numeric),
+    Column("longitud", Numeric),
+    Column("tipo", String(20), nullable=False),
+    Column("pasto", String(20), nullable=False),
+    Column("precio_hora", Numeric(10, 2), nullable=False),
+    Column("rating", Numeric(3, 2), nullable=False),
+    Column("is_active", Boolean, nullable=False),
+    Column("owner_id", BigInteger, ForeignKey("users.id", ondelete="SET NULL")),
+    Column("created_by", BigInteger, ForeignKey("users.id", ondelete="SET NULL")),
+    _creado(),
+    _actualizado(),
+    Column("complejo_id", BigInteger, ForeignKey("complejos.id", ondelete="SET NULL")),
+)
+
+Table(
+    "cancha_imagenes",
+    metadata,
+    Column("id", BigInteger, primary_key=True, autoincrement=True, index=True),
+    Column("cancha_id", BigInteger, ForeignKey("canchas.id", ondelete="CASCADE"), nullable=False, index=True),
+    Column("url", Text, nullable=False),
+    Column("orden", Integer, nullable=False),
+    _creado(),
+)
+
+Table(
+    "complejo_imagenes",
+    metadata,
+    Column("id", BigInteger, primary_key=True, autoincrement=True, index=True),
+    Column("complejo_id", BigInteger, ForeignKey("complejos.id", ondelete="CASCADE"), nullable=False, index=True),
+    Column("url", Text, nullable=False),
+    Column("orden", Integer, nullable=False),
+    Column("is_cover", Boolean, nullable=False),
+    _creado(),
+)
+
+Table(
+    "complejo_likes",
+    metadata,
+    Column("id", BigInteger, primary_key=True, autoincrement=True, index=True),
+    Column("complejo_id", BigInteger, ForeignKey("complejos.id", ondelete="CASCADE"), nullable=False, index=True),
+    Column("user_id", BigInteger, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True),
+    _creado(),
+)
+
+Table(
+    "reclamos_cancha",
+    metadata,
+    Column("id", BigInteger, primary_key=True, autoincrement=True),
+    Column("cancha_id", BigInteger, ForeignKey("canchas.id", ondelete="CASCADE"), nullable=False),
+    Column("solicitante_id", BigInteger, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("mensaje", Text),
+    Column("evidencia_url", Text),
+    Column("estado", String(20), nullable=False),
+    Column("resuelto_por", BigInteger, ForeignKey("users.id", ondelete="SET NULL")),
+    Column("creado_en", DateTime(timezone=True), server_default=func.now(), nullable=False),
+    Column("resuelto_en", DateTime(timezone=True)),
+)
+
+Table(
+    "reservas",
+    metadata,
+    Column("id", BigInteger, primary_key=True, autoincrement=True),
+    Column("cancha_id", BigInteger, ForeignKey("canchas.id", ondelete="CASCADE"), nullable=False, index=True),
+    Column("cliente_id", BigInteger, ForeignKey("users.id", ondelete="SET NULL")),
+    Column("start_at", DateTime, nullable=False),
+    Column("end_at", DateTime, nullable=False),
+    Column("total_amount", Numeric(10, 2), nullable=False),
+    Column("paid_amount", Numeric(10, 2), nullable=False),
+    Column("payment_method", String(30)),
+    Column("payment_status", String(20), nullable=False),
+    Column("notas", Text),
+    Column("created_by", BigInteger, ForeignKey("users.id", ondelete="SET NULL")),
+    _creado(),
+    _actualizado(),
+)
+
+Table(
+    "planes",
+    metadata,
+    Column("id", BigInteger, primary_key=True, autoincrement=True),
+    Column("codigo", String(40), nullable=False, unique=True),
+    Column("nombre", String(80), nullable=False),
+    Column("precio_mensual", Numeric(10, 2), nullable=False),
+    Column("limite_canchas", Integer, nullable=False),
+    Column("permite_estadisticas", Boolean, nullable=False),
+    Column("permite_marketing", Boolean, nullable=False),
+    _creado(),
+)
+
+Table(
+    "suscripciones",
+    metadata,
+    Column("id", BigInteger, primary_key=True, autoincrement=True),
+    Column("user_id", BigInteger, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True),
+    Column("plan_id", BigInteger, ForeignKey("planes.id", ondelete="RESTRICT"), nullable=False, index=True),
+    Column("estado", String(20), nullable=False),
+    Column("inicio", DateTime(timezone=True), server_default=func.now(), nullable=False),
+    Column("fin", DateTime(timezone=True)),
+    Column("proveedor", String(40)),
+    Column("proveedor_ref", String(120)),
+)
+
+Table(
+    "ubigeo_peru_departments",
+    metadata,
+    Column("id", String(2), primary_key=True),
+    Column("name", String(45), nullable=False),
+)
+
+Table(
+    "ubigeo_peru_provinces",
+    metadata,
+    Column("id", String(4), primary_key=True),
+    Column("name", String(45), nullable=False),
+    Column("department_id", String(2), ForeignKey("ubigeo_peru_departments.id"), nullable=False, index=True),
+)
+
+Table(
+    "ubigeo_peru_districts",
+    metadata,
+    Column("id", String(6), primary_key=True),
+    Column("name", String(45)),
+    Column("province_id", String(4), ForeignKey("ubigeo_peru_provinces.id"), index=True),
+    Column("department_id", String(2), ForeignKey("ubigeo_peru_departments.id"), index=True),
+)
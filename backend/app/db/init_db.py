@@ -1,52 +1,81 @@
 import logging
 
+from app.core.config import settings
 from app.db.conexion import SessionLocal, engine
-from app.modelos.base import Base
-import app.modelos.modelos  # noqa: F401
+from app.db.migraciones import aplicar_migraciones, verificar_esquema
+from app.db.particiones import asegurar_particiones
 from app.modelos.modelos import Plan
 from app.scripts.bootstrap_db import bootstrap_ubigeo
 
 logger = logging.getLogger(__name__)
 
+PLANES_BASE = {
+    "free": {
+        "nombre": "Plan Free",
+        "precio_mensual": 0,
+        "limite_canchas": 1,
+        "permite_estadisticas": False,
+        "permite_marketing": False,
+    },
+    "pro": {
+        "nombre": "Plan Pro",
+        "precio_mensual": 69.9,
+        "limite_canchas": 3,
+        "permite_estadisticas": True,
+        "permite_marketing": True,
+    },
+}
 
-def _ensure_plan(db_session, codigo: str, defaults: dict) -> Plan:
-    plan = db_session.query(Plan).filter(Plan.codigo == codigo).first()
-    if plan:
-        return plan
-    plan = Plan(codigo=codigo, **defaults)
-    db_session.add(plan)
-    db_session.commit()
-    db_session.refresh(plan)
-    return plan
 
+def seed_planes() -> list[str]:
+    """Inserta los planes base que falten (una query + un commit)."""
+    with SessionLocal() as db:
+        existentes = {c for (c,) in db.query(Plan.codigo).filter(Plan.codigo.in_(PLANES_BASE)).all()}
+        faltantes = [codigo for codigo in PLANES_BASE if codigo not in existentes]
+        for codigo in faltantes:
+            db.add(Plan(codigo=codigo, **PLANES_BASE[codigo]))
+        if faltantes:
+            db.commit()
+    return faltantes
 
-def init_db() -> None:
-    Base.metadata.create_all(bind=engine)
+
+def seed_db() -> None:
+    creados = seed_planes()
+    if creados:
+        logger.info("Planes creados: %s", ", ".join(creados))
     try:
-        bootstrap_ubigeo()
+        bootstrap_ubigeo(engine)
     except Exception as exc:
         logger.warning("Bootstrap ubigeo failed: %s", exc)
 
-    with SessionLocal() as db:
-        _ensure_plan(
-            db,
-            "free",
-            {
-                "nombre": "Plan Free",
-                "precio_mensual": 0,
-                "limite_canchas": 1,
-                "permite_estadisticas": False,
-                "permite_marketing": False,
-            },
-        )
-        _ensure_plan(
-            db,
-            "pro",
-            {
-                "nombre": "Plan Pro",
-                "precio_mensual": 69.9,
-                "limite_canchas": 3,
-                "permite_estadisticas": True,
-                "permite_marketing": True,
-            },
-        )
+
+def init_db() -> None:
+    """Setup completo: migraciones + seeds. Pensado para CLI / pre-deploy."""
+    aplicar_migraciones(engine)
+    # cada deploy deja creadas las particiones de los próximos meses
+    with engine.begin() as conn:
+        nuevas = asegurar_particiones(conn)
+    if nuevas:
+        logger.info("Particiones creadas: %s", ", ".join(nuevas))
+    seed_db()
+
+
+def startup_db() -> None:
+    """
+    Lo que corre al levantar la API, según DB_STARTUP_MODE:
+    - check   (default): solo lee schema_version; falla rápido si faltan migraciones
+    - migrate: aplica migraciones pendientes (sin seeds)
+    - full:    migraciones + seeds (comportamiento anterior, útil en local)
+    """
+    mode = (settings.DB_STARTUP_MODE or "check").strip().lower()
+    if mode == "full":
+        init_db()
+    elif mode == "migrate":
+        aplicar_migraciones(engine)
+    else:
+        verificar_esquema(engine)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    init_db()
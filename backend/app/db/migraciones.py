@@ -0,0 +1,230 @@
+"""
+Migraciones de esquema versionadas.
+
+Cada migración tiene un número creciente y se registra en `schema_version`.
+El arranque de la API solo lee la versión aplicada (una query); las migraciones
+se ejecutan explícitamente con `python -m app.scripts.db migrate` (pre-deploy).
+"""
+import logging
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.modelos.base import Base
+import app.modelos.modelos  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+# clave arbitraria para pg_advisory_xact_lock: evita que dos deploys migren a la vez
+_LOCK_KEY = 724_310_001
+
+
+@dataclass(frozen=True)
+class Migracion:
+    version: int
+    nombre: str
+    aplicar: Callable[[Connection], None]
+
+
+def _sql(*statements: str) -> Callable[[Connection], None]:
+    def aplicar(conn: Connection) -> None:
+        for sql in statements:
+            conn.execute(text(sql))
+
+    return aplicar
+
+
+def _columnas(tabla: str, columnas: list[tuple[str, str]]) -> Callable[[Connection], None]:
+    """ADD COLUMN solo para las que falten (portable, sin depender de IF NOT EXISTS)."""
+
+    def aplicar(conn: Connection) -> None:
+        existentes = {c["name"] for c in inspect(conn).get_columns(tabla)}
+        for nombre, tipo in columnas:
+            if nombre not in existentes:
+                conn.execute(text(f"ALTER TABLE {tabla} ADD COLUMN {nombre} {tipo}"))
+
+    return aplicar
+
+
+def _pasos(*pasos: Callable[[Connection], None]) -> Callable[[Connection], None]:
+    def aplicar(conn: Connection) -> None:
+        for paso in pasos:
+            paso(conn)
+
+    return aplicar
+
+
+def _solo_postgres(*statements: str) -> Callable[[Connection], None]:
+    def aplicar(conn: Connection) -> None:
+        if conn.dialect.name == "postgresql":
+            _sql(*statements)(conn)
+
+    return aplicar
+
+
+def _backfill_busqueda(conn: Connection) -> None:
+    from app.core.busqueda import recalcular
+
+    n = recalcular(conn)
+    logger.info("search_text calculado para %d reservas", len(n))
+
+
+def _tabla(nombre: str) -> Callable[[Connection], None]:
+    """CREATE TABLE (con sus índices) según el modelo, si no existe."""
+
+    def aplicar(conn: Connection) -> None:
+        Base.metadata.tables[nombre].create(bind=conn, checkfirst=True)
+
+    return aplicar
+
+
+def _backfill_rollup(conn: Connection) -> None:
+    from app.core.estadisticas import reconciliar
+
+    logger.info("Rollup de reservas: %s", reconciliar(conn))
+
+
+def _particionar_reservas(conn: Connection) -> None:
+    from app.db.particiones import convertir
+
+    convertir(conn)
+
+
+def _esquema_inicial(conn: Connection) -> None:
+    # Base de partida congelada (lo que antes hacía create_all en cada arranque):
+    # no sale de los modelos actuales, así una BD vacía pasa por el DDL de 2..N.
+    from app.db import esquema_v1
+
+    esquema_v1.metadata.create_all(bind=conn)
+
+
+MIGRACIONES: list[Migracion] = [
+    Migracion(1, "esquema_inicial", _esquema_inicial),
+    Migracion(
+        2,
+        "imagenes_placeholder",
+        _pasos(
+            _columnas("cancha_imagenes", [("placeholder", "TEXT"), ("ancho", "INTEGER"), ("alto", "INTEGER")]),
+            _columnas("complejo_imagenes", [("placeholder", "TEXT"), ("ancho", "INTEGER"), ("alto", "INTEGER")]),
+            _columnas("complejos", [("foto_placeholder", "TEXT"), ("foto_ancho", "INTEGER"), ("foto_alto", "INTEGER")]),
+        ),
+    ),
+    Migracion(
+        3,
+        "reservas_busqueda",
+        _pasos(
+            _columnas("reservas", [("search_text", "TEXT")]),
+            _backfill_busqueda,
+            _solo_postgres(
+                "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+                "CREATE INDEX IF NOT EXISTS ix_reservas_search_trgm ON reservas USING gin (search_text gin_trgm_ops)",
+            ),
+        ),
+    ),
+    Migracion(
+        4,
+        "reservas_indices",
+        _sql(
+            "CREATE INDEX IF NOT EXISTS ix_reservas_cancha_activa ON reservas (cancha_id, start_at, end_at) "
+            "WHERE payment_status <> 'cancelada'",
+            "CREATE INDEX IF NOT EXISTS ix_reservas_cancha_start ON reservas (cancha_id, start_at, id)",
+            "CREATE INDEX IF NOT EXISTS ix_reservas_cliente_start ON reservas (cliente_id, start_at)",
+            "CREATE INDEX IF NOT EXISTS ix_reservas_start_id ON reservas (start_at, id)",
+            # ix_reservas_cancha_start ya empieza por cancha_id
+            "DROP INDEX IF EXISTS ix_reservas_cancha_id",
+            "CREATE INDEX IF NOT EXISTS ix_canchas_owner_id ON canchas (owner_id)",
+            "CREATE INDEX IF NOT EXISTS ix_canchas_complejo_id ON canchas (complejo_id)",
+            "CREATE INDEX IF NOT EXISTS ix_complejos_owner_id ON complejos (owner_id)",
+            "ANALYZE reservas",
+        ),
+    ),
+    Migracion(5, "reservas_diarias", _pasos(_tabla("reservas_diarias"), _backfill_rollup)),
+    # solo Postgres: reservas pasa a particionarse por mes (start_at); en SQLite no hace nada
+    Migracion(6, "reservas_particionadas", _particionar_reservas),
+    Migracion(
+        7,
+        "suscripciones_vencimiento",
+        _sql("CREATE INDEX IF NOT EXISTS ix_suscripciones_activas_fin ON suscripciones (fin) WHERE estado = 'activa'"),
+    ),
+    Migracion(
+        8,
+        "reclamos_indices",
+        _sql(
+            "CREATE INDEX IF NOT EXISTS ix_reclamos_estado_id ON reclamos_cancha (estado, id)",
+            "CREATE INDEX IF NOT EXISTS ix_reclamos_cancha_cancha_id ON reclamos_cancha (cancha_id)",
+            "CREATE INDEX IF NOT EXISTS ix_reclamos_cancha_solicitante_id ON reclamos_cancha (solicitante_id)",
+        ),
+    ),
+]
+
+VERSION_ESPERADA = max(m.version for m in MIGRACIONES)
+
+
+class EsquemaDesactualizado(RuntimeError):
+    pass
+
+
+def _crear_tabla_version(conn: Connection) -> None:
+    conn.execute(
+        text(
+            """
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                nombre VARCHAR(120) NOT NULL,
+                applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+        )
+    )
+
+
+def version_actual(conn: Connection) -> int:
+    """Versión aplicada; 0 si la tabla no existe todavía."""
+    try:
+        with conn.begin_nested():
+            return int(conn.scalar(text("SELECT COALESCE(MAX(version), 0) FROM schema_version")) or 0)
+    except Exception:
+        return 0
+
+
+def verificar_esquema(engine: Engine) -> int:
+    """
+    Chequeo de arranque: una sola query a `schema_version`.
+    Lanza EsquemaDesactualizado si faltan migraciones.
+    """
+    with engine.connect() as conn:
+        version = version_actual(conn)
+    if version < VERSION_ESPERADA:
+        raise EsquemaDesactualizado(
+            f"Esquema en versión {version}, se esperaba {VERSION_ESPERADA}. "
+            "Ejecuta: python -m app.scripts.db migrate"
+        )
+    return version
+
+
+def aplicar_migraciones(engine: Engine) -> list[int]:
+    """Aplica las migraciones pendientes, cada una en su propia transacción."""
+    aplicadas: list[int] = []
+    with engine.begin() as conn:
+        _crear_tabla_version(conn)
+
+    for m in MIGRACIONES:
+        with engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                conn.execute(text("SELECT pg_advisory_xact_lock(:k)"), {"k": _LOCK_KEY})
+            ya = conn.scalar(text("SELECT 1 FROM schema_version WHERE version = :v"), {"v": m.version})
+            if ya:
+                continue
+            logger.info("Aplicando migración %03d_%s", m.version, m.nombre)
+            m.aplicar(conn)
+            conn.execute(
+                text("INSERT INTO schema_version (version, nombre) VALUES (:v, :n)"),
+                {"v": m.version, "n": m.nombre},
+            )
+            aplicadas.append(m.version)
+
+    if not aplicadas:
+        logger.info("Esquema al día (versión %d)", VERSION_ESPERADA)
+    return aplicadas
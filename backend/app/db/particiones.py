@@ -0,0 +1,247 @@
+"""
+Particionado mensual de `reservas` por `start_at` (solo Postgres).
+
+La tabla padre es `PARTITION BY RANGE (start_at)` con una partición por mes
+(`reservas_pAAAA_MM`) y una `reservas_default` para lo que quede fuera. La PK
+pasa a ser (id, start_at) porque Postgres exige la clave de partición en los
+índices únicos; para el ORM la identidad sigue siendo `id`.
+
+Para que el planner descarte particiones, los filtros por solape llevan además
+una cota inferior sobre start_at (`DURACION_MAXIMA`): ver `solape()`.
+
+Operación (app/scripts/particiones.py): crear meses futuros, y archivar meses
+viejos a CSV comprimido y sacarlos de la tabla.
+"""
+import gzip
+import logging
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from app.modelos.modelos import Reserva
+
+logger = logging.getLogger(__name__)
+
+PADRE = "reservas"
+DEFAULT = "reservas_default"
+MESES_ADELANTE = 6
+
+# ninguna reserva dura más que esto (crear_reserva lo valida)
+DURACION_MAXIMA = timedelta(hours=24)
+
+
+def solape(inicio: datetime, fin: datetime, inclusivo: bool = False) -> list:
+    """Condiciones de "la reserva toca [inicio, fin)" que además permiten pruning por start_at."""
+    # la cota sigue al extremo: con `end_at >= inicio` una reserva de 24 h justas que
+    # termina en `inicio` empieza exactamente en `inicio - DURACION_MAXIMA`
+    if inclusivo:
+        return [Reserva.start_at <= fin, Reserva.end_at >= inicio, Reserva.start_at >= inicio - DURACION_MAXIMA]
+    return [Reserva.start_at < fin, Reserva.end_at > inicio, Reserva.start_at > inicio - DURACION_MAXIMA]
+
+
+# --- meses ---
+
+
+def _mes(d: date | datetime) -> date:
+    return date(d.year, d.month, 1)
+
+
+def _siguiente(m: date) -> date:
+    return date(m.year + (m.month == 12), m.month % 12 + 1, 1)
+
+
+def nombre_particion(mes: date) -> str:
+    return f"{PADRE}_p{mes:%Y_%m}"
+
+
+def _meses(desde: date, hasta: date) -> list[date]:
+    out, m = [], _mes(desde)
+    while m <= hasta:
+        out.append(m)
+        m = _siguiente(m)
+    return out
+
+
+# --- estado ---
+
+
+def es_postgres(conn: Connection) -> bool:
+    return conn.dialect.name == "postgresql"
+
+
+def esta_particionada(conn: Connection) -> bool:
+    if not es_postgres(conn):
+        return False
+    return conn.scalar(text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:t)"), {"t": PADRE}) == "p"
+
+
+def listar(conn: Connection) -> list[dict]:
+    filas = conn.execute(
+        text(
+            """
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), c.reltuples::bigint,
+                   pg_total_relation_size(c.oid)
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(:t)
+            ORDER BY c.relname
+            """
+        ),
+        {"t": PADRE},
+    )
+    return [{"particion": n, "rango": r, "filas_estimadas": max(int(f), 0), "bytes": int(b)} for n, r, f, b in filas]
+
+
+# --- creación ---
+
+
+def crear_particion(conn: Connection, mes: date) -> bool:
+    """
+    Crea la partición del mes si falta. Las filas de ese mes que hubieran caído
+    en la default se mueven antes de adjuntarla (si no, ATTACH falla).
+    """
+    nombre = nombre_particion(mes)
+    if conn.scalar(text("SELECT to_regclass(:t)"), {"t": nombre}) is not None:
+        return False
+    desde, hasta = mes, _siguiente(mes)
+    conn.execute(text(f"CREATE TABLE {nombre} (LIKE {PADRE} INCLUDING DEFAULTS)"))
+    conn.execute(
+        text(
+            f"""
+            WITH movidas AS (
+                DELETE FROM {DEFAULT} WHERE start_at >= :desde AND start_at < :hasta RETURNING *
+            )
+            INSERT INTO {nombre} SELECT * FROM movidas
+            """
+        ),
+        {"desde": desde, "hasta": hasta},
+    )
+    conn.execute(
+        text(f"ALTER TABLE {PADRE} ATTACH PARTITION {nombre} FOR VALUES FROM ('{desde}') TO ('{hasta}')")
+    )
+    logger.info("Partición %s creada", nombre)
+    return True
+
+
+def asegurar_particiones(conn: Connection, meses_adelante: int = MESES_ADELANTE) -> list[str]:
+    """Particiones desde el mes actual hasta `meses_adelante` (no-op si la tabla no está particionada)."""
+    if not esta_particionada(conn):
+        return []
+    hoy = date.today()
+    ultimo = _mes(hoy)
+    for _ in range(meses_adelante):
+        ultimo = _siguiente(ultimo)
+    return [nombre_particion(m) for m in _meses(hoy, ultimo) if crear_particion(conn, m)]
+
+
+# --- conversión (migración 6) ---
+
+_INDICES_EXTRA = (
+    "CREATE INDEX IF NOT EXISTS ix_reservas_search_trgm ON reservas USING gin (search_text gin_trgm_ops)",
+)
+
+_FKS = (
+    "ALTER TABLE reservas ADD CONSTRAINT reservas_cancha_id_fkey "
+    "FOREIGN KEY (cancha_id) REFERENCES canchas(id) ON DELETE CASCADE",
+    "ALTER TABLE reservas ADD CONSTRAINT reservas_cliente_id_fkey "
+    "FOREIGN KEY (cliente_id) REFERENCES users(id) ON DELETE SET NULL",
+    "ALTER TABLE reservas ADD CONSTRAINT reservas_created_by_fkey "
+    "FOREIGN KEY (created_by) REFERENCES users(id) ON DELETE SET NULL",
+)
+
+
+def convertir(conn: Connection, meses_adelante: int = MESES_ADELANTE) -> None:
+    """Reemplaza `reservas` por una tabla particionada con los mismos datos, índices y FKs."""
+    if not es_postgres(conn) or esta_particionada(conn):
+        return
+
+    secuencia = conn.scalar(text("SELECT pg_get_serial_sequence('reservas', 'id')"))
+    primero, = conn.execute(text("SELECT min(start_at) FROM reservas")).one()
+
+    conn.execute(text("ALTER TABLE reservas RENAME TO reservas_legacy"))
+    if secuencia:
+        conn.execute(text(f"ALTER SEQUENCE {secuencia} OWNED BY NONE"))
+    conn.execute(
+        text("CREATE TABLE reservas (LIKE reservas_legacy INCLUDING DEFAULTS) PARTITION BY RANGE (start_at)")
+    )
+    conn.execute(text(f"CREATE TABLE {DEFAULT} PARTITION OF reservas DEFAULT"))
+
+    hoy = date.today()
+    ultimo = _mes(hoy)
+    for _ in range(meses_adelante):
+        ultimo = _siguiente(ultimo)
+    for m in _meses(min(_mes(primero), _mes(hoy)) if primero else _mes(hoy), ultimo):
+        conn.execute(
+            text(
+                f"CREATE TABLE {nombre_particion(m)} PARTITION OF reservas "
+                f"FOR VALUES FROM ('{m}') TO ('{_siguiente(m)}')"
+            )
+        )
+
+    conn.execute(text("INSERT INTO reservas SELECT * FROM reservas_legacy"))
+    # al borrar la vieja quedan libres los nombres de PK, índices y FKs
+    conn.execute(text("DROP TABLE reservas_legacy"))
+    if secuencia:
+        conn.execute(text(f"ALTER SEQUENCE {secuencia} OWNED BY reservas.id"))
+
+    conn.execute(text("ALTER TABLE reservas ADD CONSTRAINT reservas_pkey PRIMARY KEY (id, start_at)"))
+    for indice in Reserva.__table__.indexes:
+        indice.create(bind=conn, checkfirst=True)
+    for sql in (*_INDICES_EXTRA, *_FKS):
+        conn.execute(text(sql))
+    conn.execute(text("ANALYZE reservas"))
+
+
+# --- archivo ---
+
+
+def _raw_copy(conn: Connection, sql: str):
+    return conn.connection.driver_connection.cursor().copy(sql)
+
+
+def archivar(engine: Engine, mes: date, carpeta: Path, borrar: bool = True) -> dict:
+    """
+    Exporta la partición del mes a `carpeta/reservas_pAAAA_MM.csv.gz`, la separa
+    de `reservas` y (si `borrar`) la elimina. El archivo se escribe completo
+    antes de tocar la tabla.
+    """
+    nombre = nombre_particion(mes)
+    carpeta.mkdir(parents=True, exist_ok=True)
+    destino = carpeta / f"{nombre}.csv.gz"
+    temporal = destino.with_suffix(".gz.part")
+
+    with engine.begin() as conn:
+        if conn.scalar(text("SELECT to_regclass(:t)"), {"t": nombre}) is None:
+            raise ValueError(f"No existe la partición {nombre}")
+        esperadas = conn.scalar(text(f"SELECT count(*) FROM {nombre}"))
+        with gzip.open(temporal, "wb") as gz, _raw_copy(conn, f"COPY {nombre} TO STDOUT WITH (FORMAT csv, HEADER)") as copy:
+            for bloque in copy:
+                gz.write(bloque)
+    temporal.replace(destino)
+
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE {PADRE} DETACH PARTITION {nombre}"))
+        if borrar:
+            conn.execute(text(f"DROP TABLE {nombre}"))
+
+    logger.info("Partición %s archivada en %s (%d filas)", nombre, destino, esperadas)
+    return {"particion": nombre, "archivo": str(destino), "filas": int(esperadas), "borrada": borrar}
+
+
+def restaurar(engine: Engine, archivo: Path) -> int:
+    """Vuelve a cargar un CSV archivado en `reservas` (crea la partición del mes si hace falta)."""
+    nombre = archivo.name.split(".")[0]
+    anio, mes = nombre.rsplit("_p", 1)[1].split("_")
+    with engine.begin() as conn:
+        crear_particion(conn, date(int(anio), int(mes), 1))
+        with gzip.open(archivo, "rb") as gz, _raw_copy(conn, f"COPY {PADRE} FROM STDIN WITH (FORMAT csv, HEADER)") as copy:
+            while bloque := gz.read(1 << 16):
+                copy.write(bloque)
+        return int(
+            conn.scalar(
+                text(f"SELECT count(*) FROM {PADRE} WHERE start_at >= :d AND start_at < :h"),
+                {"d": date(int(anio), int(mes), 1), "h": _siguiente(date(int(anio), int(mes), 1))},
+            )
+        )
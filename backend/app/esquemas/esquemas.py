@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Optional, Literal
 from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from datetime import datetime
+from datetime import date, datetime
 
 Role = Literal["usuario", "propietario", "admin"]
 PaymentStatus = Literal["pendiente", "parcial", "pagada", "cancelada"]
@@ -95,6 +95,10 @@ class CanchaImagenOut(BaseModel):
     url: str
     orden: int
 
+    placeholder: Optional[str] = None
+    ancho: Optional[int] = None
+    alto: Optional[int] = None
+
 
 class CanchaOut(BaseModel):
     """
@@ -125,12 +129,16 @@ class CanchaOut(BaseModel):
     complejo_id: Optional[int] = None
     complejo_nombre: Optional[str] = None
     complejo_foto_url: Optional[str] = None  # ✅ solo UNA vez
+    complejo_foto_placeholder: Optional[str] = None
 
     # coordenadas del complejo
     latitud: Optional[float] = None
     longitud: Optional[float] = None
 
     imagen_principal: Optional[str] = None
+    imagen_principal_placeholder: Optional[str] = None
+    imagen_principal_ancho: Optional[int] = None
+    imagen_principal_alto: Optional[int] = None
     imagenes: list[CanchaImagenOut] = Field(default_factory=list)
 
 
@@ -162,6 +170,9 @@ class ReclamoCrear(BaseModel):
     evidencia_url: Optional[str] = None
 
 
+ReclamoEstado = Literal["pendiente", "aprobado", "rechazado"]
+
+
 class ReclamoOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -171,6 +182,9 @@ class ReclamoOut(BaseModel):
     estado: str
     mensaje: Optional[str] = None
     evidencia_url: Optional[str] = None
+    creado_en: Optional[datetime] = None
+    resuelto_por: Optional[int] = None
+    resuelto_en: Optional[datetime] = None
 
 
 class ReclamoResolver(BaseModel):
@@ -178,6 +192,14 @@ class ReclamoResolver(BaseModel):
     nuevo_owner_id: Optional[int] = None
 
 
+class ReclamoResolverItem(ReclamoResolver):
+    id: int
+
+
+class ReclamosResolverLote(BaseModel):
+    reclamos: list[ReclamoResolverItem] = Field(min_length=1, max_length=200)
+
+
 # =========================
 # Complejos
 # =========================
@@ -243,6 +265,9 @@ class ComplejoOut(BaseModel):
     cafeteria: bool
 
     foto_url: Optional[str] = None
+    foto_placeholder: Optional[str] = None
+    foto_ancho: Optional[int] = None
+    foto_alto: Optional[int] = None
 
     is_active: bool
     owner_id: Optional[int] = None
@@ -268,6 +293,9 @@ class ComplejoPublicOut(BaseModel):
     cafeteria: bool
 
     foto_url: Optional[str] = None
+    foto_placeholder: Optional[str] = None
+    foto_ancho: Optional[int] = None
+    foto_alto: Optional[int] = None
     is_active: bool
     owner_phone: Optional[str] = None
 
@@ -282,6 +310,10 @@ class ComplejoImagenOut(BaseModel):
     orden: int
     is_cover: bool = False
 
+    placeholder: Optional[str] = None
+    ancho: Optional[int] = None
+    alto: Optional[int] = None
+
 
 class ComplejoPerfilOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -304,6 +336,9 @@ class ComplejoPerfilOut(BaseModel):
     cafeteria: bool
 
     foto_url: Optional[str] = None
+    foto_placeholder: Optional[str] = None
+    foto_ancho: Optional[int] = None
+    foto_alto: Optional[int] = None
     is_active: bool
     owner_id: Optional[int] = None
     owner_phone: Optional[str] = None
@@ -364,6 +399,75 @@ class ReservaOut(BaseModel):
     fecha_inicio: Optional[datetime] = None
     fecha_fin: Optional[datetime] = None
 
+class CalendarioCeldaOut(BaseModel):
+    """Un día x una cancha del calendario mensual (sin canceladas, salvo el conteo)."""
+    fecha: date
+    cancha_id: int
+    cancha_nombre: Optional[str] = None
+    reservas: int
+    horas: float
+    total: float
+    pagado: float
+    canceladas: int = 0
+
+class CalendarioMesOut(BaseModel):
+    year: int
+    month: int
+    celdas: list[CalendarioCeldaOut]
+    reservas: int
+    horas: float
+    total: float
+    pagado: float
+
+class EstadisticaGrupoOut(BaseModel):
+    id: int
+    nombre: Optional[str] = None
+    complejo_id: Optional[int] = None
+    reservas: int
+    canceladas: int
+    horas: float
+    ocupacion: float  # horas reservadas / horas reservables del rango
+    total: float
+    pagado: float
+    pendiente: float
+
+class EstadisticaHoraOut(BaseModel):
+    hora: int
+    reservas: int
+    horas: float
+
+class EstadisticasOut(BaseModel):
+    desde: date
+    hasta: date
+    reservas: int
+    canceladas: int
+    horas: float
+    horas_disponibles: float
+    ocupacion: float
+    total: float
+    pagado: float
+    pendiente: float
+    por_cancha: list[EstadisticaGrupoOut]
+    por_complejo: list[EstadisticaGrupoOut]
+    horas_pico: list[EstadisticaHoraOut]
+
+class HeatmapCanchaOut(BaseModel):
+    cancha_id: int
+    nombre: Optional[str] = None
+    horas: list[list[float]]  # 7 x 24
+    utilizacion: list[list[float]]
+
+class HeatmapOut(BaseModel):
+    desde: date
+    hasta: date
+    semanas: int
+    dias: list[str]
+    horas: list[list[float]]  # 7 (lun..dom) x 24, horas reservadas sumando canchas
+    utilizacion: list[list[float]]  # % de capacidad de cada celda
+    utilizacion_franja: float  # % dentro del horario reservable
+    canchas: int
+    por_cancha: Optional[list[HeatmapCanchaOut]] = None
+
 class PlanActualOut(BaseModel):
     plan_id: int
     plan_codigo: str
@@ -395,3 +499,25 @@ class UbigeoDistrictOut(BaseModel):
     department_id: str | None = None
     class Config:
         from_attributes = True
+
+class UbigeoArbolDistritoOut(BaseModel):
+    id: str
+    name: str | None = None
+
+class UbigeoArbolProvinciaOut(BaseModel):
+    id: str
+    name: str
+    distritos: list[UbigeoArbolDistritoOut] = Field(default_factory=list)
+
+class UbigeoArbolOut(BaseModel):
+    id: str
+    name: str
+    provincias: list[UbigeoArbolProvinciaOut] = Field(default_factory=list)
+
+class UbigeoBusquedaOut(BaseModel):
+    nivel: Literal["departamento", "provincia", "distrito"]
+    id: str
+    name: str
+    label: str
+    department_id: str | None = None
+    province_id: str | None = None
@@ -1,22 +1,33 @@
 from pathlib import Path
 
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
 from app.core.config import settings
+from app.core.consultas import query_stats_middleware
+from app.core.metricas import marcar_proceso_terminado, metrics_middleware, registrar_observador_db
+from app.core.replica import sticky_primary_middleware
+from app.core.perfilador import instrumentar_endpoints, instrumentar_sql, profiling_middleware
+from app.core.salud import readiness
+from app.core.suscripciones import detener_barrido, iniciar_barrido
 from app.routers.auth import router as auth_router
 from app.routers.canchas_publicas import router as canchas_publicas_router
 from app.routers.complejos_publicos import router as complejos_publicos_router
 from app.routers.admin_canchas import router as admin_canchas_router
 from app.routers.reclamos import router as reclamos_router
 from app.routers.admin_complejos import router as admin_complejos_router
-from app.db.init_db import init_db
+from app.db.conexion import engine
+from app.db.init_db import startup_db
 from app.routers import admin_cancha_imagenes
 from app.routers.admin_ubigeo import router as admin_ubigeo_router
 from app.routers.perfil import router as perfil_router
 from app.routers.panel_propietario import router as panel_router
 from app.routers.ubigeo import router as ubigeo_router
+from app.routers.admin_db import router as admin_db_router
+from app.routers.metricas import router as metricas_router
+from app.routers.admin_profiles import router as admin_profiles_router
 
 app = FastAPI(title="Backend ProyectoCanchas", version="1.0.0")
 
@@ -47,9 +58,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
     max_age=86400,  # ✅ cachea el preflight (OPTIONS) 24h
 )
 
+# ✅ lecturas públicas a la réplica, salvo que el cliente acabe de escribir
+app.middleware("http")(sticky_primary_middleware)
+
+# ✅ queries y tiempo de BD por request (Server-Timing + aviso de N+1)
+app.middleware("http")(query_stats_middleware)
+
+# ✅ latencia por ruta, requests en curso, threadpool (/metrics)
+app.middleware("http")(metrics_middleware)
+registrar_observador_db()
+
 
 # ✅ Routers
 app.include_router(auth_router)
@@ -63,12 +85,36 @@ app.include_router(admin_ubigeo_router)
 app.include_router(perfil_router)
 app.include_router(panel_router)
 app.include_router(ubigeo_router)
+app.include_router(admin_db_router)
+app.include_router(metricas_router)
+app.include_router(admin_profiles_router)
 
 @app.get("/healthz")
 def health():
     return {"ok": True}
 
 
+# ✅ readiness: BD (cacheada), pool, uploads y ubigeo; 503 solo si falla la BD o uploads
+@app.get("/readyz")
+def ready():
+    estado = readiness()
+    return JSONResponse(estado, status_code=200 if estado["ready"] else 503)
+
+
+# ✅ profiling bajo demanda (admin con X-Profile: 1, o regla de muestreo)
+if settings.PROFILING_ENABLED:
+    instrumentar_sql()
+    instrumentar_endpoints(app)
+    app.middleware("http")(profiling_middleware)
+
+
 @app.on_event("startup")
 def on_startup():
-    init_db()
+    startup_db()
+    iniciar_barrido(engine)
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    detener_barrido()
+    marcar_proceso_terminado()
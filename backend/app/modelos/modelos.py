@@ -6,9 +6,12 @@ from sqlalchemy import (
     Text,
     Numeric,
     Integer,
+    Date,
     DateTime,
     ForeignKey,
+    Index,
     func,
+    text,
 )
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from app.modelos.base import Base
@@ -94,10 +97,13 @@ class Complejo(Base):
     
     # ✅ CLAVE: ahora sí está mapeado en ORM (antes faltaba)
     foto_url = Column(Text)
+    foto_placeholder = Column(Text)  # LQIP: data URI WebP 16px
+    foto_ancho = Column(Integer)
+    foto_alto = Column(Integer)
     
     is_active = Column(Boolean, nullable=False, default=True)
 
-    owner_id = Column(BigInteger, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    owner_id = Column(BigInteger, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
     created_by = Column(BigInteger, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
     
     owner = relationship("User", back_populates="complejos", foreign_keys=[owner_id])
@@ -155,13 +161,13 @@ class Cancha(Base):
     rating = Column(Numeric(3, 2), nullable=False, default=0)
     is_active = Column(Boolean, nullable=False, default=True)
 
-    owner_id = Column(BigInteger, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    owner_id = Column(BigInteger, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
     created_by = Column(BigInteger, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
 
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
-    complejo_id = Column(BigInteger, ForeignKey("complejos.id", ondelete="SET NULL"), nullable=True)
+    complejo_id = Column(BigInteger, ForeignKey("complejos.id", ondelete="SET NULL"), nullable=True, index=True)
 
     complejo = relationship("Complejo", back_populates="canchas")
     owner = relationship("User", back_populates="canchas", foreign_keys=[owner_id])
@@ -186,6 +192,18 @@ class Cancha(Base):
     def imagen_principal(self):
         return self.imagenes[0].url if self.imagenes else None
 
+    @property
+    def imagen_principal_placeholder(self):
+        return self.imagenes[0].placeholder if self.imagenes else None
+
+    @property
+    def imagen_principal_ancho(self):
+        return self.imagenes[0].ancho if self.imagenes else None
+
+    @property
+    def imagen_principal_alto(self):
+        return self.imagenes[0].alto if self.imagenes else None
+
     # ========= Campos "derivados" del complejo (para tu CanchaOut público) =========
     @property
     def distrito(self):
@@ -240,6 +258,10 @@ class Cancha(Base):
     def complejo_foto_url(self):
         return self.complejo.foto_url if self.complejo else None
 
+    @property
+    def complejo_foto_placeholder(self):
+        return self.complejo.foto_placeholder if self.complejo else None
+
 
 # =========================
 # Imágenes de Cancha
@@ -253,6 +275,11 @@ class CanchaImagen(Base):
     url = Column(Text, nullable=False)
     orden = Column(Integer, nullable=False, default=0)
 
+    # ✅ placeholder precalculado al subir (LQIP + tamaño intrínseco)
+    placeholder = Column(Text)
+    ancho = Column(Integer)
+    alto = Column(Integer)
+
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     cancha = relationship("Cancha", back_populates="imagenes")
@@ -271,6 +298,11 @@ class ComplejoImagen(Base):
     orden = Column(Integer, nullable=False, default=0)
     is_cover = Column(Boolean, nullable=False, default=False)
 
+    # ✅ placeholder precalculado al subir (LQIP + tamaño intrínseco)
+    placeholder = Column(Text)
+    ancho = Column(Integer)
+    alto = Column(Integer)
+
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     complejo = relationship("Complejo", back_populates="imagenes")
@@ -297,11 +329,13 @@ class ComplejoLike(Base):
 # =========================
 class ReclamoCancha(Base):
     __tablename__ = "reclamos_cancha"
+    # cola del admin: por estado, más recientes primero (keyset sobre id)
+    __table_args__ = (Index("ix_reclamos_estado_id", "estado", "id"),)
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
 
-    cancha_id = Column(BigInteger, ForeignKey("canchas.id", ondelete="CASCADE"), nullable=False)
-    solicitante_id = Column(BigInteger, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    cancha_id = Column(BigInteger, ForeignKey("canchas.id", ondelete="CASCADE"), nullable=False, index=True)
+    solicitante_id = Column(BigInteger, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
 
     mensaje = Column(Text)
     evidencia_url = Column(Text)
@@ -312,12 +346,33 @@ class ReclamoCancha(Base):
     creado_en = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     resuelto_en = Column(DateTime(timezone=True), nullable=True)
 
+_RESERVA_ACTIVA = text("payment_status <> 'cancelada'")
+
+
 class Reserva(Base):
     __tablename__ = "reservas"
+    # ✅ índices según los accesos reales (migración 4; ver app/scripts/explain_reservas.py)
+    __table_args__ = (
+        # solape / horarios del día: cancha + rango, sin canceladas
+        Index(
+            "ix_reservas_cancha_activa",
+            "cancha_id",
+            "start_at",
+            "end_at",
+            postgresql_where=_RESERVA_ACTIVA,
+            sqlite_where=_RESERVA_ACTIVA,
+        ),
+        # listados por cancha con keyset (start_at, id)
+        Index("ix_reservas_cancha_start", "cancha_id", "start_at", "id"),
+        # historial del usuario
+        Index("ix_reservas_cliente_start", "cliente_id", "start_at"),
+        # listado admin con keyset
+        Index("ix_reservas_start_id", "start_at", "id"),
+    )
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
 
-    cancha_id = Column(BigInteger, ForeignKey("canchas.id", ondelete="CASCADE"), nullable=False, index=True)
+    cancha_id = Column(BigInteger, ForeignKey("canchas.id", ondelete="CASCADE"), nullable=False)
     cliente_id = Column(BigInteger, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
 
     start_at = Column(DateTime, nullable=False)  # TIMESTAMP (naive)
@@ -331,6 +386,9 @@ class Reserva(Base):
 
     notas = Column(Text)
 
+    # cliente + cancha + estado normalizados (ver app/core/busqueda.py)
+    search_text = Column(Text)
+
     created_by = Column(BigInteger, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
 
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -356,6 +414,23 @@ class Reserva(Base):
 # =========================
 # Planes / Suscripciones
 # =========================
+class ReservaDiaria(Base):
+    """Rollup de reservas por cancha, día y hora (lo mantiene app/core/estadisticas.py)."""
+    __tablename__ = "reservas_diarias"
+    __table_args__ = (Index("ix_reservas_diarias_fecha", "fecha"),)
+
+    cancha_id = Column(BigInteger, ForeignKey("canchas.id", ondelete="CASCADE"), primary_key=True)
+    fecha = Column(Date, primary_key=True)
+    hora = Column(Integer, primary_key=True)  # 0-23
+
+    # conteos y montos van en la hora de inicio; los minutos se reparten por hora ocupada
+    reservas = Column(Integer, nullable=False, default=0)  # sin canceladas
+    canceladas = Column(Integer, nullable=False, default=0)
+    minutos = Column(Integer, nullable=False, default=0)
+    total = Column(Numeric(12, 2), nullable=False, default=0)
+    pagado = Column(Numeric(12, 2), nullable=False, default=0)
+
+
 class Plan(Base):
     __tablename__ = "planes"
 
@@ -373,8 +448,20 @@ class Plan(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
 
+_SUSCRIPCION_ACTIVA = text("estado = 'activa'")
+
+
 class Suscripcion(Base):
     __tablename__ = "suscripciones"
+    # barrido de vencimientos: solo las activas, por fecha de fin
+    __table_args__ = (
+        Index(
+            "ix_suscripciones_activas_fin",
+            "fin",
+            postgresql_where=_SUSCRIPCION_ACTIVA,
+            sqlite_where=_SUSCRIPCION_ACTIVA,
+        ),
+    )
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
 
@@ -4,6 +4,8 @@ from pathlib import Path
 import uuid
 
 from app.core.deps import get_db, require_role
+from app.core.images import placeholder_o_vacio
+from app.core.metricas import UPLOADS
 from app.modelos.modelos import Cancha, CanchaImagen
 
 router = APIRouter(prefix="/admin/canchas", tags=["admin-canchas-imagenes"])
@@ -48,12 +50,22 @@ async def subir_imagen(cancha_id: int, request: Request, archivo: UploadFile = F
     )
     orden = (ultimo.orden + 1) if ultimo else 0
 
-    img = CanchaImagen(cancha_id=cancha_id, url=url, orden=orden)
+    meta = placeholder_o_vacio(data)
+
+    img = CanchaImagen(cancha_id=cancha_id, url=url, orden=orden, **meta)
     db.add(img)
     db.commit()
     db.refresh(img)
-
-    return {"id": img.id, "url": img.url, "orden": img.orden}
+    UPLOADS.labels("cancha").inc()
+
+    return {
+        "id": img.id,
+        "url": img.url,
+        "orden": img.orden,
+        "placeholder": img.placeholder,
+        "ancho": img.ancho,
+        "alto": img.alto,
+    }
 
 
 @router.get("/{cancha_id}/imagenes", dependencies=[Depends(require_role("admin"))])
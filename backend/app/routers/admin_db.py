@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends
+
+from app.core.config import settings
+from app.core.deps import require_role
+from app.core.metricas import espera_checkout
+from app.db.conexion import pool_stats
+
+router = APIRouter(prefix="/admin/db", tags=["admin-db"])
+
+
+@router.get("/pool", dependencies=[Depends(require_role("admin"))])
+def estado_pool():
+    """
+    Estado del pool de este proceso y la espera de checkout por pool, leída del
+    histograma de Prometheus (agregado entre workers si hay PROMETHEUS_MULTIPROC_DIR).
+    """
+    return {
+        "pool": pool_stats(),
+        "checkout_wait_seconds": espera_checkout(),
+        "statement_timeout_ms": {
+            "default": settings.DB_STATEMENT_TIMEOUT_MS,
+            "public": settings.DB_PUBLIC_STATEMENT_TIMEOUT_MS,
+            "export": settings.DB_EXPORT_STATEMENT_TIMEOUT_MS,
+        },
+    }
@@ -0,0 +1,61 @@
+import json
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from pydantic import BaseModel, Field
+
+from app.core.deps import require_role
+from app.core.perfilador import listar_perfiles, quitar_regla, regla_actual, ruta_perfil, set_regla
+
+router = APIRouter(
+    prefix="/admin/profiles",
+    tags=["admin-profiles"],
+    dependencies=[Depends(require_role("admin"))],
+)
+
+
+class ReglaIn(BaseModel):
+    path: str = Field(..., min_length=1, description="prefijo de path, ej. /panel/reservas")
+    rate: float = Field(0.05, gt=0, le=1)
+    minutos: float = Field(15, gt=0, le=24 * 60)
+
+
+def _regla_out():
+    regla = regla_actual()
+    if regla is None:
+        return None
+    return {"path": regla.path, "rate": regla.rate, "until": regla.until}
+
+
+@router.get("")
+def perfiles():
+    return {"regla": _regla_out(), "items": listar_perfiles()}
+
+
+@router.post("/regla")
+def crear_regla(payload: ReglaIn):
+    """Muestrea `rate` de los requests cuyo path empieza con `path` (solo en este proceso)."""
+    set_regla(payload.path, payload.rate, payload.minutos)
+    return {"regla": _regla_out()}
+
+
+@router.delete("/regla")
+def borrar_regla():
+    quitar_regla()
+    return {"ok": True}
+
+
+@router.get("/{perfil_id}")
+def ver_perfil(perfil_id: str):
+    p = ruta_perfil(perfil_id, "json")
+    if not p:
+        raise HTTPException(404, "Perfil no encontrado")
+    return json.loads(p.read_text(encoding="utf-8"))
+
+
+@router.get("/{perfil_id}/descargar")
+def descargar_perfil(perfil_id: str):
+    p = ruta_perfil(perfil_id, "prof")
+    if not p:
+        raise HTTPException(404, "Perfil no encontrado")
+    return FileResponse(p, media_type="application/octet-stream", filename=f"{perfil_id}.prof")
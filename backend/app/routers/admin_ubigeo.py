@@ -1,13 +1,17 @@
 import csv
 import json
 import logging
+import time
 from io import StringIO
 from typing import Any
 
 from fastapi import APIRouter, Body, Depends, File, HTTPException, Query, UploadFile
+from sqlalchemy import delete, func, literal_column, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
 from app.core.deps import get_db, require_role
+from app.core.ubigeo_snapshot import marcar_cambio, reload_snapshot
 from app.modelos.modelos import UbigeoDepartment, UbigeoProvince, UbigeoDistrict
 
 router = APIRouter(prefix="/admin/ubigeo", tags=["admin-ubigeo"])
@@ -108,62 +112,117 @@ def _ensure_province_id(row: dict[str, Any], fallback: str | None = None) -> str
     return ""
 
 
-def _upsert_department(db: Session, row: dict[str, Any]) -> bool:
-    dept_id = _to_str(row.get("id") or row.get("codigo") or row.get("department_id"))
-    name = _to_str(row.get("name") or row.get("nombre"))
-    if not dept_id or not name:
-        return False
-    obj = db.get(UbigeoDepartment, dept_id)
-    if obj:
-        obj.name = name
-        return False
-    db.add(UbigeoDepartment(id=dept_id, name=name))
-    return True
-
-
-def _upsert_province(db: Session, row: dict[str, Any]) -> bool:
-    province_id = _to_str(row.get("id") or row.get("codigo"))
-    name = _to_str(row.get("name") or row.get("nombre"))
-    if not province_id or not name:
-        return False
-    dept_id = _ensure_department_id(row, province_id)
-    if len(dept_id) != 2:
-        return False
-    obj = db.get(UbigeoProvince, province_id)
-    if obj:
-        obj.name = name
-        obj.department_id = dept_id
-        return False
-    db.add(UbigeoProvince(id=province_id, name=name, department_id=dept_id))
-    return True
-
-
-def _upsert_district(db: Session, row: dict[str, Any]) -> bool:
-    district_id = _to_str(row.get("id") or row.get("codigo"))
-    if not district_id:
-        return False
-    name = _to_str(row.get("name") or row.get("nombre"))
-    province_id = _ensure_province_id(row, district_id)
-    department_id = _ensure_department_id(row, district_id)
-    obj = db.get(UbigeoDistrict, district_id)
-    if obj:
-        if name:
-            obj.name = name
-        if province_id:
-            obj.province_id = province_id
-        if department_id:
-            obj.department_id = department_id
-        return False
-
-    db.add(
-        UbigeoDistrict(
-            id=district_id,
-            name=name or None,
-            province_id=province_id or None,
-            department_id=department_id or None,
-        )
-    )
-    return True
+BATCH_SIZE = 1000
+MAX_ERRORS = 200
+
+
+def _error(errors: list[dict[str, Any]], tipo: str, fila: int, row_id: str, mensaje: str) -> None:
+    errors.append({"tipo": tipo, "fila": fila, "id": row_id or None, "error": mensaje})
+
+
+def _normalize_departments(rows: list[dict[str, Any]], errors: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    result: dict[str, dict[str, Any]] = {}
+    for fila, row in enumerate(rows, start=1):
+        dept_id = _to_str(row.get("id") or row.get("codigo") or row.get("department_id"))
+        name = _to_str(row.get("name") or row.get("nombre"))
+        if not dept_id or not name:
+            _error(errors, "departments", fila, dept_id, "Falta id o nombre")
+            continue
+        if len(dept_id) != 2:
+            _error(errors, "departments", fila, dept_id, "El id de departamento debe tener 2 dígitos")
+            continue
+        result[dept_id] = {"id": dept_id, "name": name}
+    return result
+
+
+def _normalize_provinces(
+    rows: list[dict[str, Any]],
+    dept_ids: set[str],
+    errors: list[dict[str, Any]],
+) -> dict[str, dict[str, Any]]:
+    result: dict[str, dict[str, Any]] = {}
+    for fila, row in enumerate(rows, start=1):
+        province_id = _to_str(row.get("id") or row.get("codigo"))
+        name = _to_str(row.get("name") or row.get("nombre"))
+        if not province_id or not name:
+            _error(errors, "provinces", fila, province_id, "Falta id o nombre")
+            continue
+        dept_id = _ensure_department_id(row, province_id)
+        if len(dept_id) != 2:
+            _error(errors, "provinces", fila, province_id, "No se pudo deducir el departamento")
+            continue
+        if dept_id not in dept_ids:
+            _error(errors, "provinces", fila, province_id, f"Departamento {dept_id} no existe")
+            continue
+        result[province_id] = {"id": province_id, "name": name, "department_id": dept_id}
+    return result
+
+
+def _normalize_districts(
+    rows: list[dict[str, Any]],
+    dept_ids: set[str],
+    province_ids: set[str],
+    errors: list[dict[str, Any]],
+) -> dict[str, dict[str, Any]]:
+    result: dict[str, dict[str, Any]] = {}
+    for fila, row in enumerate(rows, start=1):
+        district_id = _to_str(row.get("id") or row.get("codigo"))
+        if not district_id:
+            _error(errors, "districts", fila, district_id, "Falta id")
+            continue
+        name = _to_str(row.get("name") or row.get("nombre"))
+        province_id = _ensure_province_id(row, district_id)
+        department_id = _ensure_department_id(row, district_id)
+        if province_id and province_id not in province_ids:
+            _error(errors, "districts", fila, district_id, f"Provincia {province_id} no existe")
+            continue
+        if department_id and department_id not in dept_ids:
+            _error(errors, "districts", fila, district_id, f"Departamento {department_id} no existe")
+            continue
+        result[district_id] = {
+            "id": district_id,
+            "name": name or None,
+            "province_id": province_id or None,
+            "department_id": department_id or None,
+        }
+    return result
+
+
+def _bulk_upsert(db: Session, model, rows: list[dict[str, Any]], update_cols: dict[str, Any]) -> tuple[int, int]:
+    """
+    INSERT ... ON CONFLICT (id) DO UPDATE multi-fila, en lotes.
+    Devuelve (insertados, actualizados) usando xmax = 0 para distinguir filas nuevas.
+    """
+    inserted = 0
+    updated = 0
+    table = model.__table__
+    for i in range(0, len(rows), BATCH_SIZE):
+        batch = rows[i:i + BATCH_SIZE]
+        stmt = pg_insert(table).values(batch)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.id],
+            set_={col: expr(stmt.excluded, table) for col, expr in update_cols.items()},
+        ).returning(literal_column("(xmax = 0)"))
+        for (was_insert,) in db.execute(stmt):
+            if was_insert:
+                inserted += 1
+            else:
+                updated += 1
+    return inserted, updated
+
+
+_DEPARTMENT_UPDATE = {"name": lambda ex, t: ex.name}
+_PROVINCE_UPDATE = {"name": lambda ex, t: ex.name, "department_id": lambda ex, t: ex.department_id}
+# distritos: como antes, solo se pisan los campos que vienen informados
+_DISTRICT_UPDATE = {
+    "name": lambda ex, t: func.coalesce(ex.name, t.c.name),
+    "province_id": lambda ex, t: func.coalesce(ex.province_id, t.c.province_id),
+    "department_id": lambda ex, t: func.coalesce(ex.department_id, t.c.department_id),
+}
+
+
+def _ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 2)
 
 
 @router.post("/import", dependencies=[Depends(require_role("admin"))])
@@ -174,39 +233,75 @@ async def importar_ubigeo(
     replace: bool = Query(False, description="Si es true, reemplaza los registros actuales"),
     db: Session = Depends(get_db),
 ) -> dict[str, Any]:
+    t0 = time.perf_counter()
     data = await _gather_payload(file, payload)
     if not any(data.values()):
         raise HTTPException(400, "Se necesita data de ubigeo para importar")
+    timings = {"parse_ms": _ms(t0)}
 
+    # 1) normalización y validación en memoria (sin ORM ni identity map)
+    t1 = time.perf_counter()
+    errors: list[dict[str, Any]] = []
     if replace:
-        db.query(UbigeoDistrict).delete(synchronize_session=False)
-        db.query(UbigeoProvince).delete(synchronize_session=False)
-        db.query(UbigeoDepartment).delete(synchronize_session=False)
-        db.commit()
-        logger.info("Ubigeo total borrado antes de la importación")
-
+        existing_depts: set[str] = set()
+        existing_provs: set[str] = set()
+    else:
+        existing_depts = set(db.scalars(select(UbigeoDepartment.id)))
+        existing_provs = set(db.scalars(select(UbigeoProvince.id)))
+
+    departments = _normalize_departments(data.get("departments", []), errors)
+    dept_ids = existing_depts | departments.keys()
+    provinces = _normalize_provinces(data.get("provinces", []), dept_ids, errors)
+    province_ids = existing_provs | provinces.keys()
+    districts = _normalize_districts(data.get("districts", []), dept_ids, province_ids, errors)
+    timings["normalize_ms"] = _ms(t1)
+
+    # 2) escritura set-based; con replace todo va en una sola transacción
+    t2 = time.perf_counter()
     stats = {"departments": 0, "provinces": 0, "districts": 0}
+    updated = {"departments": 0, "provinces": 0, "districts": 0}
+    try:
+        if replace:
+            db.execute(delete(UbigeoDistrict))
+            db.execute(delete(UbigeoProvince))
+            db.execute(delete(UbigeoDepartment))
+            logger.info("Ubigeo total borrado antes de la importación")
+
+        stats["departments"], updated["departments"] = _bulk_upsert(
+            db, UbigeoDepartment, list(departments.values()), _DEPARTMENT_UPDATE
+        )
+        stats["provinces"], updated["provinces"] = _bulk_upsert(
+            db, UbigeoProvince, list(provinces.values()), _PROVINCE_UPDATE
+        )
+        stats["districts"], updated["districts"] = _bulk_upsert(
+            db, UbigeoDistrict, list(districts.values()), _DISTRICT_UPDATE
+        )
+        marcar_cambio(db)  # los demás workers recargan su snapshot al ver la marca nueva
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    timings["write_ms"] = _ms(t2)
 
-    for row in data.get("departments", []):
-        if _upsert_department(db, row):
-            stats["departments"] += 1
-
-    for row in data.get("provinces", []):
-        if _upsert_province(db, row):
-            stats["provinces"] += 1
-
-    for row in data.get("districts", []):
-        if _upsert_district(db, row):
-            stats["districts"] += 1
+    try:
+        reload_snapshot()
+    except Exception as exc:
+        logger.warning("No se pudo recargar el snapshot de ubigeo: %s", exc)
+    timings["total_ms"] = _ms(t0)
 
-    db.commit()
     logger.info(
-        "Importación de ubigeo completada; departamentos=%d provincias=%d distritos=%d",
+        "Importación de ubigeo completada; departamentos=%d provincias=%d distritos=%d errores=%d (%.1f ms)",
         stats["departments"],
         stats["provinces"],
         stats["districts"],
+        len(errors),
+        timings["total_ms"],
     )
     return {
         "imported": stats,
+        "updated": updated,
         "replace": replace,
+        "errors": errors[:MAX_ERRORS],
+        "errors_total": len(errors),
+        "timings": timings,
     }
@@ -1,33 +1,35 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
-from app.core.deps import get_db
+from app.core.deps import get_async_read_db, timeout_lectura_publica_async
 from app.modelos.modelos import Cancha, Complejo
 from app.esquemas.esquemas import CanchaOut, ComplejoPublicOut
 
-router = APIRouter(prefix="", tags=["public-canchas"])
+router = APIRouter(prefix="", tags=["public-canchas"], dependencies=[Depends(timeout_lectura_publica_async)])
 
 @router.get("/complejos", response_model=list[ComplejoPublicOut])
-def listar_complejos_publicos(db: Session = Depends(get_db)):
-    return (
-        db.query(Complejo)
+async def listar_complejos_publicos(db: AsyncSession = Depends(get_async_read_db)):
+    result = await db.execute(
+        select(Complejo)
         .options(
             joinedload(Complejo.canchas).joinedload(Cancha.imagenes),
             joinedload(Complejo.owner),
         )
         .filter(Complejo.is_active == True)
         .order_by(Complejo.id.desc())
-        .all()
     )
+    return result.unique().scalars().all()
 
 @router.get("/canchas", response_model=list[CanchaOut])
-def listar_canchas_publicas(db: Session = Depends(get_db)):
-    return (
-        db.query(Cancha)
+async def listar_canchas_publicas(db: AsyncSession = Depends(get_async_read_db)):
+    result = await db.execute(
+        select(Cancha)
         .options(
             joinedload(Cancha.complejo).joinedload(Complejo.owner),  # ✅ trae users.phone
             joinedload(Cancha.imagenes),
         )
         .order_by(Cancha.id.desc())
-        .all()
     )
+    return result.unique().scalars().all()
@@ -2,14 +2,19 @@ from datetime import date, datetime, timedelta
 
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 from pathlib import Path
 import uuid
 
-from app.core.deps import get_db, get_usuario_actual, require_role
-from app.core.images import resize_square_image
+from app.core.deps import get_async_read_db, get_db, get_usuario_actual, require_role, timeout_lectura_publica_async
+from app.core.estadisticas import HORA_APERTURA, HORA_CIERRE
+from app.core.images import placeholder_o_vacio, resize_square_image
+from app.core.metricas import UPLOADS
 from app.core.seguridad import decodificar_token
 from app.core.slug import slugify
+from app.db import particiones
 from app.modelos.modelos import Complejo, ComplejoImagen, ComplejoLike, Cancha, Reserva, User
 from app.esquemas.esquemas import ComplejoPerfilOut, ComplejoActualizar, ComplejoImagenOut
 
@@ -57,9 +62,9 @@ def _float_or_none(v):
         return None
 
 
-def get_usuario_opcional(
+async def get_usuario_opcional(
     token: str | None = Depends(oauth2_optional),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ) -> User | None:
     if not token:
         return None
@@ -68,28 +73,33 @@ def get_usuario_opcional(
         user_id = int(data.get("sub"))
     except Exception:
         return None
-    u = db.query(User).filter(User.id == user_id).first()
+    u = await db.get(User, user_id)
     if not u or not u.is_active:
         return None
     return u
 
 
-@router.get("/public/complejos/{slug}", response_model=ComplejoPerfilOut)
-def obtener_complejo_publico(
+@router.get("/public/complejos/{slug}", response_model=ComplejoPerfilOut, dependencies=[Depends(timeout_lectura_publica_async)])
+async def obtener_complejo_publico(
     slug: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     u: User | None = Depends(get_usuario_opcional),
 ):
     c = (
-        db.query(Complejo)
-        .options(
-            joinedload(Complejo.canchas).joinedload(Cancha.imagenes),
-            joinedload(Complejo.imagenes),
-            joinedload(Complejo.owner),
+        await db.execute(
+            select(Complejo)
+            .options(
+                joinedload(Complejo.canchas).options(
+                    joinedload(Cancha.imagenes),
+                    # ✅ la respuesta no retiene al complejo; sin esto CanchaOut lo recargaría (IO fuera de await)
+                    joinedload(Cancha.complejo),
+                ),
+                joinedload(Complejo.imagenes),
+                joinedload(Complejo.owner),
+            )
+            .filter(Complejo.slug == slug)
         )
-        .filter(Complejo.slug == slug)
-        .first()
-    )
+    ).unique().scalars().first()
     if not c or not c.is_active:
         raise HTTPException(404, "Complejo no encontrado")
 
@@ -99,13 +109,17 @@ def obtener_complejo_publico(
     )
     canchas = [cx for cx in (c.canchas or []) if cx.is_active]
 
-    likes_count = db.query(ComplejoLike).filter(ComplejoLike.complejo_id == c.id).count()
+    likes_count = await db.scalar(
+        select(func.count()).select_from(ComplejoLike).filter(ComplejoLike.complejo_id == c.id)
+    )
     liked_by_me = False
     if u:
         liked_by_me = (
-            db.query(ComplejoLike)
-            .filter(ComplejoLike.complejo_id == c.id, ComplejoLike.user_id == u.id)
-            .first()
+            await db.scalar(
+                select(ComplejoLike.id)
+                .filter(ComplejoLike.complejo_id == c.id, ComplejoLike.user_id == u.id)
+                .limit(1)
+            )
             is not None
         )
 
@@ -126,6 +140,9 @@ def obtener_complejo_publico(
         "estacionamiento": c.estacionamiento,
         "cafeteria": c.cafeteria,
         "foto_url": c.foto_url,
+        "foto_placeholder": c.foto_placeholder,
+        "foto_ancho": c.foto_ancho,
+        "foto_alto": c.foto_alto,
         "is_active": c.is_active,
         "owner_id": c.owner_id,
         "owner_phone": c.owner_phone,
@@ -211,11 +228,12 @@ async def subir_imagenes_complejo(
             data = resize_square_image(data, 400, ext)
         except Exception:
             pass
+        meta = placeholder_o_vacio(data)
         name = f"galeria_{uuid.uuid4().hex}{ext}"
         (folder / name).write_bytes(data)
 
         url = f"/uploads/complejos/{complejo_id}/{name}"
-        img = ComplejoImagen(complejo_id=complejo_id, url=url, orden=orden, is_cover=False)
+        img = ComplejoImagen(complejo_id=complejo_id, url=url, orden=orden, is_cover=False, **meta)
         orden += 1
         db.add(img)
         nuevos.append(img)
@@ -224,6 +242,7 @@ async def subir_imagenes_complejo(
         nuevos[0].is_cover = True
 
     db.commit()
+    UPLOADS.labels("complejo_galeria").inc(len(nuevos))
     return nuevos
 
 
@@ -321,6 +340,9 @@ def actualizar_complejo_publico(
         "estacionamiento": c.estacionamiento,
         "cafeteria": c.cafeteria,
         "foto_url": c.foto_url,
+        "foto_placeholder": c.foto_placeholder,
+        "foto_ancho": c.foto_ancho,
+        "foto_alto": c.foto_alto,
         "is_active": c.is_active,
         "owner_id": c.owner_id,
         "owner_phone": c.owner_phone,
@@ -333,11 +355,11 @@ def actualizar_complejo_publico(
     }
 
 
-@router.get("/public/canchas/{cancha_id}/horarios")
-def horarios_cancha_publica(
+@router.get("/public/canchas/{cancha_id}/horarios", dependencies=[Depends(timeout_lectura_publica_async)])
+async def horarios_cancha_publica(
     cancha_id: int,
     fecha: str | None = Query(None, description="YYYY-MM-DD; default hoy"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     if fecha:
         try:
@@ -347,19 +369,24 @@ def horarios_cancha_publica(
     else:
         target_date = date.today()
 
-    slots: list[dict[str, str | bool]] = []
-    for hour in range(6, 22):
-        slot_start = datetime(target_date.year, target_date.month, target_date.day, hour)
-        slot_end = slot_start + timedelta(hours=1)
-        ocupado = (
-            db.query(Reserva)
+    day_start = datetime(target_date.year, target_date.month, target_date.day, HORA_APERTURA)
+    day_end = day_start + timedelta(hours=HORA_CIERRE - HORA_APERTURA)
+
+    # ✅ una sola query para el día; los slots se resuelven en memoria
+    ocupadas = (
+        await db.execute(
+            select(Reserva.start_at, Reserva.end_at)
             .filter(Reserva.cancha_id == cancha_id)
             .filter(Reserva.payment_status != "cancelada")
-            .filter(Reserva.start_at < slot_end)
-            .filter(Reserva.end_at > slot_start)
-            .count()
-            > 0
+            .filter(*particiones.solape(day_start, day_end))
         )
+    ).all()
+
+    slots: list[dict[str, str | bool]] = []
+    for hour in range(HORA_APERTURA, HORA_CIERRE):
+        slot_start = datetime(target_date.year, target_date.month, target_date.day, hour)
+        slot_end = slot_start + timedelta(hours=1)
+        ocupado = any(start_at < slot_end and end_at > slot_start for start_at, end_at in ocupadas)
         slots.append({"hora": f"{hour:02d}:00", "ocupado": ocupado})
 
     return {"cancha_id": cancha_id, "fecha": target_date.isoformat(), "slots": slots}
@@ -0,0 +1,22 @@
+import secrets
+
+from fastapi import APIRouter, HTTPException, Request, Response
+
+from app.core.config import settings
+from app.core.metricas import render_metrics
+
+router = APIRouter(tags=["metricas"])
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics(request: Request):
+    """Métricas en formato Prometheus (agregadas entre workers si hay PROMETHEUS_MULTIPROC_DIR)."""
+    if settings.METRICS_TOKEN:
+        auth = request.headers.get("authorization", "")
+        if not secrets.compare_digest(auth, f"Bearer {settings.METRICS_TOKEN}"):
+            raise HTTPException(status_code=401, detail="No autorizado")
+    elif not settings.METRICS_PUBLIC:
+        # sin token no se expone nada (rutas, volumen de tráfico, pools) salvo opt-in explícito
+        raise HTTPException(status_code=404, detail="Not Found")
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
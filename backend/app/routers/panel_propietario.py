@@ -1,23 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
-from sqlalchemy import func, or_
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Response
+from sqlalchemy import Date, case, func, tuple_
 from sqlalchemy.orm import Session
 from pathlib import Path
 import uuid
 import io
 
 from pydantic import BaseModel
-from typing import Optional
-from datetime import datetime, date
-
-from fastapi.responses import StreamingResponse
-from openpyxl import Workbook
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-
-from app.core.deps import get_db, require_role, get_usuario_actual
-from app.core.images import resize_square_image
+from typing import Literal, Optional
+from datetime import datetime, date, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.core import busqueda, estadisticas, mapa_ocupacion, planes
+from app.core.config import settings
+from app.core.deps import get_db, require_role, get_usuario_actual, timeout_export
+from app.core.lazy import lazy_module
+from app.core.images import placeholder_o_vacio, resize_square_image
+from app.core.metricas import EXPORTS, UPLOADS
+from app.core.paginacion import NEXT_CURSOR_HEADER, codificar_cursor, decodificar_cursor
 from app.core.slug import slugify
-from app.modelos.modelos import Complejo, Cancha, CanchaImagen, Reserva, Plan, Suscripcion, User
+from app.db import particiones
+from app.modelos.modelos import Complejo, Cancha, CanchaImagen, Reserva, ReservaDiaria
 from app.esquemas.esquemas import (
     ComplejoCrear,
     ComplejoActualizar,
@@ -27,6 +31,9 @@ from app.esquemas.esquemas import (
     ReservaCrear,
     ReservaOut,
     ReservaPago,
+    CalendarioMesOut,
+    EstadisticasOut,
+    HeatmapOut,
 )
 
 router = APIRouter(prefix="/panel", tags=["panel"])
@@ -54,31 +61,6 @@ def _slug_base(nombre: str) -> str:
     base = slugify(nombre or "")
     return base or "complejo"
 
-def _plan_actual(db: Session, user_id: int) -> Plan | None:
-    fila = (
-        db.query(Suscripcion, Plan)
-        .join(Plan, Plan.id == Suscripcion.plan_id)
-        .filter(Suscripcion.user_id == user_id)
-        .order_by(Suscripcion.inicio.desc())
-        .first()
-    )
-    if fila:
-        return fila[1]
-    return db.query(Plan).filter(Plan.id == 1).first()
-
-
-def _limite_complejos(plan: Plan | None) -> int:
-    if plan and plan.limite_canchas and int(plan.limite_canchas) > 0:
-        return int(plan.limite_canchas)
-    codigo = (plan.codigo if plan else "") or ""
-    nombre = (plan.nombre if plan else "") or ""
-    codigo = codigo.lower()
-    nombre = nombre.lower()
-    if "pro" in codigo or "premium" in codigo or "pro" in nombre or "premium" in nombre:
-        return 2
-    return 1
-
-
 def owner_filter_reservas(q, u):
     """
     Propietario: solo reservas de canchas de sus complejos.
@@ -94,19 +76,10 @@ def owner_filter_reservas(q, u):
 
 
 def _apply_reserva_search(q, search: str | None):
+    # ✅ columna normalizada reservas.search_text (índice trigram en Postgres)
     if not search:
         return q
-    term = f"%{search.strip().lower()}%"
-    q = q.outerjoin(User, Reserva.cliente)
-    return q.filter(
-        or_(
-            func.lower(User.username).like(term),
-            func.lower(User.first_name).like(term),
-            func.lower(User.last_name).like(term),
-            func.lower(Reserva.payment_status).like(term),
-            Reserva.cancha.has(Cancha.nombre.ilike(term)),
-        )
-    )
+    return busqueda.filtrar(q, search)
 
 
 def _apply_reserva_fecha(q, fecha: date | None, fecha_inicio: date | None, fecha_fin: date | None):
@@ -120,10 +93,11 @@ def _apply_reserva_fecha(q, fecha: date | None, fecha_inicio: date | None, fecha
         start = datetime(fecha.year, fecha.month, fecha.day, 0, 0, 0)
         end = datetime(fecha.year, fecha.month, fecha.day, 23, 59, 59)
 
+    # ✅ con cota sobre start_at para que Postgres descarte particiones
     if start and end:
-        return q.filter(Reserva.start_at <= end, Reserva.end_at >= start)
+        return q.filter(*particiones.solape(start, end, inclusivo=True))
     if start:
-        return q.filter(Reserva.end_at >= start)
+        return q.filter(Reserva.end_at >= start, Reserva.start_at >= start - particiones.DURACION_MAXIMA)
     if end:
         return q.filter(Reserva.start_at <= end)
     return q
@@ -158,6 +132,93 @@ def reserva_dict(r: Reserva):
     }
 
 
+# ✅ listados de reservas: columnas pedidas en SQL y filas como tuplas (sin ORM)
+# campo de salida -> columna
+_COLUMNAS_RESERVA = {
+    "id": Reserva.id,
+    "cancha_id": Reserva.cancha_id,
+    "cliente_id": Reserva.cliente_id,
+    "start_at": Reserva.start_at,
+    "end_at": Reserva.end_at,
+    "total_amount": Reserva.total_amount,
+    "paid_amount": Reserva.paid_amount,
+    "payment_method": Reserva.payment_method,
+    "payment_status": Reserva.payment_status,
+    "notas": Reserva.notas,
+    "created_by": Reserva.created_by,
+    "cancha_nombre": Cancha.nombre,
+    "complejo_id": Cancha.complejo_id,
+    "complejo_nombre": Complejo.nombre,
+}
+# alias que usa el front -> campo real
+_ALIAS_RESERVA = {"estado": "payment_status", "fecha_inicio": "start_at", "fecha_fin": "end_at"}
+_CAMPOS_RESERVA = [*_COLUMNAS_RESERVA, *_ALIAS_RESERVA]
+_NUMERICOS = {"total_amount", "paid_amount"}
+
+
+def _parse_fields(fields: str | None) -> list[str] | None:
+    if not fields:
+        return None
+    pedidos = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    desconocidos = [f for f in pedidos if f not in _CAMPOS_RESERVA]
+    if desconocidos:
+        raise HTTPException(400, f"Campos desconocidos: {', '.join(desconocidos)}. Válidos: {', '.join(_CAMPOS_RESERVA)}")
+    return pedidos
+
+
+def _query_reservas(db: Session, u, campos: list[str] | None):
+    """SELECT solo de las columnas necesarias (+ id y start_at para el cursor), ya filtrado por rol."""
+    salida = campos or _CAMPOS_RESERVA
+    fuentes = {"id", "start_at"} | {_ALIAS_RESERVA.get(c, c) for c in salida}
+    cols = [_COLUMNAS_RESERVA[c].label(c) for c in _COLUMNAS_RESERVA if c in fuentes]
+    q = (
+        db.query(*cols)
+        .select_from(Reserva)
+        .join(Cancha, Reserva.cancha_id == Cancha.id)
+        .outerjoin(Complejo, Cancha.complejo_id == Complejo.id)
+    )
+    if u.role == "usuario":
+        q = q.filter(Reserva.cliente_id == u.id)
+    elif u.role != "admin":
+        q = q.filter(Complejo.owner_id == u.id)
+    return q
+
+
+def _fila_reserva(row, campos: list[str]) -> dict:
+    m = row._mapping
+    out = {}
+    for c in campos:
+        v = m[_ALIAS_RESERVA.get(c, c)]
+        if c in _NUMERICOS:
+            v = float(v or 0)
+        out[c] = v
+    return out
+
+
+def _pagina_reservas(q, campos: list[str] | None, cursor: str | None, limit: int | None, response: Response):
+    """Orden (start_at, id) con keyset; devuelve dicts o, si hay `fields`, un JSONResponse parcial."""
+    if cursor:
+        start_at, rid = decodificar_cursor(cursor, datetime, int)
+        q = q.filter(tuple_(Reserva.start_at, Reserva.id) > tuple_(start_at, rid))
+    q = q.order_by(Reserva.start_at.asc(), Reserva.id.asc())
+    if limit:
+        q = q.limit(limit + 1)
+    rows = q.all()
+
+    headers = {}
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        ultimo = rows[-1]._mapping
+        headers[NEXT_CURSOR_HEADER] = codificar_cursor(ultimo["start_at"], ultimo["id"])
+
+    data = [_fila_reserva(r, campos or _CAMPOS_RESERVA) for r in rows]
+    if campos:
+        # proyección parcial: no pasa por ReservaOut (que exige todos los campos)
+        return JSONResponse(jsonable_encoder(data), headers=headers)
+    response.headers.update(headers)
+    return data
+
+
 # --------- Complejos (propietario/admin) ---------
 @router.get(
     "/complejos",
@@ -192,8 +253,9 @@ def obtener_complejo(complejo_id: int, db: Session = Depends(get_db), u=Depends(
 )
 def crear_complejo(payload: ComplejoCrear, db: Session = Depends(get_db), u=Depends(get_usuario_actual)):
     if u.role != "admin":
-        plan = _plan_actual(db, u.id)
-        limite = _limite_complejos(plan)
+        # ✅ plan cacheado + lock por propietario: el conteo y el INSERT no se cruzan con otro alta
+        limite = planes.limite_complejos(planes.plan_efectivo(db, u.id))
+        planes.bloquear_propietario(db, u.id)
         total = db.query(Complejo).filter(Complejo.owner_id == u.id).count()
         if total >= limite:
             raise HTTPException(
@@ -296,6 +358,7 @@ async def subir_foto_complejo(
         data = resize_square_image(data, 400, ext)
     except Exception:
         pass
+    meta = placeholder_o_vacio(data)
 
     folder = UPLOAD_ROOT_COMPLEJOS / str(complejo_id)
     folder.mkdir(parents=True, exist_ok=True)
@@ -309,12 +372,21 @@ async def subir_foto_complejo(
     (folder / filename).write_bytes(data)
 
     c.foto_url = f"/uploads/complejos/{complejo_id}/{filename}"
+    c.foto_placeholder = meta.get("placeholder")
+    c.foto_ancho = meta.get("ancho")
+    c.foto_alto = meta.get("alto")
 
     db.add(c)
     db.commit()
     db.refresh(c)
+    UPLOADS.labels("complejo_foto").inc()
 
-    return {"foto_url": c.foto_url}
+    return {
+        "foto_url": c.foto_url,
+        "foto_placeholder": c.foto_placeholder,
+        "foto_ancho": c.foto_ancho,
+        "foto_alto": c.foto_alto,
+    }
 
 
 # --------- Canchas (propietario/admin) ---------
@@ -406,12 +478,22 @@ async def subir_imagen_cancha(
     )
     orden = (ultimo.orden + 1) if ultimo else 0
 
-    img = CanchaImagen(cancha_id=cancha_id, url=url, orden=orden)
+    meta = placeholder_o_vacio(data)
+
+    img = CanchaImagen(cancha_id=cancha_id, url=url, orden=orden, **meta)
     db.add(img)
     db.commit()
     db.refresh(img)
+    UPLOADS.labels("cancha").inc()
 
-    return {"ok": True, "url": url, "orden": orden}
+    return {
+        "ok": True,
+        "url": url,
+        "orden": orden,
+        "placeholder": img.placeholder,
+        "ancho": img.ancho,
+        "alto": img.alto,
+    }
 
 
 class CanchaActualizar(BaseModel):
@@ -470,30 +552,41 @@ def actualizar_cancha(
     dependencies=[Depends(require_role("usuario", "propietario", "admin"))],
 )
 def listar_reservas(
+    response: Response,
     cancha_id: int | None = Query(default=None),
     fecha: date | None = Query(default=None),
     fecha_inicio: date | None = Query(default=None),
     fecha_fin: date | None = Query(default=None),
     search: str | None = Query(default=None),
+    cursor: str | None = Query(default=None, description="valor de X-Next-Cursor de la página anterior"),
+    limit: int | None = Query(default=None, ge=1, le=1000),
+    fields: str | None = Query(default=None, description="campos separados por coma, p. ej. id,start_at,estado"),
     db: Session = Depends(get_db),
     u=Depends(get_usuario_actual),
 ):
-    q = db.query(Reserva)
-
-    # ✅ usuario: solo reservas donde es cliente
-    if u.role == "usuario":
-        q = q.filter(Reserva.cliente_id == u.id)
-    else:
-        q = owner_filter_reservas(q, u)
+    campos = _parse_fields(fields)
+    q = _query_reservas(db, u, campos)
 
     if cancha_id is not None:
         q = q.filter(Reserva.cancha_id == cancha_id)
 
     q = _apply_reserva_fecha(q, fecha, fecha_inicio, fecha_fin)
-    q = _apply_reserva_search(q, search)
 
-    rows = q.order_by(Reserva.start_at.asc()).all()
-    return [reserva_dict(r) for r in rows]
+    if busqueda.terminos(search):
+        # ✅ búsqueda: más relevantes primero y con tope (sin cursor: el orden no es estable)
+        if cursor:
+            raise HTTPException(400, "cursor no se puede combinar con search")
+        q = _apply_reserva_search(q, search)
+        rank = busqueda.relevancia(db.get_bind().dialect.name, search)
+        rows = q.order_by(rank.desc(), Reserva.start_at.asc()).limit(limit or settings.RESERVA_SEARCH_LIMIT).all()
+        data = [_fila_reserva(r, campos or _CAMPOS_RESERVA) for r in rows]
+        return JSONResponse(jsonable_encoder(data)) if campos else data
+
+    # ✅ paginar es opt-in: sin limit ni cursor la respuesta es la lista completa
+    # (lo que espera el panel); con cursor y sin limit, páginas de RESERVA_PAGE_SIZE
+    if cursor and not limit:
+        limit = settings.RESERVA_PAGE_SIZE
+    return _pagina_reservas(q, campos, cursor, limit, response)
 
 
 @router.post(
@@ -509,14 +602,18 @@ def crear_reserva(payload: ReservaCrear, db: Session = Depends(get_db), u=Depend
     if not check_owner(u, cancha.owner_id):
         raise HTTPException(403, "No autorizado")
 
+    if payload.end_at <= payload.start_at:
+        raise HTTPException(400, "La hora de fin debe ser posterior a la de inicio.")
+    if payload.end_at - payload.start_at > particiones.DURACION_MAXIMA:
+        raise HTTPException(400, "Una reserva no puede durar más de 24 horas.")
+
     # validar solape
     solape = (
         db.query(Reserva)
         .filter(
             Reserva.cancha_id == payload.cancha_id,
             Reserva.payment_status != "cancelada",
-            Reserva.start_at < payload.end_at,
-            Reserva.end_at > payload.start_at,
+            *particiones.solape(payload.start_at, payload.end_at),
         )
         .first()
     )
@@ -550,6 +647,7 @@ def crear_reserva(payload: ReservaCrear, db: Session = Depends(get_db), u=Depend
         created_by=u.id,
     )
     db.add(r)
+    estadisticas.aplicar(db.connection(), None, estadisticas.aporte(r))
     db.commit()
     db.refresh(r)
     return reserva_dict(r)
@@ -571,6 +669,7 @@ def registrar_pago(reserva_id: int, payload: ReservaPago, db: Session = Depends(
 
     if r.payment_status == "cancelada":
         raise HTTPException(400, "La reserva está cancelada")
+    antes = estadisticas.aporte(r)
 
     total = float(r.total_amount or 0)
     paid = float(r.paid_amount or 0)
@@ -594,6 +693,7 @@ def registrar_pago(reserva_id: int, payload: ReservaPago, db: Session = Depends(
         r.payment_status = "pagada"
 
     db.add(r)
+    estadisticas.aplicar(db.connection(), antes, estadisticas.aporte(r))
     db.commit()
     db.refresh(r)
     return reserva_dict(r)
@@ -613,8 +713,10 @@ def cancelar_reserva(reserva_id: int, db: Session = Depends(get_db), u=Depends(g
     if not cancha or not check_owner(u, cancha.owner_id):
         raise HTTPException(403, "No autorizado")
 
+    antes = estadisticas.aporte(r)
     r.payment_status = "cancelada"
     db.add(r)
+    estadisticas.aplicar(db.connection(), antes, estadisticas.aporte(r))
     db.commit()
     db.refresh(r)
     return reserva_dict(r)
@@ -623,7 +725,7 @@ def cancelar_reserva(reserva_id: int, db: Session = Depends(get_db), u=Depends(g
 # -------- EXPORT EXCEL --------
 @router.get(
     "/reservas/export.xlsx",
-    dependencies=[Depends(require_role("propietario", "admin"))],
+    dependencies=[Depends(require_role("propietario", "admin")), Depends(timeout_export)],
 )
 def export_reservas_excel(
     db: Session = Depends(get_db),
@@ -641,7 +743,8 @@ def export_reservas_excel(
 
     rows = q.order_by(Reserva.start_at.asc()).all()
 
-    wb = Workbook()
+    openpyxl = lazy_module("openpyxl", "Exportar Excel")
+    wb = openpyxl.Workbook()
     ws = wb.active
     ws.title = "Reservas"
 
@@ -670,6 +773,7 @@ def export_reservas_excel(
     out = io.BytesIO()
     wb.save(out)
     out.seek(0)
+    EXPORTS.labels("xlsx").inc()
 
     filename = "reservas.xlsx" if fecha is None else f"reservas_{fecha.isoformat()}.xlsx"
     return StreamingResponse(
@@ -682,7 +786,7 @@ def export_reservas_excel(
 # -------- EXPORT PDF --------
 @router.get(
     "/reservas/export.pdf",
-    dependencies=[Depends(require_role("propietario", "admin"))],
+    dependencies=[Depends(require_role("propietario", "admin")), Depends(timeout_export)],
 )
 def export_reservas_pdf(
     db: Session = Depends(get_db),
@@ -700,6 +804,9 @@ def export_reservas_pdf(
 
     rows = q.order_by(Reserva.start_at.asc()).all()
 
+    canvas = lazy_module("reportlab.pdfgen.canvas", "Exportar PDF")
+    A4 = lazy_module("reportlab.lib.pagesizes", "Exportar PDF").A4
+
     buffer = io.BytesIO()
     c = canvas.Canvas(buffer, pagesize=A4)
     width, height = A4
@@ -736,6 +843,7 @@ def export_reservas_pdf(
 
     c.save()
     buffer.seek(0)
+    EXPORTS.labels("pdf").inc()
 
     filename = "reservas.pdf" if fecha is None else f"reservas_{fecha.isoformat()}.pdf"
     return StreamingResponse(
@@ -753,54 +861,105 @@ def _month_range(year: int, month: int):
         end = datetime(year, month + 1, 1)
     return start, end
 
+def _horas(dialecto: str):
+    """Duración de la reserva en horas (expresión SQL)."""
+    if dialecto == "postgresql":
+        return func.extract("epoch", Reserva.end_at - Reserva.start_at) / 3600.0
+    return (func.julianday(Reserva.end_at) - func.julianday(Reserva.start_at)) * 24.0
+
+
+def _calendario_mes(db: Session, u, start: datetime, end: datetime, cancha_id: int | None) -> list[dict]:
+    """Un solo GROUP BY (día, cancha): conteo, horas, monto y pagado del mes."""
+    activa = Reserva.payment_status != "cancelada"
+    dia = func.date(Reserva.start_at, type_=Date).label("fecha")
+    horas = _horas(db.get_bind().dialect.name)
+
+    q = (
+        db.query(
+            dia,
+            Reserva.cancha_id,
+            Cancha.nombre,
+            func.sum(case((activa, 1), else_=0)),
+            func.coalesce(func.sum(case((activa, horas), else_=0)), 0),
+            func.coalesce(func.sum(case((activa, Reserva.total_amount), else_=0)), 0),
+            func.coalesce(func.sum(case((activa, Reserva.paid_amount), else_=0)), 0),
+            func.sum(case((activa, 0), else_=1)),
+        )
+        .join(Cancha, Reserva.cancha_id == Cancha.id)
+        .filter(Reserva.start_at >= start, Reserva.start_at < end)
+    )
+    if u.role != "admin":
+        q = q.filter(Cancha.owner_id == u.id)
+    if cancha_id is not None:
+        q = q.filter(Reserva.cancha_id == cancha_id)
+
+    filas = q.group_by(dia, Reserva.cancha_id, Cancha.nombre).order_by(dia, Reserva.cancha_id).all()
+    return [
+        {
+            "fecha": fecha,
+            "cancha_id": int(cid),
+            "cancha_nombre": nombre,
+            "reservas": int(n or 0),
+            "horas": round(float(h or 0), 2),
+            "total": float(total or 0),
+            "pagado": float(pagado or 0),
+            "canceladas": int(canc or 0),
+        }
+        for fecha, cid, nombre, n, h, total, pagado, canc in filas
+    ]
+
+
 @router.get("/reservas/mes")
 def reservas_mes(
     year: int = Query(..., ge=2000, le=2100),
     month: int = Query(..., ge=1, le=12),
+    vista: Literal["detalle", "calendario"] = Query(default="detalle"),
+    cancha_id: int | None = Query(default=None),
     db: Session = Depends(get_db),
     u=Depends(get_usuario_actual),
 ):
     """
-    Devuelve TODAS las reservas del mes para las canchas del propietario.
+    vista=detalle: todas las reservas del mes para las canchas del propietario.
+    vista=calendario: agregados por día y cancha (CalendarioMesOut); el detalle
+    de un día se pide aparte con /panel/reservas?fecha=YYYY-MM-DD.
     """
     start, end = _month_range(year, month)
 
-    # ⚠️ Ajusta este filtro a tu modelo real:
-    # - si tu cancha tiene owner_id: Cancha.owner_id == u.id
-    # - si tu cancha tiene propietario_id: Cancha.propietario_id == u.id
-    # - si usas created_by: Cancha.created_by == u.id
-    owner_filter = getattr(Cancha, "owner_id", None) or getattr(Cancha, "propietario_id", None) or getattr(Cancha, "created_by", None)
-    if owner_filter is None:
-        # si no existe ninguna, comenta esto y pon tu filtro correcto
-        raise Exception("No encontré owner_id/propietario_id/created_by en Cancha. Ajusta el filtro en /reservas/mes.")
+    if vista == "calendario":
+        celdas = _calendario_mes(db, u, start, end, cancha_id)
+        return CalendarioMesOut(
+            year=year,
+            month=month,
+            celdas=celdas,
+            reservas=sum(c["reservas"] for c in celdas),
+            horas=round(sum(c["horas"] for c in celdas), 2),
+            total=sum(c["total"] for c in celdas),
+            pagado=sum(c["pagado"] for c in celdas),
+        )
 
     q = (
-        db.query(Reserva, Cancha.nombre.label("cancha_nombre"))
+        db.query(
+            Reserva.id,
+            Reserva.cancha_id,
+            Cancha.nombre.label("cancha_nombre"),
+            Reserva.start_at,
+            Reserva.end_at,
+            Reserva.total_amount,
+            Reserva.paid_amount,
+            Reserva.payment_method,
+            Reserva.payment_status,
+            Reserva.notas,
+        )
         .join(Cancha, Reserva.cancha_id == Cancha.id)
-        .filter(owner_filter == u.id)
         .filter(Reserva.start_at >= start)
         .filter(Reserva.start_at < end)
-        .order_by(Reserva.start_at.asc())
     )
+    if u.role != "admin":
+        q = q.filter(Cancha.owner_id == u.id)
+    if cancha_id is not None:
+        q = q.filter(Reserva.cancha_id == cancha_id)
 
-    out = []
-    for r, cancha_nombre in q.all():
-        out.append(
-            {
-                "id": r.id,
-                "cancha_id": r.cancha_id,
-                "cancha_nombre": cancha_nombre,
-                "start_at": r.start_at,
-                "end_at": r.end_at,
-                "total_amount": r.total_amount,
-                "paid_amount": r.paid_amount,
-                "payment_method": r.payment_method,
-                "payment_status": r.payment_status,
-                "notas": r.notas,
-            }
-        )
-
-    return out
+    return [dict(r._mapping) for r in q.order_by(Reserva.start_at.asc()).all()]
 
 @router.get(
     "/reservas/rango",
@@ -808,21 +967,21 @@ def reservas_mes(
     dependencies=[Depends(require_role("usuario", "propietario", "admin"))],
 )
 def listar_reservas_rango(
+    response: Response,
     desde: date = Query(..., alias="from"),
     hasta: date = Query(..., alias="to"),
     cancha_id: int | None = Query(default=None),
+    cursor: str | None = Query(default=None),
+    limit: int | None = Query(default=None, ge=1, le=1000),
+    fields: str | None = Query(default=None),
     db: Session = Depends(get_db),
     u=Depends(get_usuario_actual),
 ):
     if hasta < desde:
         raise HTTPException(400, "Rango inválido: 'to' no puede ser menor que 'from'.")
 
-    q = db.query(Reserva)
-
-    if u.role == "usuario":
-        q = q.filter(Reserva.cliente_id == u.id)
-    else:
-        q = owner_filter_reservas(q, u)
+    campos = _parse_fields(fields)
+    q = _query_reservas(db, u, campos)
 
     if cancha_id is not None:
         q = q.filter(Reserva.cancha_id == cancha_id)
@@ -831,7 +990,212 @@ def listar_reservas_rango(
     end = datetime(hasta.year, hasta.month, hasta.day, 23, 59, 59)
 
     # mismo criterio que tu listar_reservas (solape por rango)
-    q = q.filter(Reserva.start_at <= end, Reserva.end_at >= start)
+    q = q.filter(*particiones.solape(start, end, inclusivo=True))
 
-    rows = q.order_by(Reserva.start_at.asc()).all()
-    return [reserva_dict(r) for r in rows]
+    # el rango ya acota el resultado: sin limit devuelve todo (compatibilidad con el calendario)
+    return _pagina_reservas(q, campos, cursor, limit, response)
+
+
+# ==========================
+# ESTADÍSTICAS (plan con permite_estadisticas)
+# - se leen del rollup reservas_diarias, no de reservas
+# ==========================
+def _grupo(id_: int, nombre, complejo_id, acc: dict, horas_disponibles: float) -> dict:
+    horas = acc["minutos"] / 60
+    total = float(acc["total"])
+    pagado = float(acc["pagado"])
+    return {
+        "id": id_,
+        "nombre": nombre,
+        "complejo_id": complejo_id,
+        "reservas": acc["reservas"],
+        "canceladas": acc["canceladas"],
+        "horas": round(horas, 2),
+        "ocupacion": round(horas / horas_disponibles, 4) if horas_disponibles else 0.0,
+        "total": total,
+        "pagado": pagado,
+        "pendiente": round(total - pagado, 2),
+    }
+
+
+def _exigir_estadisticas(db: Session, u) -> None:
+    if u.role != "admin":
+        plan = planes.plan_efectivo(db, u.id)
+        if not plan or not plan.permite_estadisticas:
+            raise HTTPException(403, "Tu plan no incluye estadísticas")
+
+
+def _canchas_visibles(db: Session, u, complejo_id: int | None, cancha_id: int | None):
+    q = db.query(Cancha.id, Cancha.nombre, Cancha.complejo_id, Complejo.nombre).outerjoin(
+        Complejo, Cancha.complejo_id == Complejo.id
+    )
+    if u.role != "admin":
+        q = q.filter(Complejo.owner_id == u.id)
+    if complejo_id is not None:
+        q = q.filter(Cancha.complejo_id == complejo_id)
+    if cancha_id is not None:
+        q = q.filter(Cancha.id == cancha_id)
+    return q.all()
+
+
+def _acc() -> dict:
+    return {"reservas": 0, "canceladas": 0, "minutos": 0, "total": 0, "pagado": 0}
+
+
+@router.get(
+    "/estadisticas",
+    response_model=EstadisticasOut,
+    dependencies=[Depends(require_role("propietario", "admin"))],
+)
+def estadisticas_panel(
+    desde: date | None = Query(default=None, description="default: hace 30 días"),
+    hasta: date | None = Query(default=None, description="default: hoy"),
+    complejo_id: int | None = Query(default=None),
+    cancha_id: int | None = Query(default=None),
+    db: Session = Depends(get_db),
+    u=Depends(get_usuario_actual),
+):
+    _exigir_estadisticas(db, u)
+
+    hasta = hasta or date.today()
+    desde = desde or (hasta - timedelta(days=29))
+    if hasta < desde:
+        raise HTTPException(400, "Rango inválido: 'hasta' no puede ser menor que 'desde'.")
+    if (hasta - desde).days > 366:
+        raise HTTPException(400, "El rango máximo es de un año")
+
+    # canchas visibles (también las que no tuvieron reservas: cuentan para la ocupación)
+    canchas = _canchas_visibles(db, u, complejo_id, cancha_id)
+
+    por_cancha: dict[int, dict] = {c.id: _acc() for c in canchas}
+    por_hora: dict[int, dict] = {}
+    if por_cancha:
+        filas = (
+            db.query(
+                ReservaDiaria.cancha_id,
+                ReservaDiaria.hora,
+                func.sum(ReservaDiaria.reservas),
+                func.sum(ReservaDiaria.canceladas),
+                func.sum(ReservaDiaria.minutos),
+                func.sum(ReservaDiaria.total),
+                func.sum(ReservaDiaria.pagado),
+            )
+            .filter(ReservaDiaria.cancha_id.in_(list(por_cancha)))
+            .filter(ReservaDiaria.fecha >= desde, ReservaDiaria.fecha <= hasta)
+            .group_by(ReservaDiaria.cancha_id, ReservaDiaria.hora)
+            .all()
+        )
+        for cid, hora, n, canc, minutos, total, pagado in filas:
+            for acc in (por_cancha[cid], por_hora.setdefault(hora, _acc())):
+                acc["reservas"] += int(n or 0)
+                acc["canceladas"] += int(canc or 0)
+                acc["minutos"] += int(minutos or 0)
+                acc["total"] += float(total or 0)
+                acc["pagado"] += float(pagado or 0)
+
+    horas_dia = estadisticas.HORA_CIERRE - estadisticas.HORA_APERTURA
+    dias = (hasta - desde).days + 1
+    disponibles_cancha = float(horas_dia * dias)
+
+    salida_canchas = [_grupo(c.id, c.nombre, c.complejo_id, por_cancha[c.id], disponibles_cancha) for c in canchas]
+
+    complejos: dict[int, tuple[str | None, dict, int]] = {}
+    for c in canchas:
+        if c.complejo_id is None:
+            continue
+        nombre, acc, n = complejos.get(c.complejo_id, (c[3], _acc(), 0))
+        for k, v in por_cancha[c.id].items():
+            acc[k] += v
+        complejos[c.complejo_id] = (nombre, acc, n + 1)
+    salida_complejos = [
+        _grupo(cid, nombre, cid, acc, disponibles_cancha * n) for cid, (nombre, acc, n) in complejos.items()
+    ]
+
+    total = _acc()
+    for acc in por_cancha.values():
+        for k, v in acc.items():
+            total[k] += v
+    resumen = _grupo(0, None, None, total, disponibles_cancha * len(canchas))
+
+    return {
+        "desde": desde,
+        "hasta": hasta,
+        **{k: resumen[k] for k in ("reservas", "canceladas", "horas", "ocupacion", "total", "pagado", "pendiente")},
+        "horas_disponibles": disponibles_cancha * len(canchas),
+        "por_cancha": salida_canchas,
+        "por_complejo": salida_complejos,
+        "horas_pico": [
+            {"hora": h, "reservas": acc["reservas"], "horas": round(acc["minutos"] / 60, 2)}
+            for h, acc in sorted(por_hora.items())
+        ],
+    }
+
+
+@router.get(
+    "/estadisticas/heatmap",
+    response_model=HeatmapOut,
+    response_model_exclude_none=True,
+    dependencies=[Depends(require_role("propietario", "admin"))],
+)
+def heatmap_ocupacion(
+    semanas: int = Query(default=12, ge=1, le=104),
+    complejo_id: int | None = Query(default=None),
+    cancha_id: int | None = Query(default=None),
+    por_cancha: bool = Query(default=False, description="incluye la matriz de cada cancha"),
+    db: Session = Depends(get_db),
+    u=Depends(get_usuario_actual),
+):
+    """Día de semana x hora: horas reservadas y % de uso de las últimas `semanas` (hasta hoy inclusive)."""
+    _exigir_estadisticas(db, u)
+    np = lazy_module("numpy", "Mapa de ocupación")
+
+    hasta = datetime.combine(date.today() + timedelta(days=1), datetime.min.time())
+    desde = hasta - timedelta(weeks=semanas)
+
+    canchas = _canchas_visibles(db, u, complejo_id, cancha_id)
+    indice = {c.id: i for i, c in enumerate(canchas)}
+
+    filas = []
+    if indice:
+        # ✅ una sola lectura columnar; el reparto por horas lo hace NumPy
+        filas = (
+            db.query(Reserva.cancha_id, Reserva.start_at, Reserva.end_at)
+            .filter(Reserva.cancha_id.in_(list(indice)))
+            .filter(Reserva.payment_status != "cancelada")
+            .filter(*particiones.solape(desde, hasta))
+            .all()
+        )
+    ids, inicios, fines = zip(*filas) if filas else ((), (), ())
+
+    horas = mapa_ocupacion.horas_por_celda(
+        np, [indice[i] for i in ids], inicios, fines, max(len(canchas), 1), desde, hasta
+    )
+    ocurrencias = mapa_ocupacion.ocurrencias_dia_semana(np, desde, hasta)
+    total = horas.sum(axis=0)
+    util = mapa_ocupacion.utilizacion(np, total, ocurrencias, len(canchas))
+
+    franja = slice(estadisticas.HORA_APERTURA, estadisticas.HORA_CIERRE)
+    capacidad_franja = float(ocurrencias.sum()) * (franja.stop - franja.start) * len(canchas)
+    util_franja = float(total[:, franja].sum()) / capacidad_franja * 100 if capacidad_franja else 0.0
+
+    out = {
+        "desde": desde.date(),
+        "hasta": (hasta - timedelta(days=1)).date(),
+        "semanas": semanas,
+        "dias": mapa_ocupacion.DIAS,
+        "horas": np.round(total, 2).tolist(),
+        "utilizacion": np.round(util, 1).tolist(),
+        "utilizacion_franja": round(util_franja, 1),
+        "canchas": len(canchas),
+    }
+    if por_cancha:
+        out["por_cancha"] = [
+            {
+                "cancha_id": c.id,
+                "nombre": c.nombre,
+                "horas": np.round(horas[i], 2).tolist(),
+                "utilizacion": np.round(mapa_ocupacion.utilizacion(np, horas[i], ocurrencias), 1).tolist(),
+            }
+            for i, c in enumerate(canchas)
+        ]
+    return out
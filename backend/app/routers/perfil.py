@@ -5,7 +5,9 @@ import uuid
 from datetime import datetime, timedelta, timezone
 import math
 
+from app.core import planes
 from app.core.deps import get_db, get_usuario_actual
+from app.core.metricas import UPLOADS
 from app.modelos.modelos import User, Suscripcion, Plan
 from app.esquemas.panel import PerfilOut, PerfilUpdate, PlanActualOut
 
@@ -69,6 +71,7 @@ async def subir_avatar(
     db.add(u)
     db.commit()
     db.refresh(u)
+    UPLOADS.labels("avatar").inc()
 
     return {"avatar_url": u.avatar_url}
 
@@ -76,63 +79,25 @@ async def subir_avatar(
 def mi_plan(db: Session = Depends(get_db), u: User = Depends(get_usuario_actual)):
     now = datetime.now(timezone.utc)
 
-    fila = (
-        db.query(Suscripcion, Plan)
-        .join(Plan, Plan.id == Suscripcion.plan_id)
-        .filter(Suscripcion.user_id == u.id)
-        .order_by(Suscripcion.inicio.desc())
-        .first()
-    )
-
-    # si no hay suscripción, devolvemos FREE por código (o id=1 si existe)
-    if not fila:
-        p = db.query(Plan).filter(Plan.codigo == "free").first() or db.query(Plan).filter(Plan.id == 1).first()
-        if not p:
-            raise HTTPException(status_code=500, detail="No existe el plan FREE")
-        return PlanActualOut(plan_id=p.id, plan_codigo=p.codigo, plan_nombre=p.nombre, estado="activa")
-
-    s, p = fila
-
-    # si estaba en trial y venció, lo bajamos a FREE
-    if s.fin and s.fin <= now and s.estado == "activa":
-        s.estado = "cancelada"
-        db.add(s)
-
-        free = db.query(Plan).filter(Plan.codigo == "free").first() or db.query(Plan).filter(Plan.id == 1).first()
-        if not free:
-            raise HTTPException(status_code=500, detail="No existe el plan FREE")
-
-        nuevo = Suscripcion(
-            user_id=u.id,
-            plan_id=free.id,
-            estado="activa",
-            inicio=now,
-        )
-        db.add(nuevo)
-
-        db.commit()
-        db.refresh(nuevo)
-
-        return PlanActualOut(
-            plan_id=free.id,
-            plan_codigo=free.codigo,
-            plan_nombre=free.nombre,
-            estado=nuevo.estado,
-            inicio=nuevo.inicio,
-            fin=nuevo.fin,
-        )
+    # ✅ solo lectura: plan efectivo cacheado (app/core/planes.py); una suscripción
+    # vencida ya resuelve a FREE y el barrido (app/core/suscripciones.py) la da de baja
+    ep = planes.plan_efectivo(db, u.id)
+    if ep is None:
+        raise HTTPException(status_code=500, detail="No existe el plan FREE")
+    if ep.suscripcion_id is None:
+        return PlanActualOut(plan_id=ep.plan_id, plan_codigo=ep.codigo, plan_nombre=ep.nombre, estado="activa")
 
     dias = None
-    if s.fin:
-        dias = max(0, math.ceil((s.fin - now).total_seconds() / 86400))
+    if ep.fin:
+        dias = max(0, math.ceil((ep.fin - now).total_seconds() / 86400))
 
     return PlanActualOut(
-        plan_id=p.id,
-        plan_codigo=p.codigo,
-        plan_nombre=p.nombre,
-        estado=s.estado,
-        inicio=s.inicio,
-        fin=s.fin,
+        plan_id=ep.plan_id,
+        plan_codigo=ep.codigo,
+        plan_nombre=ep.nombre,
+        estado=ep.estado,
+        inicio=ep.inicio,
+        fin=ep.fin,
         dias_restantes=dias,
     )
 
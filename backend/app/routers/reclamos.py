@@ -1,10 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import case, update
 from sqlalchemy.orm import Session
 from datetime import datetime, timezone
+from typing import Optional
 
+from app.core.config import settings
 from app.core.deps import get_db, require_role, get_usuario_actual
+from app.core.paginacion import NEXT_CURSOR_HEADER, codificar_cursor, decodificar_cursor
 from app.modelos.modelos import ReclamoCancha, Cancha, User
-from app.esquemas.esquemas import ReclamoCrear, ReclamoOut, ReclamoResolver
+from app.esquemas.esquemas import (
+    ReclamoCrear,
+    ReclamoEstado,
+    ReclamoOut,
+    ReclamoResolver,
+    ReclamoResolverItem,
+    ReclamosResolverLote,
+)
 
 router = APIRouter(prefix="/reclamos", tags=["reclamos"])
 
@@ -27,31 +38,115 @@ def crear_reclamo(payload: ReclamoCrear, db: Session = Depends(get_db), u=Depend
     return r
 
 @router.get("", response_model=list[ReclamoOut], dependencies=[Depends(require_role("admin"))])
-def listar(db: Session = Depends(get_db)):
-    return db.query(ReclamoCancha).order_by(ReclamoCancha.id.desc()).all()
+def listar(
+    response: Response,
+    estado: Optional[ReclamoEstado] = None,
+    cancha_id: Optional[int] = None,
+    solicitante_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    db: Session = Depends(get_db),
+):
+    # ✅ cola paginada (más recientes primero, keyset sobre id; siguiente página en X-Next-Cursor)
+    q = db.query(ReclamoCancha)
+    if estado:
+        q = q.filter(ReclamoCancha.estado == estado)
+    if cancha_id is not None:
+        q = q.filter(ReclamoCancha.cancha_id == cancha_id)
+    if solicitante_id is not None:
+        q = q.filter(ReclamoCancha.solicitante_id == solicitante_id)
+    if cursor:
+        (ultimo_id,) = decodificar_cursor(cursor, int)
+        q = q.filter(ReclamoCancha.id < ultimo_id)
+
+    limit = limit or settings.RECLAMOS_PAGE_SIZE
+    rows = q.order_by(ReclamoCancha.id.desc()).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = codificar_cursor(rows[-1].id)
+    return rows
+
+
+def _resolver(db: Session, items: list[ReclamoResolverItem], admin, solo_pendientes: bool) -> list[int]:
+    """
+    Resuelve varios reclamos en la transacción de `db`: valida todo con una
+    query por tabla y aplica estados y nuevos dueños con UPDATEs por conjunto.
+    """
+    ids = [i.id for i in items]
+    if len(set(ids)) != len(ids):
+        raise HTTPException(400, "Reclamo repetido en el lote")
+
+    reclamos = dict(
+        db.query(ReclamoCancha.id, ReclamoCancha.cancha_id).filter(ReclamoCancha.id.in_(ids)).all()
+    )
+    faltan = [i for i in ids if i not in reclamos]
+    if faltan:
+        raise HTTPException(404, f"Reclamo no encontrado: {faltan}")
+    if solo_pendientes:
+        resueltos = [
+            rid
+            for (rid,) in db.query(ReclamoCancha.id).filter(
+                ReclamoCancha.id.in_(ids), ReclamoCancha.estado != "pendiente"
+            )
+        ]
+        if resueltos:
+            raise HTTPException(409, f"Reclamos ya resueltos: {resueltos}")
+
+    aprobados = [i for i in items if i.estado == "aprobado"]
+    if any(not i.nuevo_owner_id for i in aprobados):
+        raise HTTPException(400, "Falta nuevo_owner_id para aprobar")
+    nuevos_duenos: dict[int, int] = {}
+    for i in aprobados:
+        cancha_id = reclamos[i.id]
+        if nuevos_duenos.get(cancha_id, i.nuevo_owner_id) != i.nuevo_owner_id:
+            raise HTTPException(400, f"Dos dueños distintos para la cancha {cancha_id}")
+        nuevos_duenos[cancha_id] = i.nuevo_owner_id
+
+    if nuevos_duenos:
+        roles = dict(db.query(User.id, User.role).filter(User.id.in_(set(nuevos_duenos.values()))).all())
+        for owner_id in set(nuevos_duenos.values()):
+            if owner_id not in roles:
+                raise HTTPException(404, "Dueño no existe")
+            if roles[owner_id] not in ("propietario", "admin"):
+                raise HTTPException(400, "Usuario no es propietario")
+
+    ahora = datetime.now(timezone.utc)
+    for estado in ("aprobado", "rechazado"):
+        del_estado = [i.id for i in items if i.estado == estado]
+        if del_estado:
+            condiciones = [ReclamoCancha.id.in_(del_estado)]
+            if solo_pendientes:
+                # el chequeo de arriba da el mensaje; esto cierra la carrera con otro admin
+                condiciones.append(ReclamoCancha.estado == "pendiente")
+            r = db.execute(
+                update(ReclamoCancha)
+                .where(*condiciones)
+                .values(estado=estado, resuelto_por=admin.id, resuelto_en=ahora)
+                .execution_options(synchronize_session=False)
+            )
+            if solo_pendientes and r.rowcount != len(del_estado):
+                db.rollback()
+                raise HTTPException(409, "Otro admin resolvió alguno de estos reclamos; reintentar")
+    if nuevos_duenos:
+        db.execute(
+            update(Cancha)
+            .where(Cancha.id.in_(list(nuevos_duenos)))
+            .values(owner_id=case(nuevos_duenos, value=Cancha.id))
+            .execution_options(synchronize_session=False)
+        )
+    return ids
+
+
+@router.post("/resolver", response_model=list[ReclamoOut], dependencies=[Depends(require_role("admin"))])
+def resolver_lote(payload: ReclamosResolverLote, db: Session = Depends(get_db), admin=Depends(get_usuario_actual)):
+    """Aprueba o rechaza varios reclamos pendientes en una sola transacción (todo o nada)."""
+    ids = _resolver(db, payload.reclamos, admin, solo_pendientes=True)
+    db.commit()
+    return db.query(ReclamoCancha).filter(ReclamoCancha.id.in_(ids)).order_by(ReclamoCancha.id.desc()).all()
+
 
 @router.patch("/{reclamo_id}", response_model=ReclamoOut, dependencies=[Depends(require_role("admin"))])
 def resolver(reclamo_id: int, payload: ReclamoResolver, db: Session = Depends(get_db), admin=Depends(get_usuario_actual)):
-    r = db.query(ReclamoCancha).filter(ReclamoCancha.id == reclamo_id).first()
-    if not r:
-        raise HTTPException(404, "Reclamo no encontrado")
-
-    r.estado = payload.estado
-    r.resuelto_por = admin.id
-    r.resuelto_en = datetime.now(timezone.utc)
-
-    if payload.estado == "aprobado":
-        if not payload.nuevo_owner_id:
-            raise HTTPException(400, "Falta nuevo_owner_id para aprobar")
-        owner = db.query(User).filter(User.id == payload.nuevo_owner_id).first()
-        if not owner:
-            raise HTTPException(404, "Dueño no existe")
-        if owner.role not in ("propietario","admin"):
-            raise HTTPException(400, "Usuario no es propietario")
-
-        cancha = db.query(Cancha).filter(Cancha.id == r.cancha_id).first()
-        cancha.owner_id = payload.nuevo_owner_id
-
+    _resolver(db, [ReclamoResolverItem(id=reclamo_id, **payload.model_dump())], admin, solo_pendientes=False)
     db.commit()
-    db.refresh(r)
-    return r
+    return db.query(ReclamoCancha).filter(ReclamoCancha.id == reclamo_id).first()
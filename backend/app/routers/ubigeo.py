@@ -1,53 +1,98 @@
+import json
 import logging
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Query, Request, Response
 
-from app.core.deps import get_db
-from app.modelos.modelos import UbigeoDepartment, UbigeoProvince, UbigeoDistrict
-from app.esquemas.esquemas import UbigeoDepartmentOut, UbigeoProvinceOut, UbigeoDistrictOut
+from app.core.metricas import CACHE
+from app.core.ubigeo_snapshot import EMPTY_JSON, get_snapshot_async
+from app.esquemas.esquemas import (
+    UbigeoDepartmentOut,
+    UbigeoProvinceOut,
+    UbigeoDistrictOut,
+    UbigeoArbolOut,
+    UbigeoBusquedaOut,
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/ubigeo", tags=["ubigeo"])
 
+# La data solo cambia con /admin/ubigeo/import; el ETag cambia con cada snapshot.
+# Las rutas son async: sirven bytes ya serializados sin pasar por el threadpool.
+CACHE_CONTROL = "public, max-age=3600"
+
+
+def _json_response(request: Request, body: bytes, etag: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if request.headers.get("if-none-match") == etag:
+        CACHE.labels("ubigeo_etag", "hit").inc()
+        return Response(status_code=304, headers=headers)
+    CACHE.labels("ubigeo_etag", "miss").inc()
+    return Response(content=body, media_type="application/json", headers=headers)
+
 
 @router.get("/departamentos", response_model=list[UbigeoDepartmentOut])
-def listar_departamentos(db: Session = Depends(get_db)):
-    result = db.query(UbigeoDepartment).order_by(UbigeoDepartment.name.asc()).all()
-    if not result:
+async def listar_departamentos(request: Request):
+    snap = await get_snapshot_async()
+    if snap.is_empty:
         logger.warning("Ubigeo: no se encontraron departamentos")
-    return result
+    return _json_response(request, snap.departamentos_json, snap.etag("dep"))
 
 
 @router.get("/provincias", response_model=list[UbigeoProvinceOut])
-def listar_provincias(
+async def listar_provincias(
+    request: Request,
     department_id: str = Query(..., min_length=2, max_length=2),
-    db: Session = Depends(get_db),
 ):
-    result = (
-        db.query(UbigeoProvince)
-        .filter(UbigeoProvince.department_id == department_id)
-        .order_by(UbigeoProvince.name.asc())
-        .all()
-    )
-    if not result:
+    snap = await get_snapshot_async()
+    body = snap.provincias_json.get(department_id)
+    if body is None:
         logger.warning("Ubigeo: no se encontraron provincias para %s", department_id)
-    return result
+        body = EMPTY_JSON
+    return _json_response(request, body, snap.etag(f"prov-{department_id}"))
 
 
 @router.get("/distritos", response_model=list[UbigeoDistrictOut])
-def listar_distritos(
+async def listar_distritos(
+    request: Request,
     province_id: str = Query(..., min_length=4, max_length=4),
-    db: Session = Depends(get_db),
 ):
-    # OJO: tu tabla permite NULL, así que filtramos por provincia_id
-    result = (
-        db.query(UbigeoDistrict)
-        .filter(UbigeoDistrict.province_id == province_id)
-        .order_by(UbigeoDistrict.name.asc().nullslast())
-        .all()
-    )
-    if not result:
+    snap = await get_snapshot_async()
+    body = snap.distritos_json.get(province_id)
+    if body is None:
         logger.warning("Ubigeo: no se encontraron distritos para %s", province_id)
-    return result
+        body = EMPTY_JSON
+    return _json_response(request, body, snap.etag(f"dist-{province_id}"))
+
+
+@router.get("/arbol", response_model=list[UbigeoArbolOut])
+async def arbol_ubigeo(request: Request):
+    """
+    Árbol completo departamento > provincia > distrito en una sola respuesta.
+    Se sirve ya comprimido (gzip precalculado) si el cliente lo acepta.
+    """
+    snap = await get_snapshot_async()
+    etag = snap.etag("arbol")
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    if request.headers.get("if-none-match") == etag:
+        CACHE.labels("ubigeo_etag", "hit").inc()
+        return Response(status_code=304, headers=headers)
+    CACHE.labels("ubigeo_etag", "miss").inc()
+    if snap.arbol_gzip and "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=snap.arbol_gzip, media_type="application/json", headers=headers)
+    return Response(content=snap.arbol_json, media_type="application/json", headers=headers)
+
+
+@router.get("/buscar", response_model=list[UbigeoBusquedaOut])
+async def buscar_ubigeo(
+    q: str = Query(..., min_length=1, max_length=60),
+    limit: int = Query(20, ge=1, le=50),
+):
+    snap = await get_snapshot_async()
+    body = json.dumps(snap.buscar(q, limit=limit), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"Cache-Control": CACHE_CONTROL},
+    )
@@ -0,0 +1,74 @@
+import logging
+from pathlib import Path
+
+from app.core.images import image_placeholder
+from app.db.conexion import SessionLocal
+from app.modelos.modelos import CanchaImagen, Complejo, ComplejoImagen
+
+logger = logging.getLogger(__name__)
+
+UPLOADS_DIR = Path("uploads")
+
+
+def _local_path(url: str | None) -> Path | None:
+    """
+    Traduce una URL guardada en BD (/uploads/..., /static/... o absoluta)
+    al archivo dentro de la carpeta uploads/.
+    """
+    if not url:
+        return None
+    for prefix in ("/uploads/", "/static/"):
+        idx = url.find(prefix)
+        if idx >= 0:
+            return UPLOADS_DIR / url[idx + len(prefix):]
+    return None
+
+
+def _meta_for(url: str | None) -> dict | None:
+    path = _local_path(url)
+    if not path or not path.is_file():
+        return None
+    try:
+        return image_placeholder(path.read_bytes())
+    except Exception as exc:
+        logger.warning("No se pudo generar placeholder para %s: %s", path, exc)
+        return None
+
+
+def backfill_placeholders() -> dict[str, int]:
+    stats = {"cancha_imagenes": 0, "complejo_imagenes": 0, "complejos": 0}
+
+    with SessionLocal() as db:
+        for model, key in ((CanchaImagen, "cancha_imagenes"), (ComplejoImagen, "complejo_imagenes")):
+            for img in db.query(model).filter(model.placeholder.is_(None)).all():
+                meta = _meta_for(img.url)
+                if not meta:
+                    continue
+                img.placeholder = meta["placeholder"]
+                img.ancho = meta["ancho"]
+                img.alto = meta["alto"]
+                stats[key] += 1
+
+        for c in db.query(Complejo).filter(Complejo.foto_url.isnot(None), Complejo.foto_placeholder.is_(None)).all():
+            meta = _meta_for(c.foto_url)
+            if not meta:
+                continue
+            c.foto_placeholder = meta["placeholder"]
+            c.foto_ancho = meta["ancho"]
+            c.foto_alto = meta["alto"]
+            stats["complejos"] += 1
+
+        db.commit()
+
+    logger.info(
+        "Placeholders generados: cancha_imagenes=%d complejo_imagenes=%d complejos=%d",
+        stats["cancha_imagenes"],
+        stats["complejo_imagenes"],
+        stats["complejos"],
+    )
+    return stats
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    backfill_placeholders()
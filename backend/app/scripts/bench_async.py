@@ -0,0 +1,107 @@
+"""
+Benchmark sync vs async para las lecturas públicas.
+
+Monta en proceso dos rutas con la misma query (`/canchas` del catálogo):
+una con Session sync (threadpool) y otra con AsyncSession, y las golpea con
+N requests concurrentes vía httpx (ASGITransport, sin red de por medio).
+Necesita una DATABASE_URL de Postgres con datos; imprime JSON:
+
+    python -m app.scripts.bench_async --requests 2000 --concurrency 200
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.deps import get_async_db, get_db
+from app.db.conexion import engine, get_async_engine
+from app.esquemas.esquemas import CanchaOut
+from app.modelos.modelos import Cancha, Complejo
+
+
+def _query():
+    return (
+        select(Cancha)
+        .options(
+            joinedload(Cancha.complejo).joinedload(Complejo.owner),
+            joinedload(Cancha.imagenes),
+        )
+        .order_by(Cancha.id.desc())
+    )
+
+
+bench_app = FastAPI()
+
+
+@bench_app.get("/sync", response_model=list[CanchaOut])
+def canchas_sync(db: Session = Depends(get_db)):
+    return db.execute(_query()).unique().scalars().all()
+
+
+@bench_app.get("/async", response_model=list[CanchaOut])
+async def canchas_async(db: AsyncSession = Depends(get_async_db)):
+    return (await db.execute(_query())).unique().scalars().all()
+
+
+async def _run(path: str, total: int, concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=bench_app)
+    latencies: list[float] = []
+    errores = 0
+    sem = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        await client.get(path)  # warm-up (pool + caches)
+
+        async def one() -> None:
+            nonlocal errores
+            async with sem:
+                t0 = time.perf_counter()
+                resp = await client.get(path)
+                latencies.append((time.perf_counter() - t0) * 1000)
+                if resp.status_code != 200:
+                    errores += 1
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - t0
+
+    latencies.sort()
+    q = statistics.quantiles(latencies, n=100)
+    return {
+        "path": path,
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errores,
+        "rps": round(total / elapsed, 1),
+        "p50_ms": round(q[49], 2),
+        "p95_ms": round(q[94], 2),
+        "p99_ms": round(q[98], 2),
+    }
+
+
+async def _main(args) -> None:
+    results = []
+    for path in ("/sync", "/async"):
+        results.append(await _run(path, args.requests, args.concurrency))
+    await get_async_engine().dispose()
+    engine.dispose()
+    print(json.dumps(results, indent=2))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Benchmark de los endpoints calientes con concurrencia fija.
+
+Pensado para correr contra un uvicorn local con Postgres y el dataset de
+`app.scripts.seed_bench`. Imprime (o guarda) JSON con p50/p95/p99 y throughput
+por escenario, para poder comparar entre commits:
+
+    python -m app.scripts.seed_bench --reset
+    uvicorn app.main:app --port 8000 &
+    python -m app.scripts.bench_endpoints --requests 500 --concurrency 50 --out bench.json
+    python -m app.scripts.bench_endpoints --baseline bench.json     # agrega delta_pct
+
+Con --in-process usa la app directamente (httpx ASGITransport), sin red.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import httpx
+
+from app.scripts.seed_bench import BENCH_PASSWORD, BENCH_SLUG_PREFIX, owner_email
+
+ESCENARIOS = ("canchas", "complejos", "complejo_perfil", "horarios", "panel_reservas", "login")
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except Exception:
+        return None
+
+
+async def _login(client: httpx.AsyncClient, email: str) -> httpx.Response:
+    return await client.post("/auth/login", data={"username": email, "password": BENCH_PASSWORD})
+
+
+async def _contexto(client: httpx.AsyncClient) -> dict:
+    """Slugs, ids de cancha y token de propietario sacados del propio API."""
+    complejos = (await client.get("/complejos")).json()
+    bench = [c for c in complejos if c["slug"].startswith(BENCH_SLUG_PREFIX)] or complejos
+    if not bench:
+        raise SystemExit("No hay complejos: corre primero python -m app.scripts.seed_bench")
+    resp = await _login(client, owner_email(0))
+    if resp.status_code != 200:
+        raise SystemExit(f"Login de {owner_email(0)} falló ({resp.status_code}); ¿se sembró el dataset bench?")
+    return {
+        "slugs": [c["slug"] for c in bench],
+        "cancha_ids": [k["id"] for c in bench for k in c.get("canchas", [])],
+        "owner_headers": {"Authorization": f"Bearer {resp.json()['access_token']}"},
+        "complejos_total": len(complejos),
+    }
+
+
+def _request(nombre: str, ctx: dict, rng: random.Random):
+    hoy = date.today()
+    if nombre == "canchas":
+        return lambda c: c.get("/canchas")
+    if nombre == "complejos":
+        return lambda c: c.get("/complejos")
+    if nombre == "complejo_perfil":
+        return lambda c: c.get(f"/public/complejos/{rng.choice(ctx['slugs'])}")
+    if nombre == "horarios":
+        def horarios(c):
+            fecha = hoy + timedelta(days=rng.randint(-7, 7))
+            return c.get(f"/public/canchas/{rng.choice(ctx['cancha_ids'])}/horarios", params={"fecha": fecha.isoformat()})
+        return horarios
+    if nombre == "panel_reservas":
+        def panel(c):
+            inicio = hoy - timedelta(days=rng.randint(0, 30))
+            params = {"fecha_inicio": inicio.isoformat(), "fecha_fin": (inicio + timedelta(days=7)).isoformat()}
+            return c.get("/panel/reservas", params=params, headers=ctx["owner_headers"])
+        return panel
+    if nombre == "login":
+        return lambda c: _login(c, owner_email(rng.randrange(5)))
+    raise ValueError(nombre)
+
+
+def _resumen(latencias: list[float], errores: int, elapsed: float) -> dict:
+    latencias = sorted(latencias)
+    q = statistics.quantiles(latencias, n=100, method="inclusive") if len(latencias) > 1 else latencias * 99
+    return {
+        "requests": len(latencias),
+        "errors": errores,
+        "rps": round(len(latencias) / elapsed, 2) if elapsed else None,
+        "mean_ms": round(statistics.fmean(latencias), 2),
+        "p50_ms": round(q[49], 2),
+        "p95_ms": round(q[94], 2),
+        "p99_ms": round(q[98], 2),
+        "max_ms": round(latencias[-1], 2),
+    }
+
+
+async def _escenario(client, hacer, total: int, concurrency: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        await hacer(client)
+
+    latencias: list[float] = []
+    errores = 0
+    pendientes = iter(range(total))
+
+    async def worker() -> None:
+        nonlocal errores
+        for _ in pendientes:
+            t0 = time.perf_counter()
+            try:
+                resp = await hacer(client)
+                ok = resp.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            latencias.append((time.perf_counter() - t0) * 1000)
+            if not ok:
+                errores += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return _resumen(latencias, errores, time.perf_counter() - t0)
+
+
+def _deltas(actual: dict, baseline: dict) -> dict:
+    out = {}
+    for nombre, r in actual.items():
+        base = baseline.get(nombre)
+        if not base:
+            continue
+        out[nombre] = {
+            k: round((r[k] - base[k]) / base[k] * 100, 1)
+            for k in ("rps", "p50_ms", "p95_ms", "p99_ms")
+            if r.get(k) is not None and base.get(k)
+        }
+    return out
+
+
+async def _main(args) -> dict:
+    if args.in_process:
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        client = httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=args.timeout)
+    else:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits)
+
+    rng = random.Random(args.seed)
+    async with client:
+        ctx = await _contexto(client)
+        resultados = {}
+        for nombre in args.escenarios:
+            total = args.login_requests if nombre == "login" else args.requests
+            resultados[nombre] = await _escenario(
+                client, _request(nombre, ctx, rng), total, args.concurrency, args.warmup
+            )
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": int(time.time()),
+            "python": platform.python_version(),
+            "target": "in-process" if args.in_process else args.base_url,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "seed": args.seed,
+            "dataset": {"complejos": ctx["complejos_total"], "canchas_bench": len(ctx["cancha_ids"])},
+        },
+        "results": resultados,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de endpoints calientes")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--in-process", action="store_true")
+    parser.add_argument("--requests", type=int, default=500, help="requests por escenario")
+    parser.add_argument("--login-requests", type=int, default=100, help="login es caro (bcrypt)")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--escenarios", nargs="+", choices=ESCENARIOS, default=list(ESCENARIOS))
+    parser.add_argument("--out", type=Path, default=None)
+    parser.add_argument("--baseline", type=Path, default=None, help="JSON previo para calcular delta_pct")
+    args = parser.parse_args()
+
+    reporte = asyncio.run(_main(args))
+    if args.baseline:
+        reporte["delta_pct"] = _deltas(reporte["results"], json.loads(args.baseline.read_text())["results"])
+
+    texto = json.dumps(reporte, indent=2, ensure_ascii=False)
+    if args.out:
+        args.out.write_text(texto + "\n", encoding="utf-8")
+    print(texto)
+
+
+if __name__ == "__main__":
+    main()
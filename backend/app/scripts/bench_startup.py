@@ -0,0 +1,60 @@
+"""
+Benchmark de arranque en frío: import de app.main + startup + primer request.
+
+Cada corrida es un proceso nuevo (como un wake-up en Render free).
+Imprime JSON para poder comparar entre commits:
+
+    python -m app.scripts.bench_startup --runs 5 --path /healthz
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+_CHILD = r"""
+import json, time
+t0 = time.perf_counter()
+import app.main
+t1 = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:
+    t2 = time.perf_counter()
+    resp = client.get(PATH)
+    t3 = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "startup_ms": (t2 - t1) * 1000,
+    "first_request_ms": (t3 - t2) * 1000,
+    "total_ms": (t3 - t0) * 1000,
+    "status": resp.status_code,
+}))
+"""
+
+
+def _run_once(path: str) -> dict:
+    code = f"PATH = {path!r}\n" + _CHILD
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--path", default="/healthz")
+    args = parser.parse_args()
+
+    runs = [_run_once(args.path) for _ in range(args.runs)]
+    summary = {
+        key: {
+            "median": round(statistics.median(r[key] for r in runs), 2),
+            "min": round(min(r[key] for r in runs), 2),
+            "max": round(max(r[key] for r in runs), 2),
+        }
+        for key in ("import_ms", "startup_ms", "first_request_ms", "total_ms")
+    }
+    print(json.dumps({"path": args.path, "runs": args.runs, "summary": summary}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
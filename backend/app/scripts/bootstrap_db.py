@@ -1,4 +1,7 @@
+import argparse
 import csv
+import gzip
+import hashlib
 import logging
 import urllib.request
 import urllib.error
@@ -6,20 +9,25 @@ from io import StringIO
 from pathlib import Path
 from typing import Iterable, Mapping
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
 
 from app.core.config import settings
-from app.db.conexion import normalize_db_url
+from app.core.ubigeo_snapshot import CHECKSUM_EXTERNO
+from app.db.conexion import engine as default_engine
 
 logger = logging.getLogger(__name__)
 
+DATA_DIR = Path(__file__).resolve().parents[2] / "data"
 DATA_FILE_NAME = "Lista_Ubigeos_INEI.csv"
-LOCAL_DATA_PATH = Path(__file__).resolve().parents[2] / "data" / DATA_FILE_NAME
-REMOTE_URL_FALLBACK = "https://raw.githubusercontent.com/pe-datos/ubigeo/master/ubigeo.csv"
+LOCAL_DATA_PATH = DATA_DIR / DATA_FILE_NAME
 
+# Dataset versionado incluido en el repo (INEI: 25 departamentos, 196 provincias, 1893 distritos).
+# Si cambias el archivo, sube la versión: el checksum hace que se vuelva a aplicar.
+BUNDLED_DATA_VERSION = "inei-v1"
+BUNDLED_DATA_PATH = DATA_DIR / "ubigeo_inei_v1.csv.gz"
 
-def _normalize_db_url() -> str:
-    return normalize_db_url(settings.DATABASE_URL)
+REMOTE_URL_FALLBACK = "https://raw.githubusercontent.com/pe-datos/ubigeo/master/ubigeo.csv"
 
 
 def _get_remote_url() -> str | None:
@@ -54,17 +62,21 @@ def _create_tables(conn):
         """,
         "CREATE INDEX IF NOT EXISTS idx_ubigeo_provinces_department ON ubigeo_peru_provinces (department_id)",
         "CREATE INDEX IF NOT EXISTS idx_ubigeo_districts_province ON ubigeo_peru_districts (province_id)",
+        """
+        CREATE TABLE IF NOT EXISTS ubigeo_dataset (
+            id SMALLINT PRIMARY KEY DEFAULT 1,
+            version VARCHAR(40) NOT NULL,
+            checksum VARCHAR(64) NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        )
+        """,
     ]
 
     for sql in statements:
         conn.execute(text(sql))
 
 
-def _maybe_load_source_text() -> str:
-    if LOCAL_DATA_PATH.exists():
-        logger.info("Loading ubigeo data from local file %s", LOCAL_DATA_PATH)
-        return LOCAL_DATA_PATH.read_text(encoding="utf-8", errors="ignore")
-
+def _download_source_text() -> str:
     remote_url = _get_remote_url()
     if not remote_url:
         logger.warning("No ubigeo source URL configured; skipping download.")
@@ -82,6 +94,35 @@ def _maybe_load_source_text() -> str:
         return ""
 
 
+def _load_source(allow_download: bool) -> tuple[str, str, str]:
+    """
+    Devuelve (texto CSV, versión, checksum sha256).
+    Prioridad: CSV local en backend/data > dataset versionado incluido > descarga (solo CLI).
+    """
+    if LOCAL_DATA_PATH.exists():
+        logger.info("Loading ubigeo data from local file %s", LOCAL_DATA_PATH)
+        raw = LOCAL_DATA_PATH.read_bytes()
+        return raw.decode("utf-8", errors="ignore"), "local", hashlib.sha256(raw).hexdigest()
+
+    if BUNDLED_DATA_PATH.exists():
+        raw = BUNDLED_DATA_PATH.read_bytes()
+        content = gzip.decompress(raw).decode("utf-8")
+        return content, BUNDLED_DATA_VERSION, hashlib.sha256(raw).hexdigest()
+
+    if not allow_download:
+        logger.warning("No local ubigeo dataset found and download is disabled; skipping import.")
+        return "", "", ""
+
+    content = _download_source_text()
+    return content, "remote", hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _dataset_checksum(path: Path) -> str | None:
+    if not path.exists():
+        return None
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
 def _extract_code(row: Mapping[str, str]) -> str | None:
     for key in ("ubigeo", "codigo", "codigo_ubigeo", "cod_ubigeo", "ID", "id"):
         value = row.get(key) or row.get(key.upper())
@@ -189,65 +230,98 @@ def _insert_data(conn, departments, provinces, districts):
         """
     )
 
-    dept_count = 0
-    for dept_id, name in departments.items():
-        if not dept_id or not name:
-            continue
-        conn.execute(insert_dept, {"id": dept_id, "name": name})
-        dept_count += 1
+    dept_rows = [
+        {"id": dept_id, "name": name}
+        for dept_id, name in departments.items()
+        if dept_id and name
+    ]
+    prov_rows = [
+        {"id": prov_id, "department_id": dept_id, "name": name}
+        for prov_id, (name, dept_id) in provinces.items()
+        if prov_id and name and dept_id
+    ]
+    dist_rows = [
+        {"id": dist_id, "province_id": prov_id, "department_id": dept_id, "name": name or None}
+        for dist_id, (name, prov_id, dept_id) in districts.items()
+        if dist_id and (prov_id or dept_id)
+    ]
 
-    prov_count = 0
-    for prov_id, (name, dept_id) in provinces.items():
-        if not prov_id or not name or not dept_id:
-            continue
-        conn.execute(insert_prov, {"id": prov_id, "department_id": dept_id, "name": name})
-        prov_count += 1
-
-    dist_count = 0
-    for dist_id, (name, prov_id, dept_id) in districts.items():
-        if not dist_id or not (prov_id or dept_id):
-            continue
-        conn.execute(
-            insert_dist,
-            {
-                "id": dist_id,
-                "province_id": prov_id,
-                "department_id": dept_id,
-                "name": name or None,
-            },
-        )
-        dist_count += 1
+    # executemany: psycopg3 los envía en pipeline, sin un round-trip por fila
+    if dept_rows:
+        conn.execute(insert_dept, dept_rows)
+    if prov_rows:
+        conn.execute(insert_prov, prov_rows)
+    if dist_rows:
+        conn.execute(insert_dist, dist_rows)
 
+    dept_count, prov_count, dist_count = len(dept_rows), len(prov_rows), len(dist_rows)
     logger.info("Ubigeo data applied: departments=%d, provinces=%d, districts=%d", dept_count, prov_count, dist_count)
 
 
-def bootstrap_ubigeo() -> None:
-    db_url = _normalize_db_url()
-    engine = create_engine(db_url, future=True, pool_pre_ping=True)
+def bootstrap_ubigeo(engine: Engine | None = None, *, allow_download: bool = False, force: bool = False) -> bool:
+    """
+    Siembra ubigeo desde el dataset local. Devuelve True si aplicó datos.
+    El arranque solo compara el checksum guardado en `ubigeo_dataset` (una fila)
+    con el del archivo: si coincide no parsea ni inserta nada. Tampoco siembra si
+    el catálogo vino de un import (CHECKSUM_EXTERNO), salvo con `force`.
+    """
+    engine = engine or default_engine
+
+    local_checksum = _dataset_checksum(LOCAL_DATA_PATH) or _dataset_checksum(BUNDLED_DATA_PATH)
 
     with engine.begin() as conn:
         _create_tables(conn)
-        existing = conn.scalar(text("SELECT COUNT(1) FROM ubigeo_peru_departments"))
-        if existing and existing > 0:
-            logger.info("Ubigeo already seeded (%d departments)", existing)
-            return
-
-    content = _maybe_load_source_text()
+        applied = conn.scalar(text("SELECT checksum FROM ubigeo_dataset WHERE id = 1"))
+        if not force and applied and applied == local_checksum:
+            logger.info("Ubigeo dataset already applied (%s)", applied[:12])
+            return False
+        if not force and applied == CHECKSUM_EXTERNO:
+            logger.info("Ubigeo managed by /admin/ubigeo/import; not seeding the bundled dataset (use --force)")
+            return False
+        if not force and local_checksum is None:
+            existing = conn.scalar(text("SELECT COUNT(1) FROM ubigeo_peru_departments"))
+            if existing and existing > 0:
+                logger.info("Ubigeo already seeded (%d departments)", existing)
+                return False
+
+    content, version, checksum = _load_source(allow_download)
     parsed = _parse_rows(content)
     departments, provinces, districts = _gather_ubigeo(parsed)
 
     if not (departments or provinces or districts):
         logger.warning("No ubigeo data found to insert")
-        return
+        return False
 
     with engine.begin() as conn:
         _insert_data(conn, departments, provinces, districts)
+        conn.execute(
+            text(
+                """
+                INSERT INTO ubigeo_dataset (id, version, checksum, applied_at)
+                VALUES (1, :version, :checksum, NOW())
+                ON CONFLICT (id) DO UPDATE SET
+                    version = EXCLUDED.version,
+                    checksum = EXCLUDED.checksum,
+                    applied_at = EXCLUDED.applied_at
+                """
+            ),
+            {"version": version, "checksum": checksum},
+        )
+    return True
 
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Carga el catálogo ubigeo en la BD")
+    parser.add_argument("--force", action="store_true", help="Reaplica el dataset aunque el checksum coincida")
+    parser.add_argument(
+        "--allow-download",
+        action="store_true",
+        help="Si no hay dataset local, descarga desde UBIGEO_SOURCE_URL",
+    )
+    args = parser.parse_args()
     try:
-        bootstrap_ubigeo()
+        bootstrap_ubigeo(allow_download=args.allow_download, force=args.force)
     except Exception as exc:  # pragma: no cover
         logger.exception("Error bootstrapping ubigeo", exc_info=exc)
         raise
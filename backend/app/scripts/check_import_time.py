@@ -0,0 +1,73 @@
+"""
+Regresión de tiempo de import de la API usando `python -X importtime`.
+
+Falla (exit 1) si:
+- `import app.main` supera el presupuesto (--budget-ms), o
+- alguna dependencia pesada que debe cargarse lazy aparece en el arranque.
+
+    python -m app.scripts.check_import_time --budget-ms 1500
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+
+# dependencias que solo usan exportes/subidas: nunca deben importarse al arrancar
+LAZY_MODULES = ("openpyxl", "reportlab", "PIL")
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def measure(target: str = "app.main") -> tuple[float, dict[str, float]]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total_us = 0
+    cumulative: dict[str, float] = {}
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if not m:
+            continue
+        _, cum, _, name = m.groups()
+        cumulative[name] = int(cum) / 1000
+        if name == target:
+            total_us = int(cum)
+    return total_us / 1000, cumulative
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget-ms", type=float, default=1500)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    total_ms, cumulative = measure()
+    eager = sorted(
+        name for name in cumulative if name.split(".")[0] in LAZY_MODULES
+    )
+    top_level = {n: v for n, v in cumulative.items() if "." not in n}
+    top = sorted(top_level.items(), key=lambda kv: kv[1], reverse=True)[: args.top]
+
+    report = {
+        "import_ms": round(total_ms, 1),
+        "budget_ms": args.budget_ms,
+        "eager_heavy_modules": eager,
+        "top_level": [{"module": n, "ms": round(v, 1)} for n, v in top],
+    }
+    print(json.dumps(report, indent=2))
+
+    if eager:
+        print(f"ERROR: se importan al arrancar: {', '.join(sorted({e.split('.')[0] for e in eager}))}", file=sys.stderr)
+        return 1
+    if total_ms > args.budget_ms:
+        print(f"ERROR: import de app.main {total_ms:.0f} ms > presupuesto {args.budget_ms:.0f} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
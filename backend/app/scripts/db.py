@@ -0,0 +1,42 @@
+"""
+CLI de base de datos (migraciones y seeds fuera del arranque de la API).
+
+    python -m app.scripts.db status    # versión aplicada vs esperada
+    python -m app.scripts.db migrate   # aplica migraciones pendientes
+    python -m app.scripts.db seed      # planes base + catálogo ubigeo
+    python -m app.scripts.db setup     # migrate + seed (pre-deploy en Render)
+"""
+import argparse
+import logging
+import sys
+
+from app.db.conexion import engine
+from app.db.init_db import init_db, seed_db
+from app.db.migraciones import VERSION_ESPERADA, aplicar_migraciones, version_actual
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.scripts.db")
+    parser.add_argument("comando", choices=["status", "migrate", "seed", "setup"])
+    args = parser.parse_args(argv)
+
+    if args.comando == "status":
+        with engine.connect() as conn:
+            version = version_actual(conn)
+        print(f"schema_version={version} esperada={VERSION_ESPERADA}")
+        return 0 if version >= VERSION_ESPERADA else 1
+    if args.comando == "migrate":
+        aplicadas = aplicar_migraciones(engine)
+        logger.info("Migraciones aplicadas: %s", aplicadas or "ninguna")
+    elif args.comando == "seed":
+        seed_db()
+    else:
+        init_db()
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
@@ -0,0 +1,41 @@
+"""
+Mantenimiento del rollup de reservas (`reservas_diarias`).
+
+    python -m app.scripts.estadisticas reconciliar              # ventana por defecto (job nocturno)
+    python -m app.scripts.estadisticas reconciliar --dias-atras 90 --dias-adelante 180
+    python -m app.scripts.estadisticas reconciliar --todo
+
+Recalcula las celdas del rango desde `reservas` y reporta cuántas estaban mal.
+La ventana incluye fechas futuras porque las reservas se crean por adelantado.
+"""
+import argparse
+import json
+import logging
+import sys
+from datetime import date, timedelta
+
+from app.core.estadisticas import reconciliar
+from app.db.conexion import engine
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.scripts.estadisticas")
+    parser.add_argument("comando", choices=["reconciliar"])
+    parser.add_argument("--dias-atras", type=int, default=35)
+    parser.add_argument("--dias-adelante", type=int, default=120)
+    parser.add_argument("--todo", action="store_true", help="recalcula desde la reserva más antigua")
+    args = parser.parse_args(argv)
+
+    hoy = date.today()
+    desde = None if args.todo else hoy - timedelta(days=args.dias_atras)
+    hasta = None if args.todo else hoy + timedelta(days=args.dias_adelante)
+    with engine.begin() as conn:
+        resultado = reconciliar(conn, desde, hasta)
+
+    print(json.dumps({"desde": str(desde) if desde else None, "hasta": str(hasta) if hasta else None, **resultado}))
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
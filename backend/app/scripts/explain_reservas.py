@@ -0,0 +1,241 @@
+"""
+Chequeo de planes: las consultas calientes sobre `reservas` tienen que usar índices.
+
+Arma las mismas consultas que horarios públicos, crear_reserva (solape),
+/panel/reservas (por cancha, usuario y admin con keyset) y /panel/reservas/mes,
+corre EXPLAIN (Postgres) o EXPLAIN QUERY PLAN (SQLite) y falla (exit 1) si
+alguna recorre `reservas` secuencialmente o no usa uno de los índices esperados.
+
+Con `reservas` particionada cuentan los nodos de cada partición y sus índices
+se reportan con el nombre del índice padre.
+
+Con pocas filas Postgres prefiere un seq scan aunque el índice exista; córrelo
+sobre el dataset de `seed_bench`, o con --forzar-indices (enable_seqscan=off)
+para comprobar solo que el índice puede servir la consulta:
+
+    python -m app.scripts.seed_bench --reset
+    python -m app.scripts.explain_reservas
+    python -m app.scripts.explain_reservas --forzar-indices --json
+"""
+import argparse
+import json
+import re
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.db import particiones
+from app.db.conexion import engine
+from app.modelos.modelos import Cancha, Complejo, Reserva
+
+TABLA = "reservas"
+
+
+class _Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, stmt, prefijo: str):
+        self.stmt = stmt
+        self.prefijo = prefijo
+
+
+@compiles(_Explain)
+def _compilar_explain(element, compiler, **kw):
+    return f"{element.prefijo} {compiler.process(element.stmt, **kw)}"
+
+
+@dataclass
+class Caso:
+    nombre: str
+    stmt: object
+    esperados: set[str]
+
+
+def _casos(conn: Connection) -> list[Caso]:
+    fila = conn.execute(
+        select(Reserva.cancha_id, Reserva.cliente_id, Reserva.start_at, Cancha.owner_id)
+        .join(Cancha, Cancha.id == Reserva.cancha_id)
+        .where(Reserva.cliente_id.isnot(None))
+        .limit(1)
+    ).first()
+    if fila is None:
+        raise SystemExit("No hay reservas con cliente: corre primero python -m app.scripts.seed_bench")
+    cancha_id, cliente_id, cuando, owner_id = fila
+    dia = datetime(cuando.year, cuando.month, cuando.day)
+    mes = datetime(cuando.year, cuando.month, 1)
+
+    return [
+        Caso(
+            "horarios_dia / crear_reserva (solape)",
+            select(Reserva.start_at, Reserva.end_at).where(
+                Reserva.cancha_id == cancha_id,
+                Reserva.payment_status != "cancelada",
+                *particiones.solape(dia, dia + timedelta(days=1)),
+            ),
+            {"ix_reservas_cancha_activa", "ix_reservas_cancha_start"},
+        ),
+        Caso(
+            "panel_reservas por cancha (keyset)",
+            select(Reserva.id, Reserva.start_at)
+            .where(Reserva.cancha_id == cancha_id, Reserva.start_at >= dia)
+            .order_by(Reserva.start_at, Reserva.id)
+            .limit(201),
+            {"ix_reservas_cancha_start", "ix_reservas_cancha_activa"},
+        ),
+        Caso(
+            "panel_reservas usuario (historial)",
+            select(Reserva.id, Reserva.start_at)
+            .where(Reserva.cliente_id == cliente_id)
+            .order_by(Reserva.start_at, Reserva.id)
+            .limit(201),
+            {"ix_reservas_cliente_start"},
+        ),
+        Caso(
+            "panel_reservas admin (keyset)",
+            select(Reserva.id, Reserva.start_at)
+            .where(Reserva.start_at >= dia)
+            .order_by(Reserva.start_at, Reserva.id)
+            .limit(201),
+            {"ix_reservas_start_id"},
+        ),
+        Caso(
+            "panel_reservas propietario",
+            select(Reserva.id, Reserva.start_at)
+            .join(Cancha, Cancha.id == Reserva.cancha_id)
+            .join(Complejo, Complejo.id == Cancha.complejo_id)
+            .where(Complejo.owner_id == owner_id, Reserva.start_at >= dia, Reserva.start_at < dia + timedelta(days=7)),
+            {"ix_reservas_cancha_start", "ix_reservas_cancha_activa", "ix_reservas_start_id"},
+        ),
+        Caso(
+            "reservas_mes propietario",
+            select(Reserva.cancha_id, func.count())
+            .join(Cancha, Cancha.id == Reserva.cancha_id)
+            .where(Cancha.owner_id == owner_id, Reserva.start_at >= mes, Reserva.start_at < mes + timedelta(days=31))
+            .group_by(Reserva.cancha_id),
+            {"ix_reservas_cancha_start", "ix_reservas_cancha_activa", "ix_reservas_start_id"},
+        ),
+    ]
+
+
+# --- lectura de planes ---
+
+
+def _particiones_postgres(conn: Connection) -> tuple[set[str], dict[str, str]]:
+    """
+    Con `reservas` particionada (migración 6) el plan nombra las particiones
+    (`reservas_pAAAA_MM`, `reservas_default`) y sus índices autogenerados:
+    devuelve las tablas que cuentan como `reservas` y, para cada índice de
+    `reservas` o de sus particiones, el nombre del índice de `reservas`.
+    """
+    tablas = {TABLA} | set(
+        conn.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = to_regclass(:t)"
+            ),
+            {"t": TABLA},
+        ).scalars()
+    )
+    propios = conn.execute(
+        text("SELECT c.relname FROM pg_index x JOIN pg_class c ON c.oid = x.indexrelid WHERE x.indrelid = to_regclass(:t)"),
+        {"t": TABLA},
+    ).scalars()
+    padres = {nombre: nombre for nombre in propios}
+    padres.update(
+        conn.execute(
+            text(
+                """
+                SELECT hijo.relname, padre.relname
+                FROM pg_inherits i
+                JOIN pg_index px ON px.indexrelid = i.inhparent
+                JOIN pg_class hijo ON hijo.oid = i.inhrelid
+                JOIN pg_class padre ON padre.oid = i.inhparent
+                WHERE px.indrelid = to_regclass(:t)
+                """
+            ),
+            {"t": TABLA},
+        ).all()
+    )
+    return tablas, padres
+
+
+def _plan_postgres(conn: Connection, stmt) -> tuple[list[str], bool, object]:
+    tablas, padres = _particiones_postgres(conn)
+    plan = conn.execute(_Explain(stmt, "EXPLAIN (FORMAT JSON)")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    indices: list[str] = []
+    seq = False
+
+    def recorrer(nodo: dict) -> None:
+        nonlocal seq
+        if nodo.get("Relation Name") in tablas and nodo["Node Type"] == "Seq Scan":
+            seq = True
+        # los Bitmap Index Scan traen el índice pero no la tabla
+        if nodo.get("Index Name") in padres:
+            indices.append(padres[nodo["Index Name"]])
+        for hijo in nodo.get("Plans", []):
+            recorrer(hijo)
+
+    recorrer(plan[0]["Plan"])
+    return indices, seq, plan
+
+
+_INDICE_SQLITE = re.compile(r"USING (?:COVERING )?INDEX (\w+)")
+
+
+def _plan_sqlite(conn: Connection, stmt) -> tuple[list[str], bool, object]:
+    filas = [r[-1] for r in conn.execute(_Explain(stmt, "EXPLAIN QUERY PLAN"))]
+    indices: list[str] = []
+    seq = False
+    for detalle in filas:
+        partes = detalle.split()
+        if len(partes) < 2 or partes[0] not in ("SCAN", "SEARCH") or partes[1] != TABLA:
+            continue
+        m = _INDICE_SQLITE.search(detalle)
+        if m:
+            indices.append(m.group(1))
+        elif "INTEGER PRIMARY KEY" not in detalle:
+            seq = True
+    return indices, seq, filas
+
+
+def revisar(conn: Connection) -> list[dict]:
+    leer = _plan_postgres if conn.dialect.name == "postgresql" else _plan_sqlite
+    resultados = []
+    for caso in _casos(conn):
+        indices, seq, plan = leer(conn, caso.stmt)
+        ok = not seq and bool(caso.esperados & set(indices))
+        resultados.append({"caso": caso.nombre, "ok": ok, "seq_scan": seq, "indices": indices, "plan": plan})
+    return resultados
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Verifica que las consultas de reservas usen índices")
+    parser.add_argument("--forzar-indices", action="store_true", help="Postgres: SET LOCAL enable_seqscan = off")
+    parser.add_argument("--json", action="store_true", help="salida JSON con los planes completos")
+    args = parser.parse_args()
+
+    with engine.begin() as conn:
+        if args.forzar_indices and conn.dialect.name == "postgresql":
+            conn.execute(text("SET LOCAL enable_seqscan = off"))
+        resultados = revisar(conn)
+
+    if args.json:
+        print(json.dumps(resultados, indent=2, ensure_ascii=False, default=str))
+    else:
+        for r in resultados:
+            estado = "OK  " if r["ok"] else "FAIL"
+            print(f"{estado} {r['caso']}: {', '.join(r['indices']) or 'sin índice'}{' (seq scan)' if r['seq_scan'] else ''}")
+
+    if not all(r["ok"] for r in resultados):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Mantenimiento de las particiones mensuales de `reservas` (solo Postgres).
+
+    python -m app.scripts.particiones listar
+    python -m app.scripts.particiones crear --meses 6             # también corre en cada `db setup`
+    python -m app.scripts.particiones archivar --antes 2025-01 --carpeta archivo/
+    python -m app.scripts.particiones archivar --antes 2025-01 --conservar
+    python -m app.scripts.particiones restaurar archivo/reservas_p2024_03.csv.gz
+
+`archivar` exporta cada mes anterior a --antes a un CSV gzip y lo saca de la
+tabla (DETACH + DROP; con --conservar la tabla queda suelta, fuera de las
+consultas). El rollup de estadísticas de esos meses no se toca.
+"""
+import argparse
+import json
+import logging
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+from sqlalchemy import text
+
+from app.db import particiones
+from app.db.conexion import engine
+
+
+def _mes(valor: str) -> date:
+    try:
+        return datetime.strptime(valor, "%Y-%m").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError("formato AAAA-MM")
+
+
+def _meses_a_archivar(conn, antes: date) -> list[date]:
+    prefijo = f"{particiones.PADRE}_p"
+    meses = []
+    for p in particiones.listar(conn):
+        nombre = p["particion"]
+        if not nombre.startswith(prefijo):
+            continue
+        mes = datetime.strptime(nombre[len(prefijo):], "%Y_%m").date()
+        if mes < antes:
+            meses.append(mes)
+    return sorted(meses)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.scripts.particiones")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    sub.add_parser("listar")
+    crear = sub.add_parser("crear")
+    crear.add_argument("--meses", type=int, default=particiones.MESES_ADELANTE)
+    archivar = sub.add_parser("archivar")
+    archivar.add_argument("--antes", type=_mes, required=True, help="archiva los meses anteriores a AAAA-MM")
+    archivar.add_argument("--carpeta", type=Path, default=Path("archivo"))
+    archivar.add_argument("--conservar", action="store_true", help="DETACH sin DROP")
+    restaurar = sub.add_parser("restaurar")
+    restaurar.add_argument("archivo", type=Path)
+    args = parser.parse_args(argv)
+
+    with engine.connect() as conn:
+        if not particiones.esta_particionada(conn):
+            print("reservas no está particionada (requiere Postgres y la migración 6)", file=sys.stderr)
+            return 1
+
+    if args.comando == "listar":
+        with engine.connect() as conn:
+            print(json.dumps(particiones.listar(conn), indent=2))
+    elif args.comando == "crear":
+        with engine.begin() as conn:
+            print(json.dumps({"creadas": particiones.asegurar_particiones(conn, args.meses)}))
+    elif args.comando == "archivar":
+        if args.antes > date.today().replace(day=1):
+            print("--antes no puede ser posterior al mes actual", file=sys.stderr)
+            return 1
+        with engine.connect() as conn:
+            meses = _meses_a_archivar(conn, args.antes)
+        for mes in meses:
+            print(json.dumps(particiones.archivar(engine, mes, args.carpeta, borrar=not args.conservar)))
+        with engine.begin() as conn:
+            conn.execute(text(f"ANALYZE {particiones.PADRE}"))
+    else:
+        print(json.dumps({"archivo": str(args.archivo), "filas_mes": particiones.restaurar(engine, args.archivo)}))
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
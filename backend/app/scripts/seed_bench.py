@@ -0,0 +1,278 @@
+"""
+Dataset sintético para benchmarks (usuarios, complejos, canchas, reservas, likes).
+
+Todo lo que crea queda marcado (emails @bench.local, slugs `bench-...`) para poder
+borrarlo con --reset sin tocar datos reales. Es determinista con --seed.
+
+Los nombres/coordenadas pueden salir del CSV consolidado de `generar_inserts.py`
+(distrito,nombre,latitud,longitud,direccion); si no, se generan.
+
+    python -m app.scripts.seed_bench --reset --complejos 200 --reservas-por-cancha 300
+    python -m app.scripts.seed_bench --lugares ../salida_lima_departamento/LIMA_TODOS.csv
+"""
+import argparse
+import csv
+import json
+import logging
+import random
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Connection
+
+from app.core.busqueda import texto_busqueda
+from app.core.estadisticas import reconciliar
+from app.core.seguridad import hash_password
+from app.core.slug import slugify
+from app.db.conexion import engine
+from app.modelos.modelos import Cancha, CanchaImagen, Complejo, ComplejoLike, Reserva, ReservaDiaria, User
+
+logger = logging.getLogger(__name__)
+
+BENCH_DOMAIN = "bench.local"
+BENCH_PASSWORD = "bench-password"
+BENCH_SLUG_PREFIX = "bench-"
+
+BATCH = 5000
+HORAS = range(6, 22)
+
+DISTRITOS = ["Miraflores", "San Isidro", "Surco", "La Molina", "Los Olivos", "Comas", "Ate", "Lince", "Barranco", "Rímac"]
+NOMBRES = ["Ana", "Luis", "María", "José", "Carmen", "Jorge", "Rosa", "Carlos", "Lucía", "Miguel", "Núñez", "Peña"]
+APELLIDOS = ["Quispe", "Flores", "Sánchez", "Rodríguez", "García", "Huamán", "Torres", "Ramírez", "Díaz", "Castillo"]
+
+
+def owner_email(i: int) -> str:
+    return f"owner{i}@{BENCH_DOMAIN}"
+
+
+def user_email(i: int) -> str:
+    return f"user{i}@{BENCH_DOMAIN}"
+
+
+def _leer_lugares(path: Path | None) -> list[dict]:
+    if not path:
+        return []
+    with path.open(encoding="utf-8-sig", newline="") as f:
+        return [row for row in csv.DictReader(f) if row.get("nombre")]
+
+
+def _next_id(conn: Connection, model) -> int:
+    return int(conn.scalar(select(func.coalesce(func.max(model.id), 0))) or 0) + 1
+
+
+def _insertar(conn: Connection, model, rows: list[dict]) -> None:
+    for i in range(0, len(rows), BATCH):
+        conn.execute(model.__table__.insert(), rows[i : i + BATCH])
+
+
+def _sync_sequences(conn: Connection, models) -> None:
+    # los ids se asignan acá; en Postgres la secuencia tiene que quedar por delante
+    if conn.dialect.name != "postgresql":
+        return
+    for model in models:
+        tabla = model.__tablename__
+        conn.execute(
+            text(f"SELECT setval(pg_get_serial_sequence('{tabla}', 'id'), (SELECT COALESCE(MAX(id), 1) FROM {tabla}))")
+        )
+
+
+def reset(conn: Connection) -> None:
+    complejos = select(Complejo.id).where(Complejo.slug.like(f"{BENCH_SLUG_PREFIX}%"))
+    canchas = select(Cancha.id).where(Cancha.complejo_id.in_(complejos))
+    usuarios = select(User.id).where(User.email.like(f"%@{BENCH_DOMAIN}"))
+    conn.execute(ReservaDiaria.__table__.delete().where(ReservaDiaria.cancha_id.in_(canchas)))
+    conn.execute(Reserva.__table__.delete().where(Reserva.cancha_id.in_(canchas)))
+    conn.execute(ComplejoLike.__table__.delete().where(ComplejoLike.complejo_id.in_(complejos)))
+    conn.execute(CanchaImagen.__table__.delete().where(CanchaImagen.cancha_id.in_(canchas)))
+    conn.execute(Cancha.__table__.delete().where(Cancha.id.in_(canchas)))
+    conn.execute(Complejo.__table__.delete().where(Complejo.id.in_(complejos)))
+    conn.execute(Reserva.__table__.delete().where(Reserva.cliente_id.in_(usuarios)))
+    conn.execute(User.__table__.delete().where(User.id.in_(usuarios)))
+
+
+def seed(
+    conn: Connection,
+    *,
+    propietarios: int,
+    usuarios: int,
+    complejos: int,
+    canchas_por_complejo: int,
+    reservas_por_cancha: int,
+    likes: int,
+    dias: int,
+    lugares: list[dict],
+    rng: random.Random,
+) -> dict:
+    timings: dict[str, float] = {}
+    pw = hash_password(BENCH_PASSWORD)  # un solo hash: bcrypt es lento a propósito
+
+    t0 = time.perf_counter()
+    uid = _next_id(conn, User)
+    owner_ids = list(range(uid, uid + propietarios))
+    user_ids = list(range(uid + propietarios, uid + propietarios + usuarios))
+    filas = [
+        {"id": oid, "role": "propietario", "first_name": rng.choice(NOMBRES), "last_name": rng.choice(APELLIDOS),
+         "email": owner_email(i), "hashed_password": pw, "phone": f"9{rng.randrange(10**8):08d}", "is_active": True}
+        for i, oid in enumerate(owner_ids)
+    ] + [
+        {"id": u, "role": "usuario", "first_name": rng.choice(NOMBRES), "last_name": rng.choice(APELLIDOS),
+         "email": user_email(i), "hashed_password": pw, "phone": None, "is_active": True}
+        for i, u in enumerate(user_ids)
+    ]
+    _insertar(conn, User, filas)
+    timings["users"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    cid = _next_id(conn, Complejo)
+    complejo_rows = []
+    for i in range(complejos):
+        lugar = lugares[i % len(lugares)] if lugares else None
+        nombre = (lugar["nombre"] if lugar else f"Complejo {rng.choice(APELLIDOS)} {i}")[:150]
+        distrito = (lugar.get("distrito") if lugar else None) or rng.choice(DISTRITOS)
+        complejo_rows.append({
+            "id": cid + i,
+            "nombre": nombre,
+            "slug": f"{BENCH_SLUG_PREFIX}{slugify(nombre)[:180]}-{i}",
+            "direccion": (lugar.get("direccion") if lugar else None) or f"Av. {rng.choice(APELLIDOS)} {rng.randint(100, 3000)}",
+            "distrito": distrito,
+            "provincia": "Lima",
+            "departamento": "Lima",
+            "latitud": float(lugar["latitud"]) if lugar else round(-12.0 - rng.random() * 0.3, 6),
+            "longitud": float(lugar["longitud"]) if lugar else round(-77.0 - rng.random() * 0.1, 6),
+            "techada": rng.random() < 0.3,
+            "iluminacion": rng.random() < 0.8,
+            "vestuarios": rng.random() < 0.5,
+            "estacionamiento": rng.random() < 0.4,
+            "cafeteria": rng.random() < 0.2,
+            "is_active": True,
+            "owner_id": owner_ids[i % len(owner_ids)] if owner_ids else None,
+        })
+    _insertar(conn, Complejo, complejo_rows)
+
+    kid = _next_id(conn, Cancha)
+    cancha_rows = []
+    for c in complejo_rows:
+        for j in range(canchas_por_complejo):
+            cancha_rows.append({
+                "id": kid + len(cancha_rows),
+                "nombre": f"Cancha {j + 1}",
+                "tipo": rng.choice(["futbol5", "futbol7", "futbol11"]),
+                "pasto": rng.choice(["sintetico", "natural"]),
+                "precio_hora": rng.choice([60, 80, 100, 120, 150]),
+                "rating": round(rng.uniform(3, 5), 2),
+                "is_active": True,
+                "owner_id": c["owner_id"],
+                "complejo_id": c["id"],
+            })
+    _insertar(conn, Cancha, cancha_rows)
+
+    iid = _next_id(conn, CanchaImagen)
+    _insertar(conn, CanchaImagen, [
+        {"id": iid + n, "cancha_id": k["id"], "url": f"/uploads/canchas/{k['id']}/bench.webp", "orden": 0}
+        for n, k in enumerate(cancha_rows)
+    ])
+    timings["complejos_canchas"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    hoy = date.today()
+    inicio = hoy - timedelta(days=dias // 2)
+    slots = [(d, h) for d in range(dias) for h in HORAS]
+    por_cancha = min(reservas_por_cancha, len(slots))
+    rid = _next_id(conn, Reserva)
+    clientes = {f["id"]: (f["first_name"], f["last_name"], f["email"]) for f in filas}
+    estados = ["pendiente", "parcial", "pagada", "pagada", "cancelada"]
+    reservas = []
+    for k in cancha_rows:
+        for d, h in rng.sample(slots, por_cancha):
+            start = datetime.combine(inicio + timedelta(days=d), datetime.min.time()) + timedelta(hours=h)
+            total = float(k["precio_hora"])
+            estado = rng.choice(estados)
+            cliente_id = rng.choice(user_ids) if user_ids else None
+            reservas.append({
+                "id": rid + len(reservas),
+                "cancha_id": k["id"],
+                "cliente_id": cliente_id,
+                "start_at": start,
+                "end_at": start + timedelta(hours=1),
+                "total_amount": total,
+                "paid_amount": total if estado == "pagada" else (total / 2 if estado == "parcial" else 0),
+                "payment_method": rng.choice(["efectivo", "yape", "plin", None]),
+                "payment_status": estado,
+                "created_by": k["owner_id"],
+                "search_text": texto_busqueda(*clientes.get(cliente_id, (None, None, None)), k["nombre"], estado),
+            })
+            if len(reservas) >= BATCH:
+                _insertar(conn, Reserva, reservas)
+                rid += len(reservas)
+                reservas = []
+    _insertar(conn, Reserva, reservas)
+    timings["reservas"] = time.perf_counter() - t0
+
+    # el rollup de /panel/estadisticas no se llena con inserts directos: se recalcula el rango sembrado
+    t0 = time.perf_counter()
+    rollup = reconciliar(conn, inicio, inicio + timedelta(days=dias))
+    timings["rollup"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    lid = _next_id(conn, ComplejoLike)
+    pares = set()
+    max_likes = min(likes, len(user_ids) * len(complejo_rows))
+    while len(pares) < max_likes:
+        pares.add((rng.choice(complejo_rows)["id"], rng.choice(user_ids)))
+    _insertar(conn, ComplejoLike, [
+        {"id": lid + n, "complejo_id": c, "user_id": u} for n, (c, u) in enumerate(sorted(pares))
+    ])
+    timings["likes"] = time.perf_counter() - t0
+
+    _sync_sequences(conn, (User, Complejo, Cancha, CanchaImagen, Reserva, ComplejoLike))
+
+    return {
+        "users": len(filas),
+        "complejos": len(complejo_rows),
+        "canchas": len(cancha_rows),
+        "reservas": por_cancha * len(cancha_rows),
+        "likes": len(pares),
+        "celdas_rollup": rollup["celdas"],
+        "timings_s": {k: round(v, 3) for k, v in timings.items()},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Dataset sintético para benchmarks")
+    parser.add_argument("--reset", action="store_true", help="borra antes el dataset bench anterior")
+    parser.add_argument("--propietarios", type=int, default=20)
+    parser.add_argument("--usuarios", type=int, default=2000)
+    parser.add_argument("--complejos", type=int, default=200)
+    parser.add_argument("--canchas-por-complejo", type=int, default=3)
+    parser.add_argument("--reservas-por-cancha", type=int, default=200)
+    parser.add_argument("--likes", type=int, default=5000)
+    parser.add_argument("--dias", type=int, default=120, help="ventana de fechas de reservas (mitad pasada, mitad futura)")
+    parser.add_argument("--lugares", type=Path, default=None, help="CSV de generar_inserts.py (LIMA_TODOS.csv)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    rng = random.Random(args.seed)
+
+    with engine.begin() as conn:
+        if args.reset:
+            reset(conn)
+        resumen = seed(
+            conn,
+            propietarios=max(1, args.propietarios),
+            usuarios=max(1, args.usuarios),
+            complejos=args.complejos,
+            canchas_por_complejo=args.canchas_por_complejo,
+            reservas_por_cancha=args.reservas_por_cancha,
+            likes=args.likes,
+            dias=max(1, args.dias),
+            lugares=_leer_lugares(args.lugares),
+            rng=rng,
+        )
+    print(json.dumps(resumen, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+Vencimiento de suscripciones (lo mismo que hace el hilo de la API cada
+SUSCRIPCIONES_BARRIDO_SECONDS; útil como cron o para correrlo a mano).
+
+    python -m app.scripts.suscripciones vencer
+"""
+import argparse
+import json
+import logging
+import sys
+
+from app.core.suscripciones import barrer
+from app.db.conexion import engine
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.scripts.suscripciones")
+    parser.add_argument("comando", choices=["vencer"])
+    parser.parse_args(argv)
+
+    resultado = barrer(engine)
+    if resultado is None:
+        print(json.dumps({"omitido": "otro proceso está barriendo"}))
+        return 0
+    print(json.dumps(resultado))
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
@@ -4,6 +4,7 @@ from email.message import EmailMessage
 from typing import Optional
 
 from app.core.config import settings
+from app.core.metricas import EMAILS
 
 logger = logging.getLogger("app.utils.mailer")
 
@@ -27,6 +28,7 @@ def send_email(to_email: str, subject: str, text: str, html: str | None = None)
     from_email = _get_from_email()
     if not _is_configured() or not from_email:
         logger.warning("SMTP no configurado (se omitió el envío a %s)", to_email)
+        EMAILS.labels("omitido").inc()
         return
 
     msg = EmailMessage()
@@ -46,8 +48,10 @@ def send_email(to_email: str, subject: str, text: str, html: str | None = None)
             server.login(settings.SMTP_USER, settings.SMTP_PASS)
         server.send_message(msg)
         logger.info("Correo enviado a %s", to_email)
+        EMAILS.labels("enviado").inc()
     except Exception as exc:
         logger.exception("Error al enviar correo a %s: %s", to_email, exc)
+        EMAILS.labels("error").inc()
     finally:
         if server:
             try:
@@ -0,0 +1,96 @@
+"""
+Fixtures comunes: la app contra una BD SQLite temporal con las migraciones
+aplicadas y un set chico de datos (admin, propietario, un complejo con canchas
+y reservas). La config se lee al importar app.*, por eso el entorno se fija
+antes de cualquier import de la app.
+"""
+import os
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+_tmp = Path(tempfile.mkdtemp(prefix="tests_backend_"))
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp / 'test.db'}"
+os.environ["DB_STARTUP_MODE"] = "migrate"
+os.environ["SUSCRIPCIONES_BARRIDO_SECONDS"] = "0"
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.core.seguridad import crear_token  # noqa: E402
+from app.db.conexion import engine  # noqa: E402
+from app.db.migraciones import aplicar_migraciones  # noqa: E402
+from app.modelos.modelos import Cancha, Complejo, Reserva, User  # noqa: E402
+
+pytest_plugins = ["tests.pytest_consultas", "pytester"]
+
+ADMIN_ID, PROPIETARIO_ID, CLIENTE_ID = 1, 2, 3
+CANCHAS = 3
+RESERVAS_POR_CANCHA = 10
+
+
+def _usuario(uid: int, role: str) -> User:
+    return User(
+        id=uid, role=role, first_name=role.title(), last_name="Test",
+        email=f"{role}@test.local", hashed_password="x", is_active=True,
+    )
+
+
+def _sembrar(db: Session) -> None:
+    db.add_all([_usuario(ADMIN_ID, "admin"), _usuario(PROPIETARIO_ID, "propietario"), _usuario(CLIENTE_ID, "usuario")])
+    db.add(Complejo(id=1, nombre="Complejo Test", slug="complejo-test", owner_id=PROPIETARIO_ID))
+    db.flush()
+    inicio = datetime(2026, 1, 5, 8, 0)
+    rid = 0
+    for cid in range(1, CANCHAS + 1):
+        db.add(Cancha(id=cid, nombre=f"Cancha {cid}", tipo="futbol", pasto="sintetico", precio_hora=50,
+                      complejo_id=1, owner_id=PROPIETARIO_ID))
+        db.flush()
+        for n in range(RESERVAS_POR_CANCHA):
+            rid += 1
+            start = inicio + timedelta(days=n, hours=cid)
+            db.add(Reserva(id=rid, cancha_id=cid, cliente_id=CLIENTE_ID, start_at=start,
+                           end_at=start + timedelta(hours=1), total_amount=50, paid_amount=0))
+    db.commit()
+
+
+@pytest.fixture(scope="session")
+def app():
+    aplicar_migraciones(engine)
+    with Session(engine) as db:
+        _sembrar(db)
+    from app.main import app as fastapi_app
+
+    return fastapi_app
+
+
+@pytest.fixture
+def conn(app):
+    """Conexión en una transacción que se deshace al final: lo que escriba el test no queda."""
+    with engine.connect() as c:
+        trans = c.begin()
+        try:
+            yield c
+        finally:
+            trans.rollback()
+
+
+@pytest.fixture
+def client(app):
+    with TestClient(app) as c:
+        yield c
+
+
+def _auth(uid: int, role: str) -> dict:
+    return {"Authorization": f"Bearer {crear_token(uid, role)}"}
+
+
+@pytest.fixture
+def admin_headers() -> dict:
+    return _auth(ADMIN_ID, "admin")
+
+
+@pytest.fixture
+def propietario_headers() -> dict:
+    return _auth(PROPIETARIO_ID, "propietario")
@@ -0,0 +1,71 @@
+"""
+Plugin de pytest: presupuesto de queries por endpoint.
+
+Lo activa tests/conftest.py (`pytest_plugins = ["tests.pytest_consultas"]`).
+Cada request que pase por la app durante un test se compara con su
+presupuesto y el test falla si alguno lo supera:
+
+    @pytest.mark.query_budget(3)                       # cualquier endpoint
+    @pytest.mark.query_budget(2, path="/canchas")      # solo esa ruta (path de FastAPI)
+    def test_catalogo(client): ...
+
+Sin marker se usa `query_budget_default` del ini (0 = sin límite).
+"""
+import pytest
+
+from app.core.consultas import EstadisticasConsultas, quitar_observador, registrar_observador
+
+
+def pytest_addoption(parser):
+    parser.addini("query_budget_default", "máximo de queries por request si el test no tiene marker (0 = sin límite)", default="0")
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "query_budget(max_queries, path=None): falla si un request (o solo `path`) ejecuta más queries",
+    )
+
+
+def _presupuestos(item) -> tuple[int | None, dict[str, int]]:
+    general: int | None = None
+    por_ruta: dict[str, int] = {}
+    for marker in item.iter_markers("query_budget"):
+        limite = int(marker.args[0]) if marker.args else int(marker.kwargs["max_queries"])
+        path = marker.kwargs.get("path")
+        if path:
+            por_ruta.setdefault(path, limite)
+        elif general is None:
+            general = limite
+    if general is None:
+        default = int(item.config.getini("query_budget_default") or 0)
+        general = default or None
+    return general, por_ruta
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    general, por_ruta = _presupuestos(item)
+    if general is None and not por_ruta:
+        return (yield)
+
+    excedidos: list[str] = []
+
+    def observar(stats: EstadisticasConsultas) -> None:
+        limite = por_ruta.get(stats.ruta, general)
+        if limite is not None and stats.total > limite:
+            repetidas = ", ".join(f"{n}x {' '.join(sql.split())[:80]}" for sql, n in stats.repetidas(2)[:3])
+            excedidos.append(
+                f"{stats.metodo} {stats.ruta}: {stats.total} queries (presupuesto {limite})"
+                + (f" — repetidas: {repetidas}" if repetidas else "")
+            )
+
+    registrar_observador(observar)
+    try:
+        resultado = yield
+    finally:
+        quitar_observador(observar)
+
+    if excedidos:
+        pytest.fail("Presupuesto de queries excedido:\n  " + "\n  ".join(excedidos), pytrace=False)
+    return resultado
@@ -0,0 +1,24 @@
+"""
+Presupuesto de arranque: corre `app.scripts.check_import_time` en un proceso
+aparte (el import de app.main ya está cacheado en este) y falla si se pasa de
+1500 ms o si alguna dependencia lazy se importa al arrancar.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+BUDGET_MS = 1500
+
+
+def test_import_de_app_main_dentro_del_presupuesto():
+    proc = subprocess.run(
+        [sys.executable, "-m", "app.scripts.check_import_time", "--budget-ms", str(BUDGET_MS)],
+        cwd=BACKEND,
+        env={**os.environ, "PYTHONPATH": str(BACKEND)},
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert proc.returncode == 0, f"{proc.stderr}\n{proc.stdout}"
@@ -0,0 +1,43 @@
+"""Una BD vacía migrada hasta la última versión queda igual que los modelos."""
+from sqlalchemy import create_engine, inspect
+
+from app.db.migraciones import VERSION_ESPERADA, aplicar_migraciones, verificar_esquema
+from app.modelos.base import Base
+
+
+def _esquema(engine) -> dict:
+    insp = inspect(engine)
+    out = {}
+    for tabla in insp.get_table_names():
+        if tabla == "schema_version":
+            continue
+        out[tabla] = {
+            "columnas": sorted((c["name"], str(c["type"]), c["nullable"]) for c in insp.get_columns(tabla)),
+            "pk": sorted(insp.get_pk_constraint(tabla)["constrained_columns"]),
+            "indices": sorted((i["name"], tuple(i["column_names"]), bool(i["unique"])) for i in insp.get_indexes(tabla)),
+            "fks": sorted(
+                (tuple(f["constrained_columns"]), f["referred_table"], tuple(f["referred_columns"]))
+                for f in insp.get_foreign_keys(tabla)
+            ),
+        }
+    return out
+
+
+def test_bd_vacia_migrada_coincide_con_los_modelos(tmp_path):
+    migrada = create_engine(f"sqlite:///{tmp_path / 'migrada.db'}")
+    assert aplicar_migraciones(migrada) == list(range(1, VERSION_ESPERADA + 1))
+    assert verificar_esquema(migrada) == VERSION_ESPERADA
+
+    modelos = create_engine(f"sqlite:///{tmp_path / 'modelos.db'}")
+    Base.metadata.create_all(modelos)
+
+    esperado, obtenido = _esquema(modelos), _esquema(migrada)
+    assert obtenido.keys() == esperado.keys()
+    for tabla in esperado:
+        assert obtenido[tabla] == esperado[tabla], tabla
+
+
+def test_migrar_dos_veces_no_hace_nada(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'bd.db'}")
+    aplicar_migraciones(engine)
+    assert aplicar_migraciones(engine) == []
@@ -0,0 +1,79 @@
+"""Endpoints de operación: /readyz (degraded vs. caído), acceso a /metrics y ETag de /ubigeo."""
+import pytest
+
+from app.core import salud
+from app.core.config import settings
+
+
+@pytest.fixture
+def sin_cache_db(monkeypatch):
+    monkeypatch.setattr(salud, "_db_cache", {})
+
+
+def _ok():
+    return {"ok": True}
+
+
+def test_readyz_lista(client, sin_cache_db, monkeypatch):
+    monkeypatch.setattr(salud, "check_uploads", _ok)
+    r = client.get("/readyz")
+    assert r.status_code == 200
+    assert r.json()["ready"] is True
+
+
+def test_readyz_pool_agotado_es_degraded_no_503(client, sin_cache_db, monkeypatch):
+    monkeypatch.setattr(salud, "check_uploads", _ok)
+    monkeypatch.setattr(salud, "check_pool", lambda: {"ok": False, "pools": {}})
+    r = client.get("/readyz")
+    assert r.status_code == 200
+    assert (r.json()["ready"], r.json()["degraded"]) == (True, True)
+
+
+@pytest.mark.parametrize("caido", ["db", "uploads"])
+def test_readyz_critico_caido_da_503(client, sin_cache_db, monkeypatch, caido):
+    monkeypatch.setattr(salud, "check_uploads", _ok)
+    if caido == "db":
+        def sin_bd():
+            raise ConnectionError("BD caída")
+
+        monkeypatch.setattr(salud, "_ping_db", sin_bd)
+    else:
+        monkeypatch.setattr(salud, "check_uploads", lambda: {"ok": False})
+    r = client.get("/readyz")
+    assert r.status_code == 503
+    assert r.json()["checks"][caido]["ok"] is False
+
+
+@pytest.mark.parametrize(
+    "token, public, auth, status",
+    [
+        ("", False, None, 404),  # default: no se expone
+        ("", True, None, 200),
+        ("s3cret", False, None, 401),
+        ("s3cret", False, "Bearer otro", 401),
+        ("s3cret", True, None, 401),  # con token, METRICS_PUBLIC no abre nada
+        ("s3cret", False, "Bearer s3cret", 200),
+    ],
+)
+def test_metrics_acceso(client, monkeypatch, token, public, auth, status):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", token)
+    monkeypatch.setattr(settings, "METRICS_PUBLIC", public)
+    r = client.get("/metrics", headers={"Authorization": auth} if auth else {})
+    assert r.status_code == status
+    if status == 200:
+        assert b"# HELP" in r.content
+
+
+def test_ubigeo_etag_304(client):
+    r = client.get("/ubigeo/departamentos")
+    assert r.status_code == 200
+    etag = r.headers["etag"]
+    assert r.headers["cache-control"].startswith("public")
+
+    r = client.get("/ubigeo/departamentos", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.content == b""
+    assert r.headers["etag"] == etag
+
+    r = client.get("/ubigeo/provincias", params={"department_id": "15"}, headers={"If-None-Match": etag})
+    assert r.status_code == 200  # otro recurso, otro ETag
@@ -0,0 +1,71 @@
+"""
+Planes de las consultas calientes sobre `reservas` (los casos de
+`app.scripts.explain_reservas`): cada una tiene que usar uno de sus índices
+esperados y no recorrer `reservas` secuencialmente.
+
+Solo tiene sentido contra Postgres: apunta TEST_POSTGRES_URL a una BD de
+pruebas (se migra a la última versión y los datos se deshacen al terminar).
+Sin esa variable, o si apunta a otro motor, el test se salta.
+"""
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, insert, text
+
+from app.db.conexion import normalize_db_url
+from app.db.migraciones import aplicar_migraciones
+from app.modelos.modelos import Cancha, Complejo, Reserva, User
+from app.scripts.explain_reservas import revisar
+
+URL = normalize_db_url(os.environ.get("TEST_POSTGRES_URL", ""))
+
+pytestmark = pytest.mark.skipif(
+    not URL.startswith("postgresql"), reason="TEST_POSTGRES_URL no apunta a Postgres"
+)
+
+# ids altos para no chocar con datos que ya tenga la BD de pruebas
+BASE = 9_000_000
+
+
+@pytest.fixture
+def pg():
+    engine = create_engine(URL)
+    aplicar_migraciones(engine)
+    try:
+        with engine.connect() as c:
+            trans = c.begin()
+            try:
+                yield c
+            finally:
+                trans.rollback()
+    finally:
+        engine.dispose()
+
+
+def _sembrar(conn) -> None:
+    conn.execute(insert(User), [
+        dict(id=BASE + n, role=role, first_name=role, last_name="Plan", email=f"{role}.{BASE}@planes.test",
+             hashed_password="x", is_active=True)
+        for n, role in ((1, "propietario"), (2, "usuario"))
+    ])
+    conn.execute(insert(Complejo).values(id=BASE, nombre="Planes", slug=f"planes-{BASE}", owner_id=BASE + 1))
+    conn.execute(insert(Cancha).values(id=BASE, nombre="Planes", tipo="futbol", pasto="sintetico", precio_hora=50,
+                                       complejo_id=BASE, owner_id=BASE + 1))
+    inicio = datetime(2026, 1, 5, 8, 0)
+    conn.execute(insert(Reserva), [
+        dict(id=BASE + n, cancha_id=BASE, cliente_id=BASE + 2, start_at=inicio + timedelta(days=n),
+             end_at=inicio + timedelta(days=n, hours=1), total_amount=50, paid_amount=0)
+        for n in range(20)
+    ])
+
+
+def test_consultas_de_reservas_usan_indices(pg):
+    _sembrar(pg)
+    pg.execute(text("ANALYZE reservas"))
+    # con pocas filas Postgres elige seq scan aunque el índice sirva: aquí se
+    # comprueba que el índice puede servir la consulta, no el costo
+    pg.execute(text("SET LOCAL enable_seqscan = off"))
+
+    fallidos = [(r["caso"], r["indices"], r["seq_scan"]) for r in revisar(pg) if not r["ok"]]
+    assert not fallidos
@@ -0,0 +1,53 @@
+"""
+Presupuesto de queries de los listados del panel que solían hacer N+1
+(`reserva_dict` con `cancha_nombre`, `CanchaAdminOut`, el filtro por dueño).
+El presupuesto es fijo: no puede crecer con la cantidad de filas.
+"""
+import pytest
+
+from tests.conftest import CANCHAS, RESERVAS_POR_CANCHA
+
+
+# usuario actual + listado
+@pytest.mark.query_budget(2, path="/panel/reservas")
+@pytest.mark.parametrize("query", ["", "?cancha_id=1", "?fecha_inicio=2026-01-05&fecha_fin=2026-01-20"])
+def test_reservas_admin(client, admin_headers, query):
+    r = client.get(f"/panel/reservas{query}", headers=admin_headers)
+    assert r.status_code == 200
+    assert r.json()
+
+
+@pytest.mark.query_budget(2, path="/panel/reservas")
+def test_reservas_propietario(client, propietario_headers):
+    r = client.get("/panel/reservas", headers=propietario_headers)
+    assert r.status_code == 200
+    assert len(r.json()) == CANCHAS * RESERVAS_POR_CANCHA
+    assert all(x["cancha_nombre"] for x in r.json())
+
+
+@pytest.mark.query_budget(2, path="/panel/canchas")
+@pytest.mark.parametrize("headers", ["admin_headers", "propietario_headers"])
+def test_canchas(client, request, headers):
+    r = client.get("/panel/canchas", headers=request.getfixturevalue(headers))
+    assert r.status_code == 200
+    assert len(r.json()) == CANCHAS
+
+
+def test_presupuesto_excedido_falla(pytester):
+    pytester.makeconftest('pytest_plugins = ["tests.pytest_consultas"]')
+    pytester.makepyfile(
+        """
+        import pytest
+        from app.core.consultas import EstadisticasConsultas, _observadores
+
+        @pytest.mark.query_budget(1, path="/x")
+        def test_x():
+            stats = EstadisticasConsultas(metodo="GET", ruta="/x")
+            stats.total = 3
+            for fn in list(_observadores):
+                fn(stats)
+        """
+    )
+    resultado = pytester.runpytest_inprocess("-p", "no:cacheprovider")
+    resultado.assert_outcomes(failed=1)
+    resultado.stdout.fnmatch_lines(["*GET /x: 3 queries (presupuesto 1)*"])
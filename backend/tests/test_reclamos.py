@@ -0,0 +1,100 @@
+"""Resolución de reclamos en lote: estados, nuevos dueños y la carrera entre dos admins."""
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert, select, text
+from sqlalchemy.orm import Session
+
+from app.esquemas.esquemas import ReclamoResolverItem
+from app.modelos.modelos import Cancha, ReclamoCancha, User
+from app.routers.reclamos import _resolver
+from tests.conftest import ADMIN_ID, CLIENTE_ID, PROPIETARIO_ID
+
+
+@pytest.fixture
+def db(conn):
+    # los rollback de _resolver deshacen solo su savepoint; `conn` deshace el resto.
+    # Los reclamos se insertan por `conn` antes de usar la sesión: así (pysqlite)
+    # la transacción de afuera ya empezó y el savepoint queda adentro
+    with Session(bind=conn, join_transaction_mode="create_savepoint") as s:
+        yield s
+
+
+def _reclamo(conn, rid: int, cancha_id: int, estado: str = "pendiente") -> None:
+    conn.execute(insert(ReclamoCancha).values(id=rid, cancha_id=cancha_id, solicitante_id=PROPIETARIO_ID, estado=estado))
+
+
+def _item(rid: int, estado: str, owner: int | None = None) -> ReclamoResolverItem:
+    return ReclamoResolverItem(id=rid, estado=estado, nuevo_owner_id=owner)
+
+
+def _estados(db) -> dict[int, tuple]:
+    t = ReclamoCancha.__table__
+    return {r.id: (r.estado, r.resuelto_por) for r in db.execute(select(t).where(t.c.id >= 900))}
+
+
+def _owner(db, cancha_id: int) -> int:
+    return db.scalar(select(Cancha.owner_id).where(Cancha.id == cancha_id))
+
+
+def test_lote_aprueba_rechaza_y_cambia_dueno(conn, db):
+    _reclamo(conn, 900, 1)
+    _reclamo(conn, 901, 2)
+    admin = db.get(User, ADMIN_ID)
+
+    assert _resolver(db, [_item(900, "aprobado", ADMIN_ID), _item(901, "rechazado")], admin, solo_pendientes=True) == [900, 901]
+    assert _estados(db) == {900: ("aprobado", ADMIN_ID), 901: ("rechazado", ADMIN_ID)}
+    assert _owner(db, 1) == ADMIN_ID
+    assert _owner(db, 2) == PROPIETARIO_ID
+
+
+@pytest.mark.parametrize(
+    "items, status",
+    [
+        ([_item(900, "aprobado")], 400),  # sin nuevo_owner_id
+        ([_item(900, "aprobado", CLIENTE_ID)], 400),  # el nuevo dueño no es propietario
+        ([_item(900, "aprobado", 999)], 404),
+        ([_item(900, "rechazado"), _item(900, "aprobado", ADMIN_ID)], 400),  # repetido
+        ([_item(900, "aprobado", ADMIN_ID), _item(902, "aprobado", PROPIETARIO_ID)], 400),  # dos dueños, misma cancha
+        ([_item(900, "rechazado"), _item(903, "rechazado")], 404),
+        ([_item(900, "rechazado"), _item(901, "rechazado")], 409),  # 901 ya estaba resuelto
+    ],
+)
+def test_lote_invalido_no_cambia_nada(conn, db, items, status):
+    _reclamo(conn, 900, 1)
+    _reclamo(conn, 901, 2, estado="aprobado")
+    _reclamo(conn, 902, 1)
+    antes = _estados(db)
+
+    with pytest.raises(HTTPException) as exc:
+        _resolver(db, items, db.get(User, ADMIN_ID), solo_pendientes=True)
+    assert exc.value.status_code == status
+    assert _estados(db) == antes
+    assert _owner(db, 1) == PROPIETARIO_ID
+
+
+def test_carrera_con_otro_admin_da_409_y_deshace_el_lote(conn, db, monkeypatch):
+    _reclamo(conn, 900, 1)
+    _reclamo(conn, 901, 2)
+    original = db.execute
+
+    def otro_admin_primero(stmt, *args, **kw):
+        # entre el chequeo y el UPDATE, otro admin rechaza el 901
+        if getattr(stmt, "is_update", False) and stmt.table.name == "reclamos_cancha":
+            monkeypatch.setattr(db, "execute", original)
+            db.connection().execute(text("UPDATE reclamos_cancha SET estado = 'rechazado' WHERE id = 901"))
+        return original(stmt, *args, **kw)
+
+    monkeypatch.setattr(db, "execute", otro_admin_primero)
+    with pytest.raises(HTTPException) as exc:
+        _resolver(db, [_item(900, "rechazado"), _item(901, "aprobado", ADMIN_ID)], db.get(User, ADMIN_ID), solo_pendientes=True)
+
+    assert exc.value.status_code == 409
+    assert _estados(db)[900] == ("pendiente", None)
+    assert _owner(db, 2) == PROPIETARIO_ID
+
+
+def test_patch_individual_puede_cambiar_un_reclamo_resuelto(conn, db):
+    _reclamo(conn, 900, 1, estado="rechazado")
+    _resolver(db, [_item(900, "aprobado", ADMIN_ID)], db.get(User, ADMIN_ID), solo_pendientes=False)
+    assert _estados(db)[900] == ("aprobado", ADMIN_ID)
+    assert _owner(db, 1) == ADMIN_ID
@@ -0,0 +1,65 @@
+"""/panel/reservas: orden de la búsqueda, paginado por keyset y proyección de campos."""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from app.db.conexion import engine
+from app.modelos.modelos import Reserva, User
+from tests.conftest import CANCHAS, RESERVAS_POR_CANCHA
+
+FRASE, SUELTAS = 500, 501
+
+
+@pytest.fixture
+def clientes_busqueda(app):
+    """Una reserva con "ana gomez" junto y otra con las dos palabras separadas (y anterior)."""
+    with Session(engine) as db:
+        db.add_all([
+            User(id=10, role="usuario", first_name="Ana", last_name="Gómez", email="ag@test.local", hashed_password="x"),
+            User(id=11, role="usuario", first_name="Gómez", last_name="Pérez", email="ana@test.local", hashed_password="x"),
+        ])
+        db.flush()
+        db.add_all([
+            Reserva(id=FRASE, cancha_id=1, cliente_id=10, start_at=datetime(2026, 3, 2, 10), end_at=datetime(2026, 3, 2, 11)),
+            Reserva(id=SUELTAS, cancha_id=1, cliente_id=11, start_at=datetime(2026, 3, 1, 10), end_at=datetime(2026, 3, 1, 11)),
+        ])
+        db.commit()
+    yield
+    with Session(engine) as db:
+        db.execute(delete(Reserva).where(Reserva.id.in_([FRASE, SUELTAS])))
+        db.execute(delete(User).where(User.id.in_([10, 11])))
+        db.commit()
+
+
+def test_busqueda_prioriza_la_frase_completa(client, admin_headers, clientes_busqueda):
+    r = client.get("/panel/reservas", params={"search": "Ana Gomez"}, headers=admin_headers)
+    assert r.status_code == 200
+    assert [x["id"] for x in r.json()] == [FRASE, SUELTAS]
+
+
+def test_keyset_recorre_todo_sin_repetir(client, admin_headers):
+    completo = client.get("/panel/reservas", headers=admin_headers).json()
+    assert len(completo) == CANCHAS * RESERVAS_POR_CANCHA
+
+    ids, cursor, paginas = [], None, 0
+    while True:
+        params = {"limit": 7, **({"cursor": cursor} if cursor else {})}
+        r = client.get("/panel/reservas", params=params, headers=admin_headers)
+        assert r.status_code == 200
+        assert len(r.json()) <= 7
+        ids += [x["id"] for x in r.json()]
+        paginas += 1
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert ids == [x["id"] for x in completo]
+    assert paginas == -(-len(completo) // 7)
+
+
+def test_fields_devuelve_solo_esos_campos(client, admin_headers):
+    r = client.get("/panel/reservas", params={"fields": "id,start_at", "limit": 3}, headers=admin_headers)
+    assert r.status_code == 200
+    assert [set(x) for x in r.json()] == [{"id", "start_at"}] * 3
@@ -0,0 +1,86 @@
+"""
+Barrido de suscripciones: vence las activas con `fin` pasado y, recién después
+del commit, cuenta los eventos e invalida la caché de planes de esos usuarios.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import delete, insert, select
+
+from app.core import planes, suscripciones
+from app.db.conexion import engine
+from app.modelos.modelos import Plan, Suscripcion
+from tests.conftest import ADMIN_ID, CLIENTE_ID, PROPIETARIO_ID
+
+PLAN = 900
+VENCIDA_PROPIETARIO, VIGENTE_PROPIETARIO, VENCIDA_CLIENTE = 900, 901, 902
+
+
+@pytest.fixture
+def vencidas(app):
+    # el barrido commitea: los datos van directo a la BD y se borran al final.
+    # En la BD de tests no hay plan FREE, así que nadie pasa a FREE
+    ayer = datetime.now(timezone.utc) - timedelta(days=1)
+    with engine.begin() as c:
+        c.execute(insert(Plan).values(id=PLAN, codigo="pro-test", nombre="Pro test"))
+        c.execute(insert(Suscripcion), [
+            dict(id=VENCIDA_PROPIETARIO, user_id=PROPIETARIO_ID, plan_id=PLAN, estado="activa", fin=ayer),
+            dict(id=VIGENTE_PROPIETARIO, user_id=PROPIETARIO_ID, plan_id=PLAN, estado="activa", fin=None),
+            dict(id=VENCIDA_CLIENTE, user_id=CLIENTE_ID, plan_id=PLAN, estado="activa", fin=ayer),
+        ])
+    planes.invalidar()
+    yield
+    planes.invalidar()
+    with engine.begin() as c:
+        c.execute(delete(Suscripcion).where(Suscripcion.plan_id == PLAN))
+        c.execute(delete(Plan).where(Plan.id == PLAN))
+
+
+def _eventos(evento: str) -> float:
+    return REGISTRY.get_sample_value("suscripciones_eventos_total", {"evento": evento}) or 0
+
+
+def _estados() -> dict[int, str]:
+    with engine.connect() as c:
+        return dict(c.execute(select(Suscripcion.id, Suscripcion.estado).where(Suscripcion.plan_id == PLAN)).all())
+
+
+def _cachear(*user_ids: int) -> None:
+    for uid in user_ids:
+        planes._cache[uid] = (float("inf"), None)
+
+
+def test_barrer_vence_cuenta_e_invalida(vencidas):
+    _cachear(ADMIN_ID, PROPIETARIO_ID, CLIENTE_ID)
+    antes = _eventos("vencida"), _eventos("alta_free")
+
+    assert suscripciones.barrer(engine) == {"vencidas": 2, "a_free": 0, "usuarios": [PROPIETARIO_ID, CLIENTE_ID]}
+
+    assert _estados() == {VENCIDA_PROPIETARIO: "cancelada", VIGENTE_PROPIETARIO: "activa", VENCIDA_CLIENTE: "cancelada"}
+    assert (_eventos("vencida"), _eventos("alta_free")) == (antes[0] + 2, antes[1])
+    assert set(planes._cache) == {ADMIN_ID}
+
+    # segunda pasada: nada que vencer, nada que publicar
+    _cachear(PROPIETARIO_ID)
+    assert suscripciones.barrer(engine)["vencidas"] == 0
+    assert _eventos("vencida") == antes[0] + 2
+    assert PROPIETARIO_ID in planes._cache
+
+
+def test_barrer_sin_commit_no_publica(vencidas, monkeypatch):
+    _cachear(PROPIETARIO_ID, CLIENTE_ID)
+    antes = _eventos("vencida")
+    vencer = suscripciones.vencer
+
+    def vencer_y_fallar(conn, ahora=None):
+        vencer(conn, ahora)
+        raise RuntimeError("falla antes del commit")
+
+    monkeypatch.setattr(suscripciones, "vencer", vencer_y_fallar)
+    with pytest.raises(RuntimeError):
+        suscripciones.barrer(engine)
+
+    assert set(_estados().values()) == {"activa"}
+    assert _eventos("vencida") == antes
+    assert set(planes._cache) == {PROPIETARIO_ID, CLIENTE_ID}
@@ -0,0 +1,80 @@
+"""
+Snapshot de ubigeo: la marca que deja un import y la carga única cuando varios
+requests llegan a la vez sin snapshot o con uno vencido.
+"""
+import threading
+import time
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core import ubigeo_snapshot
+from app.db.conexion import engine
+
+
+@pytest.fixture
+def dataset(app):
+    # la crea bootstrap_db con DDL de Postgres; aquí basta una equivalente. En
+    # SQLite el DDL no entra en la transacción de `conn`, por eso se borra aparte
+    with engine.begin() as c:
+        c.execute(text(
+            "CREATE TABLE ubigeo_dataset (id SMALLINT PRIMARY KEY, version VARCHAR(40) NOT NULL, "
+            "checksum VARCHAR(64) NOT NULL, applied_at TIMESTAMP NOT NULL)"
+        ))
+    yield
+    with engine.begin() as c:
+        c.execute(text("DROP TABLE ubigeo_dataset"))
+
+
+def _checksum(conn) -> str:
+    return conn.scalar(text("SELECT checksum FROM ubigeo_dataset WHERE id = 1"))
+
+
+def test_marcar_cambio_sin_fila_deja_checksum_externo(dataset, conn):
+    ubigeo_snapshot.marcar_cambio(Session(bind=conn))
+    assert _checksum(conn) == ubigeo_snapshot.CHECKSUM_EXTERNO
+
+
+def test_marcar_cambio_sobre_dataset_sembrado(dataset, conn):
+    conn.execute(text("INSERT INTO ubigeo_dataset VALUES (1, 'inei-v1', 'abc123', '2026-01-01 00:00:00')"))
+    ubigeo_snapshot.marcar_cambio(Session(bind=conn))
+    assert _checksum(conn) == ubigeo_snapshot.CHECKSUM_EXTERNO
+    assert conn.scalar(text("SELECT applied_at FROM ubigeo_dataset WHERE id = 1")) != "2026-01-01 00:00:00"
+
+
+@pytest.mark.parametrize("inicial", ["sin_snapshot", "vencido"])
+def test_requests_concurrentes_cargan_una_vez(app, monkeypatch, inicial):
+    cargas = []
+    original = ubigeo_snapshot.load_snapshot
+
+    def lenta(db):
+        cargas.append(1)
+        time.sleep(0.05)
+        return original(db)
+
+    if inicial == "sin_snapshot":
+        monkeypatch.setattr(ubigeo_snapshot, "_snapshot", None)
+    else:
+        # hay snapshot pero la marca cambió: todos detectan que está viejo a la vez
+        monkeypatch.setattr(ubigeo_snapshot, "_snapshot", ubigeo_snapshot.get_snapshot())
+        monkeypatch.setattr(ubigeo_snapshot, "_toca_chequear", lambda: True)
+        monkeypatch.setattr(ubigeo_snapshot, "_al_dia", lambda: False)
+    monkeypatch.setattr(ubigeo_snapshot, "_marca", None)
+    monkeypatch.setattr(ubigeo_snapshot, "load_snapshot", lenta)
+
+    listos = threading.Barrier(4)
+    vistos = []
+
+    def pedir():
+        listos.wait()
+        vistos.append(ubigeo_snapshot.get_snapshot())
+
+    hilos = [threading.Thread(target=pedir) for _ in range(4)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+
+    assert len(cargas) == 1
+    assert len({id(s) for s in vistos}) == 1